@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import click
 
-from piptools.scripts import compile, sync
+from piptools.scripts import compile, daemon, sync
 
 
 @click.group()
@@ -11,6 +11,7 @@ def cli() -> None:
 
 
 cli.add_command(compile.cli, "compile")
+cli.add_command(daemon.cli, "daemon")
 cli.add_command(sync.cli, "sync")
 
 
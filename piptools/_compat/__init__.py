@@ -4,12 +4,14 @@ from .pip_compat import (
     Distribution,
     canonicalize_name,
     create_wheel_cache,
+    parse_compiled_requirements,
     parse_requirements,
 )
 
 __all__ = [
     "Distribution",
     "parse_requirements",
+    "parse_compiled_requirements",
     "create_wheel_cache",
     "canonicalize_name",
 ]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import optparse
 import pathlib
+import re
 import typing as _t
 import urllib.parse
 from collections.abc import Iterable, Iterator
@@ -17,6 +18,8 @@ from pip._internal.network.session import PipSession
 from pip._internal.req import InstallRequirement
 from pip._internal.req import parse_requirements as _parse_requirements
 from pip._internal.req.constructors import install_req_from_parsed_requirement
+from pip._internal.req.req_file import ParsedRequirement
+from pip._internal.utils.hashes import STRONG_HASHES
 from pip._vendor.pkg_resources import Requirement
 
 from .path_compat import relative_to_walk_up
@@ -98,36 +101,153 @@ def parse_requirements(
     isolated: bool = False,
     comes_from_stdin: bool = False,
 ) -> Iterator[InstallRequirement]:
+    rewrite_comes_from = _get_comes_from_rewrite(filename, comes_from_stdin)
+    for parsed_req in _parse_requirements(
+        filename, session, finder=finder, options=options, constraint=constraint
+    ):
+        yield _make_install_requirement(parsed_req, rewrite_comes_from, isolated)
+
+
+def parse_compiled_requirements(
+    filename: str,
+    session: PipSession,
+    finder: PackageFinder | None = None,
+    options: optparse.Values | None = None,
+    constraint: bool = False,
+    isolated: bool = False,
+) -> Iterator[InstallRequirement]:
+    """
+    Parse a requirements file as written by pip-compile, like
+    :func:`parse_requirements` does, only faster.
+
+    pip builds an option parser and splits the options of each line with
+    ``shlex``, which is slow for files with many ``--hash`` options. Here the
+    requirement lines are split on whitespace, and only the option lines are
+    parsed by pip. Files which have requirement lines with other options than
+    ``--hash``, or which include other files, are left to :func:`parse_requirements`.
+    """
+    lines = []
+    for line_number, line in _pip_api.read_requirements_file_lines(
+        filename, session, constraint=constraint
+    ):
+        args_str, options_str = _pip_api.split_requirements_file_line(line)
+        if args_str:
+            hashes = _parse_hash_options(options_str)
+            if hashes is None:
+                break
+            lines.append((line_number, line, args_str, hashes))
+        elif line.startswith(_INCLUDE_OPTION_PREFIXES):
+            break
+        else:
+            lines.append((line_number, line, "", {}))
+    else:
+        yield from _parse_compiled_lines(
+            filename, lines, session, finder, options, constraint, isolated
+        )
+        return
+
+    yield from parse_requirements(
+        filename,
+        session,
+        finder=finder,
+        options=options,
+        constraint=constraint,
+        isolated=isolated,
+    )
+
+
+# The options which include another requirements file (or may, once abbreviated)
+_INCLUDE_OPTION_PREFIXES = ("-r", "-c", "--r", "--c")
+
+_HASH_OPTION_RE = re.compile(r"--hash=(?P<name>\w+):(?P<digest>[0-9a-fA-F]+)")
+
+
+def _parse_hash_options(options_str: str) -> dict[str, list[str]] | None:
+    """
+    Return the hashes given by the ``--hash`` options of a requirement line, as
+    pip does, or ``None`` if the line has other options.
+    """
+    hashes: dict[str, list[str]] = {}
+    for option in options_str.split():
+        match = _HASH_OPTION_RE.fullmatch(option)
+        if match is None or match["name"] not in STRONG_HASHES:
+            return None
+        hashes.setdefault(match["name"], []).append(match["digest"])
+    return hashes
+
+
+def _parse_compiled_lines(
+    filename: str,
+    lines: list[tuple[int, str, str, dict[str, list[str]]]],
+    session: PipSession,
+    finder: PackageFinder | None,
+    options: optparse.Values | None,
+    constraint: bool,
+    isolated: bool,
+) -> Iterator[InstallRequirement]:
+    rewrite_comes_from = _get_comes_from_rewrite(filename, comes_from_stdin=False)
+    defaults = _pip_api.get_requirements_file_line_defaults(finder)
+    for line_number, line, args_str, hashes in lines:
+        if args_str:
+            # pip reads more options than ``--hash`` from the line, so start from
+            # the defaults of its parser
+            opts = optparse.Values(vars(defaults))
+            opts.hashes = hashes
+        else:
+            opts = _pip_api.parse_requirements_file_line_options(line, finder)
+
+        parsed_req = _pip_api.handle_requirements_file_line(
+            filename,
+            line_number,
+            args_str,
+            opts,
+            constraint,
+            options=options,
+            finder=finder,
+            session=session,
+        )
+        if parsed_req is not None:
+            yield _make_install_requirement(parsed_req, rewrite_comes_from, isolated)
+
+
+def _get_comes_from_rewrite(
+    filename: str, comes_from_stdin: bool
+) -> _t.Callable[[str], str]:
+    """
+    Return the rewrite rule for the ``comes_from`` data of the requirements parsed
+    from the given file.
+    """
     # the `comes_from` data will be rewritten in different ways in different conditions
     # each rewrite rule is expressible as a str->str function
-    rewrite_comes_from: _t.Callable[[str], str]
-
     if comes_from_stdin:
         # if data is coming from stdin, then `comes_from="-r -"`
-        rewrite_comes_from = _rewrite_comes_from_to_hardcoded_stdin_value
+        return _rewrite_comes_from_to_hardcoded_stdin_value
     elif pathlib.Path(filename).is_absolute():
         # if the input path is absolute, just normalize paths to posix-style
-        rewrite_comes_from = _normalize_comes_from_location
+        return _normalize_comes_from_location
     else:
         # if the input was a relative path, set the rewrite rule to rewrite
         # absolute paths to be relative
-        rewrite_comes_from = _relativize_comes_from_location
-
-    for parsed_req in _parse_requirements(
-        filename, session, finder=finder, options=options, constraint=constraint
-    ):
-        install_req = install_req_from_parsed_requirement(parsed_req, isolated=isolated)
-        if install_req.editable and not parsed_req.requirement.startswith("file://"):
-            # ``Link.url`` is what is saved to the output file
-            # we set the url directly to undo the transformation in pip's Link class
-            file_link = FileLink(install_req.link.url)
-            file_link._url = parsed_req.requirement
-            install_req.link = file_link
-        install_req = _pip_api.copy_install_requirement(install_req)
-
-        install_req.comes_from = rewrite_comes_from(install_req.comes_from)
-
-        yield install_req
+        return _relativize_comes_from_location
+
+
+def _make_install_requirement(
+    parsed_req: ParsedRequirement,
+    rewrite_comes_from: _t.Callable[[str], str],
+    isolated: bool,
+) -> InstallRequirement:
+    install_req = install_req_from_parsed_requirement(parsed_req, isolated=isolated)
+    if install_req.editable and not parsed_req.requirement.startswith("file://"):
+        # ``Link.url`` is what is saved to the output file
+        # we set the url directly to undo the transformation in pip's Link class
+        file_link = FileLink(install_req.link.url)
+        file_link._url = parsed_req.requirement
+        install_req.link = file_link
+    install_req = _pip_api.copy_install_requirement(install_req)
+
+    install_req.comes_from = rewrite_comes_from(install_req.comes_from)
+
+    return install_req
 
 
 def _rewrite_comes_from_to_hardcoded_stdin_value(_: str, /) -> str:
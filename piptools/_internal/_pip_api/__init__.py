@@ -5,17 +5,22 @@ and usage. It is a private API for the rest of ``piptools`` to leverage.
 
 from __future__ import annotations
 
-from .cli_options import postprocess_cli_options
+from .cli_options import parse_python_version, postprocess_cli_options
 from .command_methods import make_requirement_preparer_from_command
 from .install_requirements import (
     copy_install_requirement,
     create_install_requirement,
     create_install_requirement_from_line,
 )
+from .links import get_link_hash
+from .metadata import get_metadata_distribution, get_metadata_link
 from .package_finder import (
+    find_all_candidates_for_all_platforms,
     finder_allows_all_prereleases,
     finder_allows_prereleases_of_req,
     get_pip_request_failed_exception_types,
+    get_supported_tags,
+    keep_index_page_links,
 )
 from .pip_version import (
     PIP_VERSION,
@@ -23,6 +28,14 @@ from .pip_version import (
     PIP_VERSION_TUPLE,
     get_pip_version_for_python_executable,
 )
+from .req_file import (
+    get_requirements_file_line_defaults,
+    handle_requirements_file_line,
+    parse_requirements_file_line_options,
+    read_requirements_file_lines,
+    split_requirements_file_line,
+)
+from .resolver import get_prepared_candidates
 
 __all__ = (
     "PIP_VERSION",
@@ -35,6 +48,19 @@ __all__ = (
     "get_pip_request_failed_exception_types",
     "finder_allows_all_prereleases",
     "finder_allows_prereleases_of_req",
+    "keep_index_page_links",
+    "find_all_candidates_for_all_platforms",
+    "get_supported_tags",
     "postprocess_cli_options",
+    "parse_python_version",
     "make_requirement_preparer_from_command",
+    "get_metadata_distribution",
+    "get_metadata_link",
+    "get_link_hash",
+    "get_prepared_candidates",
+    "read_requirements_file_lines",
+    "split_requirements_file_line",
+    "get_requirements_file_line_defaults",
+    "parse_requirements_file_line_options",
+    "handle_requirements_file_line",
 )
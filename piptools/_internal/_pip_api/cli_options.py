@@ -18,3 +18,18 @@ def postprocess_cli_options(options: optparse.Values) -> None:
     """
     if _pip_version.PIP_VERSION_MAJOR_MINOR >= (26, 0):  # pragma: pip>=26.0 cover
         cmdoptions.check_release_control_exclusive(options)
+
+
+def parse_python_version(value: str) -> tuple[int, ...]:
+    """
+    Parse a Python version given like to the ``--python-version`` option of pip,
+    e.g. ``3``, ``312`` or ``3.12``.
+
+    :raises ValueError: if the version is invalid
+    """
+    version_info, error_msg = cmdoptions._convert_python_version(value)
+    if error_msg is not None:
+        raise ValueError(error_msg)
+    if not version_info:
+        raise ValueError("the version is empty")
+    return version_info
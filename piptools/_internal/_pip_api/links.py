@@ -0,0 +1,27 @@
+"""
+Interfaces for reading the hashes which indexes attach to the links to their files.
+
+Indexes give these hashes in the URL fragment of the links and, through the JSON simple
+API (PEP 691), alongside them. ``pip`` keeps both together since version 23.0, whereas
+older versions keep the hashes of the JSON API apart from the fragment.
+"""
+
+from __future__ import annotations
+
+from pip._internal.models.link import Link
+
+from . import pip_version as _pip_version
+
+
+def get_link_hash(link: Link, hash_name: str) -> str | None:
+    """
+    Get the hex digest of the given kind that an index gave for the file of a link.
+
+    :returns: the digest, or :py:data:`None` if the index did not give one
+    """
+    if _pip_version.PIP_VERSION_MAJOR_MINOR < (23, 0):  # pragma: pip<23.0 cover
+        if hash_name in link._hashes:
+            return link._hashes[hash_name]
+        return link.hash if link.hash_name == hash_name else None
+    else:  # pragma: pip<23.0 no cover
+        return link._hashes.get(hash_name)
@@ -0,0 +1,47 @@
+"""
+Interfaces for creating ``pip`` distributions from core metadata.
+
+``pip`` can only represent a distribution by its metadata alone on the versions which
+support PEP 658, so these helpers degrade gracefully on older versions.
+"""
+
+from __future__ import annotations
+
+from pip._internal.metadata import BaseDistribution
+from pip._internal.models.link import Link
+
+from . import pip_version as _pip_version
+
+
+def get_metadata_distribution(
+    metadata_contents: bytes, filename: str, canonical_name: str
+) -> BaseDistribution | None:
+    """
+    Get a distribution from the contents of a ``METADATA`` file, as done by ``pip``
+    for the metadata files served by an index (PEP 658).
+
+    :returns: the distribution, or :py:data:`None` on pip versions which are not
+        able to create one (before 22.3)
+    """
+    if _pip_version.PIP_VERSION_MAJOR_MINOR < (22, 3):  # pragma: pip<22.3 cover
+        return None
+    else:  # pragma: pip<22.3 no cover
+        from pip._internal.metadata import (
+            get_metadata_distribution as _get_metadata_distribution,
+        )
+
+        return _get_metadata_distribution(metadata_contents, filename, canonical_name)
+
+
+def get_metadata_link(link: Link) -> Link | None:
+    """
+    Get the link to the core metadata file served by an index alongside the file of
+    the given link (PEP 658).
+
+    :returns: the link, or :py:data:`None` if the index serves no metadata file or
+        on pip versions which do not support doing so (before 22.3)
+    """
+    if _pip_version.PIP_VERSION_MAJOR_MINOR < (22, 3):  # pragma: pip<22.3 cover
+        return None
+    else:  # pragma: pip<22.3 no cover
+        return link.metadata_link()
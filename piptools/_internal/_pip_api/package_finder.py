@@ -7,11 +7,24 @@ provide compatible interfaces which wrap methods and attributes.
 
 from __future__ import annotations
 
+import copy
 import functools
+import itertools
+from collections.abc import Callable, Iterable
 
 from pip._internal import exceptions as _pip_internal_exceptions
-from pip._internal.index.package_finder import PackageFinder
+from pip._internal.exceptions import InvalidWheelFilename
+from pip._internal.index.collector import parse_links
+from pip._internal.index.package_finder import LinkEvaluator, PackageFinder
+from pip._internal.models.candidate import InstallationCandidate
+from pip._internal.models.link import Link
+from pip._internal.models.target_python import TargetPython
+from pip._internal.models.wheel import Wheel
 from pip._internal.req import InstallRequirement
+from pip._internal.utils.compatibility_tags import get_supported, version_info_to_nodot
+from pip._internal.utils.filetypes import WHEEL_EXTENSION
+from pip._vendor.packaging.tags import Tag
+from pip._vendor.packaging.utils import canonicalize_name
 from pip._vendor.requests import RequestException
 
 from . import pip_version as _pip_version
@@ -71,3 +84,156 @@ def finder_allows_all_prereleases(finder: PackageFinder) -> bool:
         return bool(finder.allow_all_prereleases)
     else:  # pragma: pip<26.0 no cover
         return ":all:" in finder.release_control.all_releases
+
+
+def keep_index_page_links(
+    finder: PackageFinder, page_links: dict[str, list[Link]]
+) -> None:
+    """
+    Make a package finder keep the links found on each index page it fetches in
+    ``page_links``, by URL, and look the links of a page up there before fetching
+    it.
+
+    The links do not depend on the wheel tags the finder accepts, so that the
+    candidates of a project can be evaluated again for other tags, once the
+    caches of the finder are cleared, without fetching its index pages again.
+    The pages which fail to be fetched are not kept.
+    """
+
+    def _process_project_url(
+        project_url: Link, link_evaluator: LinkEvaluator
+    ) -> list[InstallationCandidate]:
+        links = _get_index_page_links(
+            finder, page_links, project_url, link_evaluator.project_name
+        )
+        return finder.evaluate_links(link_evaluator, links=links)
+
+    finder.process_project_url = _process_project_url  # type: ignore[method-assign]
+
+
+def find_all_candidates_for_all_platforms(
+    finder: PackageFinder,
+    project_name: str,
+    page_links: dict[str, list[Link]],
+    accepts_tag: Callable[[Tag], bool] | None = None,
+) -> list[InstallationCandidate]:
+    """
+    Find all the candidates of a project, like ``finder.find_all_candidates``,
+    but accepting the wheels of all platforms and Python versions, or only the
+    wheels with a tag which ``accepts_tag`` accepts, if given.
+
+    The links of each source are evaluated for the tags of their own wheels,
+    instead of the tags of the target of the finder, which is neither changed
+    nor cached, so that the finder may be used by other threads at the same time.
+    The index pages are looked up in, and kept to, ``page_links``, as in
+    :py:func:`keep_index_page_links`. The candidate of a project locked to a link
+    is the one pip finds, for its target.
+    """
+    if _pip_version.PIP_VERSION_MAJOR_MINOR >= (26, 2):  # pragma: pip<26.2 no cover
+        # Since pip 26.2, a project may be locked to a single link, e.g. by a
+        # ``pylock.toml`` file, and pip then looks at no other source
+        locked_links = getattr(finder, "_locked_links")
+        if canonicalize_name(project_name) in locked_links:
+            return finder.find_all_candidates(project_name)
+
+    link_evaluator = finder.make_link_evaluator(project_name)
+
+    def _evaluate_links(links: list[Link]) -> list[InstallationCandidate]:
+        evaluator = copy.copy(link_evaluator)
+        evaluator._target_python = _get_target_python_for_links(
+            link_evaluator._target_python, links, accepts_tag
+        )
+        return finder.evaluate_links(evaluator, links=links)
+
+    def _candidates_from_page(page_url: Link) -> list[InstallationCandidate]:
+        return _evaluate_links(
+            _get_index_page_links(finder, page_links, page_url, project_name)
+        )
+
+    collected_sources = finder._link_collector.collect_sources(
+        project_name=project_name, candidates_from_page=_candidates_from_page
+    )
+    sources = [
+        source
+        for sources in collected_sources
+        for source in sources
+        if source is not None
+    ]
+    page_candidates = list(
+        itertools.chain.from_iterable(source.page_candidates() for source in sources)
+    )
+    file_candidates = _evaluate_links(
+        sorted(
+            itertools.chain.from_iterable(source.file_links() for source in sources),
+            reverse=True,
+        )
+    )
+    # The same priority ordering as the one of pip
+    return file_candidates + page_candidates
+
+
+def _get_index_page_links(
+    finder: PackageFinder,
+    page_links: dict[str, list[Link]],
+    project_url: Link,
+    project_name: str,
+) -> list[Link]:
+    links = page_links.get(project_url.url)
+    if links is None:
+        kwargs: dict[str, str] = {}
+        if _pip_version.PIP_VERSION_MAJOR_MINOR >= (26, 2):  # pragma: pip<26.2 no cover
+            # The pages of the packages given to ``--refresh-package`` are
+            # revalidated since pip 26.2
+            kwargs["package_name"] = project_name
+        index_response = finder._link_collector.fetch_response(project_url, **kwargs)
+        if index_response is None:
+            return []
+        links = page_links[project_url.url] = list(parse_links(index_response))
+    return links
+
+
+def get_supported_tags(
+    platforms: list[str] | None = None, py_version_info: tuple[int, ...] | None = None
+) -> list[Tag]:
+    """
+    Get the wheel tags supported by the given platforms and Python version, as
+    given to the ``--platform`` and ``--python-version`` options of pip, which
+    default to the ones of the running interpreter.
+    """
+    # The same tags as the ones of ``TargetPython``, whose method to get them was
+    # renamed in pip 23.3
+    version = (
+        None if py_version_info is None else version_info_to_nodot(py_version_info)
+    )
+    return get_supported(version=version, platforms=platforms)
+
+
+def _get_target_python_for_links(
+    target_python: TargetPython,
+    links: Iterable[Link],
+    accepts_tag: Callable[[Tag], bool] | None,
+) -> TargetPython:
+    """
+    Return a copy of the given target, which supports the tags of all the
+    wheels of the given links which ``accepts_tag`` accepts.
+    """
+    tags: list[Tag] = []
+    for link in links:
+        if link.egg_fragment or link.ext != WHEEL_EXTENSION:
+            continue
+        try:
+            file_tags = Wheel(link.filename).file_tags
+        except InvalidWheelFilename:
+            continue
+        tags.extend(tag for tag in file_tags if accepts_tag is None or accepts_tag(tag))
+
+    # A new target, rather than a copy, so that none of the tags which pip caches
+    # for the given one, in more attributes on newer versions, are carried over
+    target_python = TargetPython(
+        platforms=target_python.platforms,
+        py_version_info=target_python.py_version_info,
+        abis=target_python.abis,
+        implementation=target_python.implementation,
+    )
+    target_python._valid_tags = tags
+    return target_python
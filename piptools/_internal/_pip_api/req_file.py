@@ -0,0 +1,105 @@
+"""
+Interfaces for parsing requirements files line by line, as ``pip`` does.
+
+``pip`` only exposes the parsing of whole files, so these helpers wrap the pieces of
+``pip._internal.req.req_file`` which ``pip-tools`` uses to parse the lines of a file
+on its own. The options of a line must carry every attribute ``pip`` reads from them,
+which changes between versions (``ParsedLine`` reads ``editables`` lazily since pip
+25.0), so the options are always built from the defaults of ``pip``'s own parser.
+"""
+
+from __future__ import annotations
+
+import optparse
+from collections.abc import Iterator
+
+from pip._internal.exceptions import RequirementsFileParseError
+from pip._internal.index.package_finder import PackageFinder
+from pip._internal.network.session import PipSession
+from pip._internal.req.req_file import (
+    OptionParsingError,
+    ParsedLine,
+    ParsedRequirement,
+    break_args_options,
+    get_file_content,
+    get_line_parser,
+    handle_line,
+    preprocess,
+)
+
+from . import pip_version as _pip_version
+
+
+def read_requirements_file_lines(
+    filename: str, session: PipSession, constraint: bool = False
+) -> Iterator[tuple[int, str]]:
+    """
+    Read the logical lines of a requirements file, with their line numbers.
+
+    Continuation lines are joined, comments are dropped and environment variables
+    are expanded, as done by ``pip``.
+    """
+    kwargs: dict[str, bool] = {}
+    if _pip_version.PIP_VERSION_MAJOR_MINOR >= (26, 1):  # pragma: pip<26.1 no cover
+        # the error of a missing file names the kind of file since pip 26.1
+        kwargs["constraint"] = constraint
+    _, content = get_file_content(filename, session, **kwargs)
+    yield from preprocess(content)
+
+
+def split_requirements_file_line(line: str) -> tuple[str, str]:
+    """
+    Split a line of a requirements file into its requirement and its options.
+    """
+    return break_args_options(line)
+
+
+def get_requirements_file_line_defaults(
+    finder: PackageFinder | None,
+) -> optparse.Values:
+    """
+    Get the options of a requirements file line which sets none, with the defaults
+    ``pip`` uses for the given finder.
+    """
+    _, opts = get_line_parser(finder)("")
+    return opts
+
+
+def parse_requirements_file_line_options(
+    line: str, finder: PackageFinder | None
+) -> optparse.Values:
+    """
+    Parse the options of a requirements file line, as done by ``pip``.
+
+    :raises RequirementsFileParseError: if the options are invalid
+    """
+    try:
+        _, opts = get_line_parser(finder)(line)
+    except OptionParsingError as e:
+        raise RequirementsFileParseError(f"Invalid requirement: {line}\n{e.msg}")
+    return opts
+
+
+def handle_requirements_file_line(
+    filename: str,
+    line_number: int,
+    args_str: str,
+    opts: optparse.Values,
+    constraint: bool,
+    options: optparse.Values | None = None,
+    finder: PackageFinder | None = None,
+    session: PipSession | None = None,
+) -> ParsedRequirement | None:
+    """
+    Handle a parsed requirements file line, as done by ``pip``.
+
+    Option lines update the given options and finder.
+
+    :returns: the requirement of the line, or :py:data:`None` for option lines
+    """
+    return handle_line(
+        ParsedLine(filename, line_number, args_str, opts, constraint),
+        options=options,
+        finder=finder,
+        session=session,
+    )
@@ -0,0 +1,27 @@
+"""
+Interfaces for reading what the ``pip`` resolver learned during a resolution attempt.
+
+``pip`` keeps the candidates it prepared in a private cache of the factory of its
+resolver, which may change or go away in any version.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from pip._internal.resolution.resolvelib.base import Candidate
+from pip._internal.resolution.resolvelib.resolver import Resolver
+
+
+def get_prepared_candidates(resolver: Resolver) -> Iterable[Candidate]:
+    """
+    Get the candidates of the package files which the given resolver prepared, and
+    thus knows the dependencies of.
+
+    :returns: the candidates, or an empty iterable on pip versions which do not keep
+        them where expected
+    """
+    link_candidate_cache = getattr(resolver.factory, "_link_candidate_cache", None)
+    if link_candidate_cache is None:
+        return ()
+    return list(link_candidate_cache.values())
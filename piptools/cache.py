@@ -1,22 +1,44 @@
 from __future__ import annotations
 
+import contextlib
+import email.message
+import email.parser
+import hashlib
+import io
 import json
 import os
 import platform
+import sqlite3
 import sys
+import sysconfig
+import tempfile
+import threading
+import time
 import typing as _t
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from shutil import rmtree
 
+from pip._internal.metadata import BaseDistribution
+from pip._internal.models.link import Link
 from pip._internal.req import InstallRequirement
+from pip._internal.utils.urls import url_to_path
 from pip._vendor.packaging.requirements import Requirement
 
 from .exceptions import PipToolsError
-from .utils import as_tuple, key_from_req, lookup_table_from_tuples
+from .utils import (
+    as_tuple,
+    get_metadata_sha256,
+    key_from_req,
+    lookup_table_from_tuples,
+)
 
 CacheKey = tuple[str, str]
 CacheLookup = dict[str, list[str]]
 CacheDict = dict[str, CacheLookup]
 
+# Seconds to wait for other processes to release their lock on a SQLite database
+_SQLITE_TIMEOUT = 30.0
+
 _PEP425_PY_TAGS = {"cpython": "cp", "pypy": "pp", "ironpython": "ip", "jython": "jy"}
 
 
@@ -58,38 +80,143 @@ def read_cache_file(cache_file_path: str) -> CacheDict:
         return _t.cast(CacheDict, doc["dependencies"])
 
 
+@contextlib.contextmanager
+def _translate_database_errors(database_path: str) -> Iterator[None]:
+    """Turn the errors of a damaged SQLite database into ``CorruptCacheError``."""
+    try:
+        yield
+    except sqlite3.OperationalError:
+        # E.g. the database is locked or cannot be opened, which does not
+        # mean that its content is broken
+        raise
+    except sqlite3.DatabaseError:
+        raise CorruptCacheError(database_path)
+
+
+def _open_database(
+    database_path: str, schema: str, check_same_thread: bool = True
+) -> sqlite3.Connection:
+    """
+    Open the SQLite database at the given path in WAL mode, so that it can be
+    shared by several processes, and create its tables with the given
+    statements.
+
+    :param check_same_thread: whether only the creating thread may use the
+        connection (default is :py:data:`True`); callers sharing it between
+        threads must serialize its use themselves
+    """
+    connection = sqlite3.connect(
+        database_path, timeout=_SQLITE_TIMEOUT, check_same_thread=check_same_thread
+    )
+    try:
+        with _translate_database_errors(database_path):
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                connection.executescript(schema)
+    except BaseException:
+        connection.close()
+        raise
+    return connection
+
+
 class DependencyCache:
     """
     Create new persistent dependency cache for the current Python version.
 
-    The cache file is written to the appropriate user cache dir for the
-    current platform, i.e.
+    The cache is a SQLite database written to the appropriate user cache dir
+    for the current platform, i.e.
 
-        ~/.cache/pip-tools/depcache-pyX.Y.json
+        ~/.cache/pip-tools/depcache-pyX.Y.sqlite3
 
     Where py indicates the Python implementation.
     Where X.Y indicates the Python version.
+
+    Entries are looked up and inserted one at a time, and the database is
+    used in WAL mode, so that several pip-compile processes can share it.
+    A JSON cache file written by an older version of pip-tools is migrated
+    into the database the first time it is opened.
+
+    Inside a :py:meth:`batch` block, new entries are kept in memory and only
+    written, in a single transaction, when the block is left.
     """
 
     def __init__(self, cache_dir: str):
         os.makedirs(cache_dir, exist_ok=True)
-        cache_filename = f"depcache-{_implementation_name()}.json"
+        cache_filename = f"depcache-{_implementation_name()}.sqlite3"
+        legacy_cache_filename = f"depcache-{_implementation_name()}.json"
 
         self._cache_file = os.path.join(cache_dir, cache_filename)
-        self._cache: CacheDict | None = None
+        self._legacy_cache_file = os.path.join(cache_dir, legacy_cache_filename)
+        self._connection: sqlite3.Connection | None = None
+        self._pending: dict[CacheKey, list[str]] | None = None
+
+        # Statistics of the writes made to the database
+        self.write_count = 0
+        self.bytes_written = 0
 
     @property
-    def cache(self) -> CacheDict:
+    def connection(self) -> sqlite3.Connection:
         """
-        The dictionary that is the actual in-memory cache.  This property
-        lazily loads the cache from disk.
+        The connection to the cache database. This property lazily opens the
+        database, creating and migrating it as needed.
         """
-        if self._cache is None:
+        if self._connection is None:
+            connection = _open_database(
+                self._cache_file,
+                "CREATE TABLE IF NOT EXISTS dependencies ("
+                " name TEXT NOT NULL,"
+                " version_and_extras TEXT NOT NULL,"
+                " dependencies TEXT NOT NULL,"
+                " PRIMARY KEY (name, version_and_extras)"
+                ") WITHOUT ROWID",
+            )
             try:
-                self._cache = read_cache_file(self._cache_file)
-            except FileNotFoundError:
-                self._cache = {}
-        return self._cache
+                with self._translate_errors():
+                    self._migrate_legacy_cache_file(connection)
+            except BaseException:
+                connection.close()
+                raise
+            self._connection = connection
+        return self._connection
+
+    def _migrate_legacy_cache_file(self, connection: sqlite3.Connection) -> None:
+        """Import the entries of a format 1 JSON cache file, then remove it."""
+        try:
+            legacy_cache = read_cache_file(self._legacy_cache_file)
+        except FileNotFoundError:
+            return
+
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO dependencies VALUES (?, ?, ?)",
+                (
+                    (name, version_and_extras, json.dumps(dependencies))
+                    for name, lookup in legacy_cache.items()
+                    for version_and_extras, dependencies in lookup.items()
+                ),
+            )
+        # Another process may have migrated and removed the file meanwhile
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._legacy_cache_file)
+
+    def _translate_errors(self) -> _t.ContextManager[None]:
+        return _translate_database_errors(self._cache_file)
+
+    @property
+    def cache(self) -> CacheDict:
+        """
+        The whole content of the cache, as a dictionary. Lookups of single
+        entries do not need this, as they query the database directly.
+        """
+        with self._translate_errors():
+            rows = self.connection.execute(
+                "SELECT name, version_and_extras, dependencies FROM dependencies"
+            ).fetchall()
+
+        cache: CacheDict = {}
+        for name, version_and_extras, dependencies in rows:
+            cache.setdefault(name, {})[version_and_extras] = json.loads(dependencies)
+        return cache
 
     def as_cache_key(self, ireq: InstallRequirement) -> CacheKey:
         """
@@ -113,29 +240,84 @@ class DependencyCache:
             extras_string = f"[{','.join(extras)}]"
         return name, f"{version}{extras_string}"
 
-    def write_cache(self) -> None:
-        """Write the cache to disk as JSON."""
-        doc = {"__format__": 1, "dependencies": self._cache}
-        with open(self._cache_file, "w", encoding="utf-8") as f:
-            json.dump(doc, f, sort_keys=True)
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Defer the writes of new entries until the end of the block, where they
+        are written in one transaction, even if the block raises. Nested
+        blocks are part of the outermost one.
+        """
+        if self._pending is not None:
+            yield
+            return
+
+        self._pending = {}
+        try:
+            yield
+        finally:
+            pending, self._pending = self._pending, None
+            self._write(pending)
+
+    def _write(self, entries: dict[CacheKey, list[str]]) -> None:
+        """Write the given entries to the database in one transaction."""
+        if not entries:
+            return
+
+        rows = [
+            (name, version_and_extras, json.dumps(dependencies))
+            for (name, version_and_extras), dependencies in entries.items()
+        ]
+        with self._translate_errors(), self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO dependencies VALUES (?, ?, ?)", rows
+            )
+        self.write_count += 1
+        self.bytes_written += sum(
+            len(field.encode("utf-8")) for row in rows for field in row
+        )
+
+    def _lookup(self, cache_key: CacheKey) -> list[str] | None:
+        """Return the dependencies stored under the given key, if any."""
+        if self._pending is not None and cache_key in self._pending:
+            return self._pending[cache_key]
+
+        with self._translate_errors():
+            row = self.connection.execute(
+                "SELECT dependencies FROM dependencies"
+                " WHERE name = ? AND version_and_extras = ?",
+                cache_key,
+            ).fetchone()
+        if row is None:
+            return None
+        return _t.cast(list[str], json.loads(row[0]))
 
     def clear(self) -> None:
-        self._cache = {}
-        self.write_cache()
+        if self._pending is not None:
+            self._pending.clear()
+        with self._translate_errors(), self.connection:
+            self.connection.execute("DELETE FROM dependencies")
+
+    def close(self) -> None:
+        """Close the connection to the database, if it was opened."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
 
     def __contains__(self, ireq: InstallRequirement) -> bool:
-        pkgname, pkgversion_and_extras = self.as_cache_key(ireq)
-        return pkgversion_and_extras in self.cache.get(pkgname, {})
+        return self._lookup(self.as_cache_key(ireq)) is not None
 
     def __getitem__(self, ireq: InstallRequirement) -> list[str]:
-        pkgname, pkgversion_and_extras = self.as_cache_key(ireq)
-        return self.cache[pkgname][pkgversion_and_extras]
+        dependencies = self._lookup(self.as_cache_key(ireq))
+        if dependencies is None:
+            raise KeyError(ireq)
+        return dependencies
 
     def __setitem__(self, ireq: InstallRequirement, values: list[str]) -> None:
-        pkgname, pkgversion_and_extras = self.as_cache_key(ireq)
-        self.cache.setdefault(pkgname, {})
-        self.cache[pkgname][pkgversion_and_extras] = values
-        self.write_cache()
+        cache_key = self.as_cache_key(ireq)
+        if self._pending is not None:
+            self._pending[cache_key] = values
+        else:
+            self._write({cache_key: values})
 
     def reverse_dependencies(
         self, ireqs: Iterable[InstallRequirement]
@@ -177,5 +359,457 @@ class DependencyCache:
         return lookup_table_from_tuples(
             (key_from_req(Requirement(dep_name)), name)
             for name, version_and_extras in cache_keys
-            for dep_name in self.cache[name][version_and_extras]
+            for dep_name in self._lookup((name, version_and_extras)) or ()
         )
+
+
+class MetadataCache:
+    """
+    Create new persistent cache of the metadata of the package files on an index.
+
+    The cache is a SQLite database written to the pip-tools cache dir, i.e.
+
+        ~/.cache/pip-tools/metadata-cache.sqlite3
+
+    It maps the URL of a package file to the parts of its core metadata which
+    resolving depends on: its name, version, ``Requires-Python``,
+    ``Requires-Dist`` and ``Provides-Extra`` fields, along with the hash of its
+    original metadata file. Wheels hold static metadata, so they are only keyed
+    by their URL. The metadata of source distributions is built, and may depend
+    on the interpreter and platform doing so, which are thus part of the key of
+    these entries.
+
+    Local files and direct URL requirements may change at any time and are
+    never cached.
+
+    The connection to the database may be used by several threads.
+    """
+
+    def __init__(self, cache_dir: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_file = os.path.join(cache_dir, "metadata-cache.sqlite3")
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        The connection to the cache database. This property lazily opens the
+        database, creating it as needed.
+        """
+        with self._lock:
+            if self._connection is None:
+                self._connection = _open_database(
+                    self._cache_file,
+                    "CREATE TABLE IF NOT EXISTS metadata ("
+                    " url TEXT NOT NULL,"
+                    " environment TEXT NOT NULL,"
+                    " metadata BLOB NOT NULL,"
+                    " metadata_sha256 TEXT,"
+                    " PRIMARY KEY (url, environment)"
+                    ") WITHOUT ROWID",
+                    check_same_thread=False,
+                )
+            return self._connection
+
+    @contextlib.contextmanager
+    def _database(self) -> Iterator[sqlite3.Connection]:
+        with self._lock, _translate_database_errors(self._cache_file):
+            yield self.connection
+
+    def as_cache_key(self, link: Link) -> tuple[str, str]:
+        """
+        Given a link to a package file, return its cache key, for example:
+
+        ("https://.../six-1.16.0-py2.py3-none-any.whl", "")
+
+        ("https://.../PyYAML-6.0.tar.gz", "cp3.11-linux-x86_64")
+        """
+        if link.is_wheel:
+            environment = ""
+        else:
+            environment = f"{_implementation_name()}-{sysconfig.get_platform()}"
+        return link.url_without_fragment, environment
+
+    def get(self, link: Link) -> bytes | None:
+        """Return the cached ``METADATA`` of the given file, if any."""
+        with self._database() as connection:
+            row = connection.execute(
+                "SELECT metadata FROM metadata WHERE url = ? AND environment = ?",
+                self.as_cache_key(link),
+            ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def get_metadata_sha256(self, link: Link) -> str | None:
+        """
+        Return the hash of the original metadata file of the given file, as
+        returned by :func:`piptools.utils.get_metadata_sha256`, if cached.
+
+        The cached ``METADATA`` only keeps some fields of the original one, so
+        its own hash would differ.
+        """
+        with self._database() as connection:
+            row = connection.execute(
+                "SELECT metadata_sha256 FROM metadata"
+                " WHERE url = ? AND environment = ?",
+                self.as_cache_key(link),
+            ).fetchone()
+        return None if row is None or row[0] is None else str(row[0])
+
+    def set(self, link: Link, dist: BaseDistribution) -> None:
+        """Store the metadata of the given distribution, prepared from the file."""
+        self._store(link, dist.metadata, str(dist.version), get_metadata_sha256(dist))
+
+    def set_metadata_file(self, link: Link, metadata_contents: bytes) -> None:
+        """Store the metadata from the contents of the ``METADATA`` file of a wheel."""
+        metadata = email.parser.BytesParser().parsebytes(metadata_contents)
+        # Hash the text as a distribution reads it, with universal newlines
+        metadata_text = io.TextIOWrapper(
+            io.BytesIO(metadata_contents), encoding="utf-8"
+        ).read()
+        metadata_sha256 = hashlib.sha256(metadata_text.encode()).hexdigest()
+        self._store(link, metadata, metadata["Version"], metadata_sha256)
+
+    def _store(
+        self,
+        link: Link,
+        metadata: email.message.Message,
+        version: str,
+        metadata_sha256: str | None,
+    ) -> None:
+        lines = [
+            "Metadata-Version: 2.1",
+            f"Name: {metadata['Name']}",
+            f"Version: {version}",
+        ]
+        requires_python = metadata.get("Requires-Python")
+        if requires_python:
+            lines.append(f"Requires-Python: {requires_python}")
+        for field in ("Provides-Extra", "Requires-Dist"):
+            # Folded values span several lines
+            lines.extend(
+                f"{field}: {' '.join(str(value).split())}"
+                for value in metadata.get_all(field, [])
+            )
+        contents = "".join(f"{line}\n" for line in lines).encode("utf-8")
+
+        with self._database() as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)",
+                (*self.as_cache_key(link), contents, metadata_sha256),
+            )
+
+    def clear(self) -> None:
+        with self._database() as connection, connection:
+            connection.execute("DELETE FROM metadata")
+
+    def close(self) -> None:
+        """Close the connection to the database, if it was opened."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class ProjectCache:
+    """
+    Create new persistent cache of the project pages served by the JSON API of
+    an index.
+
+    The cache is a SQLite database written to the pip-tools cache dir, i.e.
+
+        ~/.cache/pip-tools/project-cache.sqlite3
+
+    Project pages list every file of every release of a project and can be
+    megabytes large, while only the hashes of the files of one release are
+    ever needed. So, instead of the pages, the cache stores the compact
+    records of the release files given to :py:meth:`set`, one row per release,
+    along with the ``ETag`` and ``Last-Modified`` validators of the page, which
+    are used to revalidate it. Releases fetched on their own, through
+    :py:meth:`set_release`, are stored alongside.
+
+    The connection to the database may be used by several threads.
+    """
+
+    def __init__(self, cache_dir: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_file = os.path.join(cache_dir, "project-cache.sqlite3")
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        The connection to the cache database. This property lazily opens the
+        database, creating it as needed.
+        """
+        with self._lock:
+            if self._connection is None:
+                self._connection = _open_database(
+                    self._cache_file,
+                    "CREATE TABLE IF NOT EXISTS projects ("
+                    " url TEXT NOT NULL PRIMARY KEY,"
+                    " etag TEXT,"
+                    " last_modified TEXT"
+                    ") WITHOUT ROWID;"
+                    "CREATE TABLE IF NOT EXISTS releases ("
+                    " project_url TEXT NOT NULL,"
+                    " version TEXT NOT NULL,"
+                    " files TEXT NOT NULL,"
+                    " PRIMARY KEY (project_url, version)"
+                    ") WITHOUT ROWID",
+                    check_same_thread=False,
+                )
+            return self._connection
+
+    @contextlib.contextmanager
+    def _database(self) -> Iterator[sqlite3.Connection]:
+        with self._lock, _translate_database_errors(self._cache_file):
+            yield self.connection
+
+    def get_release(self, project_url: str, version: str) -> list[_t.Any] | None:
+        """
+        Return the records of the files of the given release of a project, or
+        None if the release is unknown.
+        """
+        with self._database() as connection:
+            row = connection.execute(
+                "SELECT files FROM releases WHERE project_url = ? AND version = ?",
+                (project_url, version),
+            ).fetchone()
+        if row is None:
+            return None
+        return _t.cast(list[_t.Any], json.loads(row[0]))
+
+    def get_releases(self, project_url: str) -> dict[str, list[_t.Any]]:
+        """Return the records of the files of all the releases of a project."""
+        with self._database() as connection:
+            rows = connection.execute(
+                "SELECT version, files FROM releases WHERE project_url = ?",
+                (project_url,),
+            ).fetchall()
+        return {version: json.loads(files) for version, files in rows}
+
+    def conditional_headers(self, project_url: str) -> dict[str, str] | None:
+        """
+        Return the headers revalidating the cached page of a project, or None
+        if the page is not cached.
+        """
+        with self._database() as connection:
+            row = connection.execute(
+                "SELECT etag, last_modified FROM projects WHERE url = ?",
+                (project_url,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        etag, last_modified = row
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def set(
+        self,
+        project_url: str,
+        releases: dict[str, list[_t.Any]],
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """
+        Replace the cached page of a project.
+
+        :param releases: the records of the files of each release
+        :param etag: the ``ETag`` header of the page, if any
+        :param last_modified: the ``Last-Modified`` header of the page, if any
+        """
+        with self._database() as connection, connection:
+            connection.execute(
+                "DELETE FROM releases WHERE project_url = ?", (project_url,)
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO projects VALUES (?, ?, ?)",
+                (project_url, etag, last_modified),
+            )
+            connection.executemany(
+                "INSERT INTO releases VALUES (?, ?, ?)",
+                (
+                    (project_url, version, json.dumps(files, separators=(",", ":")))
+                    for version, files in releases.items()
+                ),
+            )
+
+    def set_release(self, project_url: str, version: str, files: list[_t.Any]) -> None:
+        """
+        Store the records of the files of a single release of a project, as
+        served by the index for that release alone. The cached page of the
+        project, if any, is left as is.
+        """
+        with self._database() as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO releases VALUES (?, ?, ?)",
+                (project_url, version, json.dumps(files, separators=(",", ":"))),
+            )
+
+    def clear(self) -> None:
+        with self._database() as connection, connection:
+            connection.execute("DELETE FROM releases")
+            connection.execute("DELETE FROM projects")
+
+    def close(self) -> None:
+        """Close the connection to the database, if it was opened."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class HashCache:
+    """
+    Create new persistent cache of the hashes of package files.
+
+    Each hash is stored in a small file of its own below the given directory,
+    named after a digest of the file's cache key, i.e.
+
+        ~/.cache/pip-tools/hashes/ab/cd/ef/0123...
+
+    so that entries can be written concurrently, by several threads or
+    processes, without any locking.
+
+    Entries which have not been used for ``max_age`` seconds are evicted, as are
+    the least recently used entries once the cache grows over ``max_size``
+    bytes. The cache is pruned at most once every ``PRUNE_INTERVAL`` seconds.
+    """
+
+    PRUNE_INTERVAL = 24 * 60 * 60
+    _STAMP_FILENAME = ".last-pruned"
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_age: float = 30 * 24 * 60 * 60,
+        max_size: int = 16 * 1024 * 1024,
+    ):
+        self._cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_size = max_size
+        self._prune_lock = threading.Lock()
+        self._prune_checked = False
+
+    def as_cache_key(self, link: Link) -> str:
+        """
+        Given a link to a package file, return its cache key.
+
+        Files on an index are identified by their URL. Local files may change
+        in place, so their size and modification time are part of the key,
+        for example:
+
+        "file:///wheels/six-1.16.0-py2.py3-none-any.whl#size=11053&mtime=1..."
+        """
+        url = link.url_without_fragment
+        if not link.is_file:
+            return url
+
+        st = os.stat(url_to_path(url))
+        return f"{url}#size={st.st_size}&mtime={st.st_mtime_ns}"
+
+    def _entry_path(self, key: str) -> str:
+        digest = hashlib.sha224(key.encode()).hexdigest()
+        # Nest directories to avoid running out of top level dirs on some FS
+        return os.path.join(
+            self._cache_dir, digest[:2], digest[2:4], digest[4:6], digest[6:]
+        )
+
+    def get(self, link: Link) -> str | None:
+        """Return the cached hash of the given file, or None if it is unknown."""
+        key = self.as_cache_key(link)
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, encoding="utf-8") as entry_file:
+                doc = json.load(entry_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # A broken entry is only a cache miss, it gets overwritten later
+            return None
+
+        if not isinstance(doc, dict) or doc.get("__format__") != 1:
+            return None
+        if doc.get("key") != key:
+            return None
+
+        # Record the use of the entry, which delays its eviction
+        with contextlib.suppress(OSError):
+            os.utime(entry_path)
+        return _t.cast(str, doc["hash"])
+
+    def set(self, link: Link, file_hash: str) -> None:
+        """Store the hash of the given file."""
+        key = self.as_cache_key(link)
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # Write to a temporary file first, so that readers never see a
+        # partially written entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as entry_file:
+                json.dump({"__format__": 1, "key": key, "hash": file_hash}, entry_file)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+        self._maybe_prune()
+
+    def clear(self) -> None:
+        rmtree(self._cache_dir, ignore_errors=True)
+
+    def _maybe_prune(self) -> None:
+        """Prune the cache unless that was done recently."""
+        with self._prune_lock:
+            if self._prune_checked:
+                return
+            self._prune_checked = True
+
+        stamp_path = os.path.join(self._cache_dir, self._STAMP_FILENAME)
+        try:
+            last_pruned = os.stat(stamp_path).st_mtime
+        except FileNotFoundError:
+            last_pruned = 0.0
+        if time.time() - last_pruned < self.PRUNE_INTERVAL:
+            return
+
+        with open(stamp_path, "w"):
+            pass
+        self.prune()
+
+    def prune(self) -> None:
+        """Evict the entries which are too old, then the least recently used ones."""
+        now = time.time()
+        entries: list[tuple[float, int, str]] = []
+        for dirpath, _, filenames in os.walk(self._cache_dir):
+            for filename in filenames:
+                if filename == self._STAMP_FILENAME:
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if now - st.st_mtime > self.max_age:
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+                else:
+                    entries.append((st.st_mtime, st.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            total_size -= size
@@ -0,0 +1,241 @@
+"""
+The fingerprint of the inputs of a compile, which ``pip-compile
+--skip-unchanged`` saves next to the output file, so that the next compile
+can tell that nothing it reads has changed without resolving anything.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import os
+import platform
+import re
+import sys
+from importlib import metadata as importlib_metadata
+
+import click
+from pip._internal.configuration import get_configuration_files
+from pip._internal.req.req_file import (
+    OptionParsingError,
+    break_args_options,
+    get_line_parser,
+    preprocess,
+)
+from pip._internal.utils.urls import url_to_path
+
+from ._internal import _pip_api
+from .logging import log
+from .utils import get_compile_command
+
+# The files of a project which pip-tools reads its metadata from
+PROJECT_FILENAMES = ("pyproject.toml", "setup.cfg", "setup.py")
+
+# The environment variables which change what pip-compile writes
+_ENVIRONMENT_VARIABLE_RE = re.compile(r"^(PIP_.*|CUSTOM_COMPILE_COMMAND)$")
+
+# A URL, as opposed to a path, which may start with a Windows drive letter
+_URL_RE = re.compile(r"^[a-z][a-z0-9+.-]+:", re.IGNORECASE)
+
+_EXTRAS_RE = re.compile(r"\[[^\]]*\]$")
+
+
+def get_fingerprint_path(output_path: str) -> str:
+    """Return the path of the fingerprint of the given output file."""
+    return f"{output_path}.fingerprint"
+
+
+def read_fingerprint(path: str) -> str | None:
+    """Read the fingerprint at the given path, returning ``None`` if there is none."""
+    try:
+        with open(path, encoding="utf-8") as fingerprint_file:
+            return fingerprint_file.read().strip()
+    except OSError:
+        return None
+
+
+def write_fingerprint(path: str, fingerprint: str) -> None:
+    """Write a fingerprint to the given path."""
+    with open(path, "w", encoding="utf-8") as fingerprint_file:
+        fingerprint_file.write(f"{fingerprint}\n")
+
+
+def get_fingerprint(
+    ctx: click.Context,
+    src_files: tuple[str, ...],
+    constraint_files: tuple[str, ...],
+    output_content: bytes,
+) -> str | None:
+    """
+    Compute the fingerprint of a compile.
+
+    The fingerprint covers the versions of pip-tools, pip and Python, the
+    platform, the options of the compile, the ``PIP_*`` environment variables,
+    the pip configuration files, the source and constraints files with the
+    files they include, the metadata files of the local projects they require,
+    and the content of the output file.
+
+    :param ctx: the context of the compile
+    :param src_files: the source files of the compile
+    :param constraint_files: the constraints files of the compile
+    :param output_content: the content of the output file
+    :return: the fingerprint, or ``None`` if some input cannot be fingerprinted,
+        e.g. a source file read from stdin or a requirements file given by URL
+    """
+    files: dict[str, str | None] = {}
+    try:
+        for src_file in src_files:
+            if os.path.basename(src_file) in PROJECT_FILENAMES:
+                _add_project(files, os.path.dirname(src_file))
+            else:
+                _add_requirements_file(files, src_file)
+        for constraint_file in constraint_files:
+            _add_requirements_file(files, constraint_file)
+    except _Unfingerprintable as e:
+        log.debug(f"Cannot fingerprint the inputs: {e}")
+        return None
+
+    for config_file in _get_pip_configuration_files():
+        _add_file(files, config_file)
+
+    inputs = {
+        "pip-tools": importlib_metadata.version("pip-tools"),
+        "pip": str(_pip_api.PIP_VERSION),
+        "python": [sys.implementation.name, platform.python_version()],
+        "platform": [sys.platform, platform.machine()],
+        "command": get_compile_command(ctx),
+        "environment": {
+            name: value
+            for name, value in os.environ.items()
+            if _ENVIRONMENT_VARIABLE_RE.match(name)
+        },
+        "files": files,
+        "output": hashlib.sha256(output_content).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def is_up_to_date(
+    ctx: click.Context,
+    src_files: tuple[str, ...],
+    constraint_files: tuple[str, ...],
+    output_path: str,
+) -> bool:
+    """
+    Tell whether the output file was compiled by ``--skip-unchanged`` from the
+    same inputs as the ones of the given compile.
+    """
+    saved_fingerprint = read_fingerprint(get_fingerprint_path(output_path))
+    if saved_fingerprint is None or not os.path.isfile(output_path):
+        return False
+    with open(output_path, "rb") as output_file:
+        output_content = output_file.read()
+    fingerprint = get_fingerprint(ctx, src_files, constraint_files, output_content)
+    return fingerprint == saved_fingerprint
+
+
+class _Unfingerprintable(Exception):
+    pass
+
+
+def _get_pip_configuration_files() -> list[str]:
+    config_files = list(itertools.chain(*get_configuration_files().values()))
+    if "PIP_CONFIG_FILE" in os.environ:
+        config_files.append(os.environ["PIP_CONFIG_FILE"])
+    return config_files
+
+
+def _hash_file(path: str) -> str | None:
+    try:
+        with open(path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        raise _Unfingerprintable(f"{path}: {e}") from e
+
+
+def _add_file(files: dict[str, str | None], path: str) -> None:
+    path = os.path.abspath(path)
+    if path not in files:
+        files[path] = _hash_file(path)
+
+
+def _add_project(files: dict[str, str | None], project_dir: str) -> None:
+    for filename in PROJECT_FILENAMES:
+        _add_file(files, os.path.join(project_dir, filename))
+
+
+def _add_requirements_file(files: dict[str, str | None], path: str) -> None:
+    """
+    Add a requirements file, the files it includes and the local projects it
+    requires to the fingerprinted files.
+
+    The lines of the file are fingerprinted once their comments are removed and
+    their environment variables expanded, as pip reads them.
+    """
+    if path == "-" or _URL_RE.match(path):
+        raise _Unfingerprintable(f"{path} is not a local file")
+    abs_path = os.path.abspath(path)
+    if abs_path in files:
+        return
+    try:
+        with open(abs_path, encoding="utf-8") as requirements_file:
+            content = requirements_file.read()
+    except (OSError, ValueError) as e:
+        raise _Unfingerprintable(f"{path}: {e}") from e
+
+    lines = [line for _, line in preprocess(content)]
+    files[abs_path] = hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+    line_parser = get_line_parser(None)
+    for line in lines:
+        args_str, options_str = break_args_options(line)
+        if args_str:
+            local_path = _get_local_path(args_str)
+            if local_path is not None:
+                _add_local_path(files, local_path)
+        if not options_str:
+            continue
+        try:
+            _, opts = line_parser(line)
+        except OptionParsingError as e:
+            raise _Unfingerprintable(f"{path}: {e}") from e
+        # Included files are relative to the including file, as pip reads them
+        for included in itertools.chain(
+            opts.requirements or (), opts.constraints or ()
+        ):
+            if not _URL_RE.match(included):
+                included = os.path.join(os.path.dirname(abs_path), included)
+            _add_requirements_file(files, included)
+        for editable in opts.editables or ():
+            local_path = _get_local_path(editable)
+            if local_path is not None:
+                _add_local_path(files, local_path)
+
+
+def _get_local_path(requirement: str) -> str | None:
+    """Return the local path a requirement refers to, if it does, like pip."""
+    target = requirement.split(";", 1)[0].strip()
+    if "@" in target and not _URL_RE.match(target):
+        _, _, url = target.partition("@")
+        if _URL_RE.match(url.strip()):
+            target = url.strip()
+    if target.startswith("file:"):
+        return url_to_path(target.split("#", 1)[0])
+    if _URL_RE.match(target):
+        return None
+    target = _EXTRAS_RE.sub("", target)
+    if os.sep in target or (os.altsep and os.altsep in target):
+        return target
+    if target.startswith("."):
+        return target
+    return None
+
+
+def _add_local_path(files: dict[str, str | None], path: str) -> None:
+    if os.path.isdir(path):
+        _add_project(files, path)
+    else:
+        _add_file(files, path)
@@ -0,0 +1,134 @@
+"""
+The dependency graph of a compile, which ``pip-compile --emit-graph`` saves in a
+JSON file next to the output file, so that tools do not have to resolve the
+requirements again, or to parse the annotations of the output file, to know it.
+"""
+
+from __future__ import annotations
+
+import json
+import typing as _t
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from pip._internal.req import InstallRequirement
+
+from .logging import log
+from .utils import as_tuple, is_pinned_requirement, is_url_requirement, key_from_ireq
+from .writer import get_required_by
+
+GRAPH_FORMAT_VERSION = 1
+
+# The data of a package in the graph:
+#
+# - ``version``: the pinned version, or ``None`` for a URL or an editable
+# - ``url``: the URL of a URL or an editable requirement, or ``None``
+# - ``required_by``: the packages and the source files requiring the package
+# - ``dependencies``: the requirements of the package on the other packages of
+#   the graph, as a ``specifier`` and ``markers``, or as a ``url``
+# - ``metadata_sha256``: the hash of the metadata of the package, if known
+Package = dict[str, _t.Any]
+
+
+@dataclass
+class GraphRecord:
+    """
+    What the resolver saves of a resolved package for the graph: the
+    requirements of the package on the other resolved packages, by key, and
+    the hash of its metadata, if known.
+    """
+
+    dependencies: dict[str, dict[str, str | None]] = field(default_factory=dict)
+    metadata_sha256: str | None = None
+
+
+def get_graph_path(output_path: str) -> str:
+    """Return the path of the graph of the given output file."""
+    return f"{output_path}.graph.json"
+
+
+def build_graph(
+    results: Iterable[InstallRequirement],
+    records: dict[str, GraphRecord],
+    previous: dict[str, Package],
+) -> dict[str, Package]:
+    """
+    Build the graph of the given resolved install requirements.
+
+    :param results: the resolved install requirements
+    :param records: the records the resolver saved of the resolved packages,
+        by key
+    :param previous: the graph of the previous compile, which describes the
+        packages an incremental resolution kept
+    :return: the data of each package, by key
+    """
+    graph = {}
+    for ireq in results:
+        key = key_from_ireq(ireq)
+        record = records.get(key)
+        package: Package = {
+            "version": as_tuple(ireq)[1] if is_pinned_requirement(ireq) else None,
+            "url": (
+                ireq.link.url
+                if ireq.link is not None and is_url_requirement(ireq)
+                else None
+            ),
+            "required_by": sorted(get_required_by(ireq)),
+            "dependencies": None,
+            "metadata_sha256": None,
+        }
+        if record is not None:
+            package["dependencies"] = record.dependencies
+            package["metadata_sha256"] = record.metadata_sha256
+        else:
+            previous_package = previous.get(key, {})
+            if previous_package.get("version") == package["version"]:
+                package["dependencies"] = previous_package.get("dependencies")
+                package["metadata_sha256"] = previous_package.get("metadata_sha256")
+        if package["dependencies"] is None:
+            package["dependencies"] = {}
+        graph[key] = package
+    return graph
+
+
+def write_graph(path: str, graph: dict[str, Package]) -> None:
+    """Write a graph to the given path."""
+    with open(path, "w", encoding="utf-8") as graph_file:
+        json.dump(
+            {"version": GRAPH_FORMAT_VERSION, "packages": graph},
+            graph_file,
+            indent=2,
+            sort_keys=True,
+        )
+        graph_file.write("\n")
+
+
+def read_graph(path: str) -> dict[str, Package] | None:
+    """Read the graph at the given path, returning ``None`` if there is none."""
+    try:
+        with open(path, encoding="utf-8") as graph_file:
+            data = json.load(graph_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log.debug(f"Ignoring the graph {path}: {e}")
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != GRAPH_FORMAT_VERSION:
+        log.debug(f"Ignoring the graph {path} of another format")
+        return None
+    return _t.cast(dict[str, Package], data["packages"])
+
+
+def get_graph_required_by(
+    graph: dict[str, Package], existing_pins: dict[str, InstallRequirement]
+) -> dict[str, set[str]] | None:
+    """
+    Return what requires each package of a graph, or ``None`` if the graph does
+    not describe the given pins of the output file, e.g. because the output
+    file was edited since the graph was written.
+    """
+    for key, ireq in existing_pins.items():
+        if graph.get(key, {}).get("version") != as_tuple(ireq)[1]:
+            return None
+    return {key: set(package["required_by"]) for key, package in graph.items()}
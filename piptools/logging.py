@@ -3,6 +3,7 @@ from __future__ import annotations
 import contextlib
 import logging
 import sys
+import threading
 import typing as _t
 from collections.abc import Iterator
 
@@ -20,6 +21,9 @@ class LogContext:
         self.verbosity = self._initial_verbosity = verbosity
         self.current_indent = self._initial_indent = 0
         self._indent_width = self._initial_indent_width = indent_width
+        # Indentation may be changed from several threads at once, e.g. while
+        # generating hashes concurrently
+        self._indent_lock = threading.Lock()
 
     def log(self, message: str, *args: _t.Any, **kwargs: _t.Any) -> None:
         kwargs.setdefault("err", True)
@@ -43,10 +47,12 @@ class LogContext:
         self.log(message, *args, **kwargs)
 
     def _indent(self) -> None:
-        self.current_indent += self._indent_width
+        with self._indent_lock:
+            self.current_indent += self._indent_width
 
     def _dedent(self) -> None:
-        self.current_indent -= self._indent_width
+        with self._indent_lock:
+            self.current_indent -= self._indent_width
 
     @contextlib.contextmanager
     def indentation(self) -> Iterator[None]:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from .local import LocalRequirementsRepository
+from .pool import RepositoryPool
 from .pypi import PyPIRepository
 
-__all__ = ["LocalRequirementsRepository", "PyPIRepository"]
+__all__ = ["LocalRequirementsRepository", "PyPIRepository", "RepositoryPool"]
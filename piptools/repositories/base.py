@@ -2,15 +2,19 @@ from __future__ import annotations
 
 import optparse
 from abc import ABCMeta, abstractmethod
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from contextlib import contextmanager
 
 from pip._internal.commands.install import InstallCommand
 from pip._internal.index.package_finder import PackageFinder
+from pip._internal.models.candidate import InstallationCandidate
 from pip._internal.models.index import PyPI
 from pip._internal.network.session import PipSession
 from pip._internal.req import InstallRequirement
 
+from ..cache import MetadataCache
+from ..utils import WheelTagFilter
+
 
 class BaseRepository(metaclass=ABCMeta):
     DEFAULT_INDEX_URL = PyPI.simple_url
@@ -18,6 +22,35 @@ class BaseRepository(metaclass=ABCMeta):
     def clear_caches(self) -> None:
         """Should clear any caches used by the implementation."""
 
+    def prefetch(self, project_names: Iterable[str], max_workers: int) -> None:
+        """
+        May look up the candidates of the given projects ahead of time, using up to
+        ``max_workers`` threads, so that resolving does not have to wait for them.
+        """
+
+    @contextmanager
+    def prefetch_metadata(
+        self,
+        ireqs: Iterable[InstallRequirement],
+        metadata_cache: MetadataCache,
+        max_workers: int,
+    ) -> Iterator[None]:
+        """
+        May store the metadata of the given pinned requirements in the metadata
+        cache in the background while in this context, using up to
+        ``max_workers`` threads.
+        """
+        yield
+
+    def get_cached_candidates(
+        self, project_name: str
+    ) -> list[InstallationCandidate] | None:
+        """
+        Return the candidates of the given project if they were already looked
+        up, e.g. by :meth:`prefetch`, without looking them up otherwise.
+        """
+        return None
+
     @abstractmethod
     def find_best_match(
         self, ireq: InstallRequirement, prereleases: bool | None
@@ -36,18 +69,29 @@ class BaseRepository(metaclass=ABCMeta):
         """
 
     @abstractmethod
-    def get_hashes(self, ireq: InstallRequirement) -> set[str]:
+    def get_hashes(
+        self,
+        ireq: InstallRequirement,
+        all_platforms: bool = False,
+        wheel_tag_filter: WheelTagFilter | None = None,
+    ) -> set[str]:
         """
         Given a pinned InstallRequirement, returns a set of hashes that represent
         all of the files for a given requirement. It is not acceptable for an
         editable or unpinned requirement to be passed to this function.
+
+        :param all_platforms: whether to hash the wheels of all platforms and
+            Python versions, without changing what the other calls find, so
+            that this may be called by several threads at once
+        :param wheel_tag_filter: with ``all_platforms``, only hash the wheels
+            with a tag accepted by this filter, besides the source distributions
         """
 
     @abstractmethod
     @contextmanager
     def allow_all_wheels(self) -> Iterator[None]:
         """
-        Monkey patches pip.Wheel to allow wheels from all platforms and Python versions.
+        Hash the wheels of all platforms and Python versions in this context.
         """
 
     @property
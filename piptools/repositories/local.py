@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import optparse
 import typing as _t
-from collections.abc import Iterator, Mapping
+from collections.abc import Iterable, Iterator, Mapping
 from contextlib import contextmanager
 
 from pip._internal.commands.install import InstallCommand
@@ -13,7 +13,8 @@ from pip._internal.req import InstallRequirement
 from pip._internal.utils.hashes import FAVORITE_HASH
 
 from .._internal import _pip_api
-from ..utils import as_tuple, key_from_ireq
+from ..cache import MetadataCache
+from ..utils import WheelTagFilter, as_tuple, key_from_ireq
 from .base import BaseRepository
 
 
@@ -72,6 +73,26 @@ class LocalRequirementsRepository(BaseRepository):
     def clear_caches(self) -> None:
         self.repository.clear_caches()
 
+    def prefetch(self, project_names: Iterable[str], max_workers: int) -> None:
+        self.repository.prefetch(project_names, max_workers=max_workers)
+
+    @contextmanager
+    def prefetch_metadata(
+        self,
+        ireqs: Iterable[InstallRequirement],
+        metadata_cache: MetadataCache,
+        max_workers: int,
+    ) -> Iterator[None]:
+        with self.repository.prefetch_metadata(
+            ireqs, metadata_cache, max_workers=max_workers
+        ):
+            yield
+
+    def get_cached_candidates(
+        self, project_name: str
+    ) -> list[InstallationCandidate] | None:
+        return self.repository.get_cached_candidates(project_name)
+
     def find_best_match(
         self, ireq: InstallRequirement, prereleases: bool | None = None
     ) -> InstallationCandidate:
@@ -86,7 +107,12 @@ class LocalRequirementsRepository(BaseRepository):
     def get_dependencies(self, ireq: InstallRequirement) -> set[InstallRequirement]:
         return self.repository.get_dependencies(ireq)
 
-    def get_hashes(self, ireq: InstallRequirement) -> set[str]:
+    def get_hashes(
+        self,
+        ireq: InstallRequirement,
+        all_platforms: bool = False,
+        wheel_tag_filter: WheelTagFilter | None = None,
+    ) -> set[str]:
         existing_pin = self._reuse_hashes and self.existing_pins.get(
             key_from_ireq(ireq)
         )
@@ -97,7 +123,7 @@ class LocalRequirementsRepository(BaseRepository):
                 return {
                     ":".join([FAVORITE_HASH, hexdigest]) for hexdigest in hexdigests
                 }
-        return self.repository.get_hashes(ireq)
+        return self.repository.get_hashes(ireq, all_platforms, wheel_tag_filter)
 
     @contextmanager
     def allow_all_wheels(self) -> Iterator[None]:
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import time
+import typing as _t
+
+from .._internal import _pip_api
+from ..logging import log
+from ..utils import omit_list_value
+from .pypi import PyPIRepository
+
+
+class RepositoryPool:
+    """
+    Keeps the PyPIRepository of each finished compile, so that a long-lived
+    process can hand it, with its session, finder and in-memory caches, over
+    to the next compile using the same pip arguments.
+
+    A repository is kept only if the compile left its finder and options as
+    they were, as the options in a requirements file reconfigure these, and
+    only for ``ttl`` seconds, after which the index data it holds is refetched.
+    The repositories the pool drops are closed.
+
+    The pool is meant for one compile at a time, and is not thread-safe.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._idle: dict[_t.Hashable, tuple[PyPIRepository, float]] = {}
+        self._in_use: dict[int, tuple[_t.Hashable, float, _t.Hashable]] = {}
+
+    def acquire(
+        self,
+        pip_args: list[str],
+        cache_dir: str,
+        hash_jobs: int = 1,
+        fresh: bool = False,
+    ) -> PyPIRepository:
+        """
+        Return a repository for the given arguments, reusing an idle one unless
+        it expired or ``fresh`` is true.
+        """
+        self._drop_expired()
+        key = _get_key(pip_args, cache_dir, hash_jobs)
+        idle = self._idle.pop(key, None)
+        if idle is not None and fresh:
+            idle[0].close()
+            idle = None
+        if idle is not None:
+            repository, created = idle
+            log.debug("Reusing the repository of a previous compile")
+            repository.hash_sources.clear()
+            repository.hash_bytes_not_downloaded = 0
+            repository.dependencies_cache_hits = 0
+            repository.dependencies_cache_misses = 0
+            # Editable and local requirements may have changed since
+            repository._dependencies_cache.clear()
+        else:
+            repository = PyPIRepository(
+                pip_args, cache_dir=cache_dir, hash_jobs=hash_jobs
+            )
+            created = time.monotonic()
+
+        self._in_use[id(repository)] = (key, created, _get_state(repository))
+        return repository
+
+    def release(self, repository: PyPIRepository) -> None:
+        """Make a repository returned by :meth:`acquire` available again."""
+        key, created, state = self._in_use.pop(id(repository))
+        if _get_state(repository) != state:
+            log.debug("Not reusing a repository reconfigured by a requirements file")
+            repository.close()
+            return
+        self._idle[key] = (repository, created)
+
+    def clear(self) -> None:
+        """Drop the idle repositories."""
+        for repository, _ in self._idle.values():
+            repository.close()
+        self._idle.clear()
+
+    def _drop_expired(self) -> None:
+        """Drop the idle repositories kept for longer than ``ttl`` seconds."""
+        now = time.monotonic()
+        for key, (repository, created) in list(self._idle.items()):
+            if now - created >= self.ttl:
+                repository.close()
+                del self._idle[key]
+
+
+def _get_key(pip_args: list[str], cache_dir: str, hash_jobs: int) -> _t.Hashable:
+    # pip reads its configuration from the environment as well, and resolves
+    # relative paths, e.g. of --find-links, from the working directory
+    pip_environ = sorted(
+        (name, value) for name, value in os.environ.items() if name.startswith("PIP_")
+    )
+    return (tuple(pip_args), cache_dir, hash_jobs, os.getcwd(), tuple(pip_environ))
+
+
+def _get_state(repository: PyPIRepository) -> _t.Hashable:
+    """Return the parts of a repository that options in requirements files change."""
+    finder = repository.finder
+    options = repository.options
+    return (
+        tuple(finder.index_urls),
+        tuple(finder.find_links),
+        tuple(finder.trusted_hosts),
+        _pip_api.finder_allows_all_prereleases(finder),
+        finder.prefer_binary,
+        frozenset(finder.format_control.no_binary),
+        frozenset(finder.format_control.only_binary),
+        options.require_hashes,
+        # the resolvers switch the other resolver off in the options, the same
+        # way for every compile of a key, and a requirements file can't set these
+        tuple(omit_list_value(options.features_enabled, "2020-resolver")),
+    )
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-import contextlib
 import hashlib
+import io
 import itertools
+import mmap
 import optparse
 import os
+import threading
+import time
 import typing as _t
 import urllib.parse
-from collections.abc import Iterator
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from shutil import rmtree
 
@@ -18,7 +24,6 @@ from pip._internal.commands.install import InstallCommand
 from pip._internal.index.package_finder import PackageFinder
 from pip._internal.models.candidate import InstallationCandidate
 from pip._internal.models.link import Link
-from pip._internal.models.wheel import Wheel
 from pip._internal.network.session import PipSession
 from pip._internal.operations.build.build_tracker import get_build_tracker
 from pip._internal.req import InstallRequirement, RequirementSet
@@ -27,30 +32,122 @@ from pip._internal.utils.logging import indent_log, setup_logging
 from pip._internal.utils.misc import normalize_path
 from pip._internal.utils.temp_dir import TempDirectory, global_tempdir_manager
 from pip._internal.utils.urls import path_to_url, url_to_path
-from pip._vendor.packaging.tags import Tag
-from pip._vendor.packaging.version import _BaseVersion
+from pip._vendor.packaging.specifiers import Specifier, SpecifierSet
+from pip._vendor.packaging.version import InvalidVersion, Version, _BaseVersion
 from pip._vendor.requests import Session
 
-from .._compat import create_wheel_cache
+from .._compat import canonicalize_name, create_wheel_cache
 from .._internal import _pip_api
+from ..cache import HashCache, MetadataCache, ProjectCache
 from ..exceptions import NoCandidateFound
 from ..logging import log
 from ..utils import (
+    WheelTagFilter,
     as_tuple,
     is_pinned_requirement,
     is_url_requirement,
+    key_from_ireq,
     lookup_table,
 )
 from .base import BaseRepository
 
-FILE_CHUNK_SIZE = 4096
+FILE_CHUNK_SIZE = 1024 * 1024
+
+# Minimum number of seconds between two updates of a progress bar
+PROGRESS_UPDATE_INTERVAL = 0.1
 
 
 class FileStream(_t.NamedTuple):
-    stream: _t.BinaryIO
+    stream: io.BufferedIOBase
     size: float | None
 
 
+class VersionIndex:
+    """
+    The candidates of a project grouped by version, with the versions sorted
+    once, so that the versions matching a specifier are narrowed down by
+    bisection instead of checking the version of every candidate.
+    """
+
+    def __init__(self, candidates: list[InstallationCandidate]) -> None:
+        self.candidates = candidates
+        self._candidates_by_version = _t.cast(
+            dict[Version, set[InstallationCandidate]],
+            lookup_table(candidates, key=candidate_version),
+        )
+        self._positions = {
+            version: position
+            for position, version in enumerate(self._candidates_by_version)
+        }
+        # Specifiers mostly ignore the local labels of the versions, so the
+        # versions are sorted and looked up by their public version
+        self._versions_by_public_version: dict[Version, list[Version]] = {}
+        for version in self._candidates_by_version:
+            self._versions_by_public_version.setdefault(
+                _get_public_version(version), []
+            ).append(version)
+        self._public_versions = sorted(self._versions_by_public_version)
+
+    def __getitem__(self, version: Version) -> set[InstallationCandidate]:
+        return self._candidates_by_version[version]
+
+    def filter(
+        self, specifier: SpecifierSet, prereleases: bool | None = None
+    ) -> list[Version]:
+        """
+        Return the versions matching the given specifier, as
+        ``specifier.filter()`` returns them from the versions of all the
+        candidates, in the order of the candidates.
+        """
+        versions = self._get_versions_within_bounds(specifier)
+        if versions is None:
+            versions = list(self._candidates_by_version)
+        elif not versions:
+            return []
+        else:
+            matching_versions = list(specifier.filter(versions, prereleases))
+            # Without a final release matching, the prereleases matching may
+            # depend on the versions out of the bounds of the specifier
+            if any(not version.is_prerelease for version in matching_versions):
+                return sorted(matching_versions, key=self._positions.__getitem__)
+            versions = list(self._candidates_by_version)
+        return list(specifier.filter(versions, prereleases))
+
+    def _get_versions_within_bounds(
+        self, specifier: SpecifierSet
+    ) -> list[Version] | None:
+        """
+        Return the versions within the bounds set by the given specifier, which
+        include all the versions it matches, or ``None`` if it sets none.
+        """
+        lower, upper = 0, len(self._public_versions)
+        for spec in specifier:
+            if not isinstance(spec, Specifier) or spec.version.endswith(".*"):
+                continue
+            try:
+                version = Version(spec.version)
+            except InvalidVersion:
+                continue
+            if spec.operator == "==":
+                return self._versions_by_public_version.get(
+                    _get_public_version(version), []
+                )
+            elif spec.operator in {">=", ">", "~="}:
+                lower = max(lower, bisect_left(self._public_versions, version))
+            elif spec.operator == "<":
+                upper = min(upper, bisect_left(self._public_versions, version))
+            elif spec.operator == "<=":
+                upper = min(upper, bisect_right(self._public_versions, version))
+
+        if (lower, upper) == (0, len(self._public_versions)):
+            return None
+        return [
+            version
+            for public_version in self._public_versions[lower:upper]
+            for version in self._versions_by_public_version[public_version]
+        ]
+
+
 class PyPIRepository(BaseRepository):
     HASHABLE_PACKAGE_TYPES = {"bdist_wheel", "sdist"}
 
@@ -61,7 +158,7 @@ class PyPIRepository(BaseRepository):
     changed/configured on the Finder.
     """
 
-    def __init__(self, pip_args: list[str], cache_dir: str):
+    def __init__(self, pip_args: list[str], cache_dir: str, hash_jobs: int = 1):
         # Use pip's parser for pip.conf management and defaults.
         # General options (find_links, index_url, extra_index_url, trusted_host,
         # and pre) are deferred to pip.
@@ -87,15 +184,61 @@ class PyPIRepository(BaseRepository):
         # project
         self._available_candidates_cache: dict[str, list[InstallationCandidate]] = {}
 
-        # stores InstallRequirement => list(InstallRequirement) mappings
-        # of all secondary dependencies for the given requirement, so we
-        # only have to go to disk once for each requirement
-        self._dependencies_cache: dict[InstallRequirement, set[InstallRequirement]] = {}
+        # stores index page URL => list(Link) mappings of the links found on
+        # each index page, which do not depend on the wheels allowed, so that
+        # the candidates can be found again for all wheels without fetching
+        # the pages again
+        self._index_page_links: dict[str, list[Link]] = {}
+        _pip_api.keep_index_page_links(self.finder, self._index_page_links)
+
+        # stores (project_name, wheel_tag_filter) => InstallationCandidate
+        # mappings for the versions of all platforms and Python versions, or
+        # of the ones of the filter, which are hashed
+        self._all_platforms_candidates_cache: dict[
+            tuple[str, WheelTagFilter | None], list[InstallationCandidate]
+        ] = {}
+        self._allow_all_wheels = False
+
+        # stores (project_name, all_platforms, wheel_tag_filter) => VersionIndex
+        # mappings of the candidates above, so that their versions are only
+        # sorted once
+        self._version_indexes: dict[
+            tuple[str, bool, WheelTagFilter | None], VersionIndex
+        ] = {}
+
+        # stores (name, version or URL, extras) => list(InstallRequirement)
+        # mappings of all secondary dependencies for the given requirement, so
+        # we only have to go to disk once for each requirement, however many
+        # InstallRequirement objects stand for it
+        self._dependencies_cache: dict[
+            tuple[str, str, tuple[str, ...]], set[InstallRequirement]
+        ] = {}
+        self.dependencies_cache_hits = 0
+        self.dependencies_cache_misses = 0
+
+        # Files which need to be downloaded to compute their hashes are
+        # fetched concurrently when more than one hash job is allowed
+        self._hash_jobs = hash_jobs
+        self._hash_executor: ThreadPoolExecutor | None = None
+
+        # Statistics of where the hashes of package files came from
+        self.hash_sources: Counter[str] = Counter()
+        self.hash_bytes_not_downloaded = 0
+        self._hash_statistics_lock = threading.Lock()
 
         # Setup file paths
         self._cache_dir = normalize_path(str(cache_dir))
         self._download_dir = os.path.join(self._cache_dir, "pkgs")
 
+        # Stores the hashes of package files, so that files which the index
+        # reports no hash for are only downloaded and hashed once
+        self._hash_cache = HashCache(os.path.join(self._cache_dir, "hashes"))
+
+        # Stores the hashes of the release files listed by the JSON API of the
+        # indexes, so that the large project pages are only fetched again
+        # when a release is missing from them, and then revalidated
+        self._project_cache = ProjectCache(self._cache_dir)
+
         # Default pip's logger is noisy, so decrease it's verbosity
         setup_logging(
             verbosity=log.verbosity - 1,
@@ -105,6 +248,18 @@ class PyPIRepository(BaseRepository):
 
     def clear_caches(self) -> None:
         rmtree(self._download_dir, ignore_errors=True)
+        self._hash_cache.clear()
+        self._project_cache.clear()
+
+    def close(self) -> None:
+        """
+        Stop the threads computing hashes, and close the connection to the
+        project cache. The repository must not be used afterwards.
+        """
+        if self._hash_executor is not None:
+            self._hash_executor.shutdown()
+            self._hash_executor = None
+        self._project_cache.close()
 
     @property
     def options(self) -> optparse.Values:
@@ -118,30 +273,183 @@ class PyPIRepository(BaseRepository):
     def finder(self) -> PackageFinder:
         return self._finder
 
-    def _clear_finder_cache(self) -> None:
-        """Clear the cache of installation candidates."""
-        # `finder.find_all_candidates` is an lru_cache wrapped method on older `pip`
-        # versions, which can be cleared with `cache_clear()`
-        # but on newer versions, it's a simple method, and the underlying cache is a
-        # dict on the instance
-        # the same holds for `finder.find_best_candidate`
-        if _pip_api.PIP_VERSION_MAJOR_MINOR >= (25, 1):  # pragma: pip>=25.1 cover
-            self.finder._all_candidates.clear()
-            self.finder._best_candidates.clear()
-        else:  # pragma: pip>=25.1 no cover
-            self.finder.find_all_candidates.cache_clear()
-            self.finder.find_best_candidate.cache_clear()
-
     @property
     def command(self) -> InstallCommand:
         """Return an install command instance."""
         return self._command
 
-    def find_all_candidates(self, req_name: str) -> list[InstallationCandidate]:
-        if req_name not in self._available_candidates_cache:
-            candidates = self.finder.find_all_candidates(req_name)
-            self._available_candidates_cache[req_name] = candidates
-        return self._available_candidates_cache[req_name]
+    def find_all_candidates(
+        self,
+        req_name: str,
+        all_platforms: bool = False,
+        wheel_tag_filter: WheelTagFilter | None = None,
+    ) -> list[InstallationCandidate]:
+        """
+        Find all the candidates of a project.
+
+        :param all_platforms: whether to find the wheels of all platforms and
+            Python versions, rather than the ones of the target of the finder
+            (default is :py:data:`False`)
+        :param wheel_tag_filter: with ``all_platforms``, only find the wheels
+            with a tag accepted by this filter
+        """
+        # The candidates are cached, and prefetched, by canonical name
+        project_name = canonicalize_name(req_name)
+        if all_platforms:
+            key = (project_name, wheel_tag_filter)
+            if key not in self._all_platforms_candidates_cache:
+                candidates = _pip_api.find_all_candidates_for_all_platforms(
+                    self.finder, project_name, self._index_page_links, wheel_tag_filter
+                )
+                self._all_platforms_candidates_cache[key] = candidates
+            return self._all_platforms_candidates_cache[key]
+
+        if project_name not in self._available_candidates_cache:
+            candidates = self.finder.find_all_candidates(project_name)
+            self._available_candidates_cache[project_name] = candidates
+        return self._available_candidates_cache[project_name]
+
+    def _get_version_index(
+        self,
+        req_name: str,
+        all_platforms: bool = False,
+        wheel_tag_filter: WheelTagFilter | None = None,
+    ) -> VersionIndex:
+        """
+        Return the version index of the candidates of a project, which is only
+        built again when other candidates are found for the project.
+        """
+        candidates = self.find_all_candidates(req_name, all_platforms, wheel_tag_filter)
+        key = (canonicalize_name(req_name), all_platforms, wheel_tag_filter)
+        version_index = self._version_indexes.get(key)
+        if version_index is None or version_index.candidates is not candidates:
+            version_index = self._version_indexes[key] = VersionIndex(candidates)
+        return version_index
+
+    def get_cached_candidates(
+        self, project_name: str
+    ) -> list[InstallationCandidate] | None:
+        return self._available_candidates_cache.get(canonicalize_name(project_name))
+
+    def prefetch(self, project_names: Iterable[str], max_workers: int) -> None:
+        """
+        Fetch the index pages of the given projects concurrently, so that their
+        candidates are found in the caches of this repository and of its finder
+        when resolving.
+        """
+        project_names = sorted(
+            {canonicalize_name(name) for name in project_names}
+            - self._available_candidates_cache.keys()
+        )
+        if not project_names:
+            return
+
+        log.debug(f"Prefetching the index pages of {len(project_names)} projects")
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pip-tools-prefetch"
+        ) as executor:
+            futures = {
+                name: executor.submit(self.finder.find_all_candidates, name)
+                for name in project_names
+            }
+
+        for name, future in futures.items():
+            try:
+                candidates = future.result()
+            except Exception as e:
+                # Prefetching is only an optimization, the lookup of the project
+                # is retried, and fails properly, when resolving
+                log.debug(f"Prefetching {name} failed: {e}")
+                continue
+            self._available_candidates_cache[name] = candidates
+
+    @contextmanager
+    def prefetch_metadata(
+        self,
+        ireqs: Iterable[InstallRequirement],
+        metadata_cache: MetadataCache,
+        max_workers: int,
+    ) -> Iterator[None]:
+        """
+        Fetch the metadata of the wheels which pip would pick for the given pinned
+        requirements in the background while in this context, and store it in
+        the metadata cache. The fetches not started yet are cancelled on exit.
+
+        Only the metadata files served by the index (PEP 658) are fetched, which
+        are small: a wheel would have to be downloaded in full otherwise, so pip
+        is left to do it. Source distributions are left to pip too, since their
+        metadata has to be built.
+        """
+        # The finder is only used from this thread, the workers only fetch files
+        metadata_links: dict[Link, Link] = {}
+        for ireq in ireqs:
+            if not is_pinned_requirement(ireq) or ireq.link is not None:
+                continue
+            try:
+                links = self._get_wheel_metadata_links(ireq, metadata_cache)
+            except Exception as e:
+                # Prefetching is only an optimization, pip looks the pin up
+                # again, and fails properly, when resolving
+                log.debug(f"Prefetching the metadata of {ireq.name} failed: {e}")
+                continue
+            if links is not None:
+                link, metadata_link = links
+                metadata_links[link] = metadata_link
+        if not metadata_links:
+            yield
+            return
+
+        log.debug(f"Prefetching the metadata of {len(metadata_links)} pins")
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pip-tools-prefetch"
+        )
+        try:
+            for link, metadata_link in metadata_links.items():
+                executor.submit(
+                    self._prefetch_metadata_file, link, metadata_link, metadata_cache
+                )
+            yield
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _get_wheel_metadata_links(
+        self, ireq: InstallRequirement, metadata_cache: MetadataCache
+    ) -> tuple[Link, Link] | None:
+        """
+        Get the link to the wheel which pip would pick for the given pinned
+        requirement, and the link to its metadata file, if the index serves one
+        (PEP 658) and the metadata cache does not have it yet.
+        """
+        best_candidate = self.finder.find_best_candidate(
+            key_from_ireq(ireq), ireq.specifier
+        ).best_candidate
+        if best_candidate is None:
+            return None
+        link = best_candidate.link
+        if not link.is_wheel or link.is_file or metadata_cache.get(link) is not None:
+            return None
+        metadata_link = _pip_api.get_metadata_link(link)
+        if metadata_link is None:
+            return None
+        return link, metadata_link
+
+    def _prefetch_metadata_file(
+        self, link: Link, metadata_link: Link, metadata_cache: MetadataCache
+    ) -> None:
+        """
+        Store the metadata file served by the index for the given wheel in the
+        metadata cache.
+        """
+        try:
+            response = self.session.get(metadata_link.url_without_fragment)
+            response.raise_for_status()
+            if metadata_link.has_hash:
+                metadata_link.as_hashes().check_against_chunks([response.content])
+            metadata_cache.set_metadata_file(link, response.content)
+        except Exception as e:
+            # Prefetching is only an optimization, pip fetches the metadata
+            # again, and fails properly, when resolving
+            log.debug(f"Prefetching the metadata of {link.filename} failed: {e}")
 
     def find_best_match(
         self, ireq: InstallRequirement, prereleases: bool | None = None
@@ -153,27 +461,26 @@ class PyPIRepository(BaseRepository):
         if ireq.editable or is_url_requirement(ireq):
             return ireq  # return itself as the best match
 
-        all_candidates = self.find_all_candidates(ireq.name)
-        candidates_by_version = lookup_table(all_candidates, key=candidate_version)
-        matching_versions = ireq.specifier.filter(
-            (candidate.version for candidate in all_candidates), prereleases=prereleases
-        )
+        assert ireq.name is not None
+        version_index = self._get_version_index(ireq.name)
+        matching_versions = version_index.filter(ireq.specifier, prereleases)
 
         matching_candidates = list(
             itertools.chain.from_iterable(
-                candidates_by_version[ver] for ver in matching_versions
+                version_index[ver] for ver in matching_versions
             )
         )
         if not matching_candidates:
-            raise NoCandidateFound(ireq, all_candidates, self.finder)
+            raise NoCandidateFound(ireq, version_index.candidates, self.finder)
 
         evaluator = self.finder.make_candidate_evaluator(ireq.name)
         best_candidate_result = evaluator.compute_best_candidate(matching_candidates)
         best_candidate = best_candidate_result.best_candidate
 
-        # Turn the candidate into a pinned InstallRequirement
+        # Turn the candidate into a pinned InstallRequirement, named as required
+        # rather than by the canonical name the candidates are found with
         return _pip_api.create_install_requirement(
-            best_candidate.name,
+            ireq.name,
             best_candidate.version,
             ireq,
         )
@@ -238,30 +545,39 @@ class PyPIRepository(BaseRepository):
                 f"Expected url, pinned or editable InstallRequirement, got {ireq}"
             )
 
-        if ireq not in self._dependencies_cache:
-            if ireq.editable and (ireq.source_dir and os.path.exists(ireq.source_dir)):
-                # No download_dir for locally available editable requirements.
-                # If a download_dir is passed, pip will unnecessarily archive
-                # the entire source directory
-                download_dir = None
-            elif ireq.link and ireq.link.is_vcs:
-                # No download_dir for VCS sources.  This also works around pip
-                # using git-checkout-index, which gets rid of the .git dir.
-                download_dir = None
-            else:
-                download_dir = self._get_download_path(ireq)
-                os.makedirs(download_dir, exist_ok=True)
+        cache_key = _get_dependencies_cache_key(ireq)
+        if cache_key is not None and cache_key in self._dependencies_cache:
+            self.dependencies_cache_hits += 1
+            return self._dependencies_cache[cache_key]
+        self.dependencies_cache_misses += 1
+
+        if ireq.editable and (ireq.source_dir and os.path.exists(ireq.source_dir)):
+            # No download_dir for locally available editable requirements.
+            # If a download_dir is passed, pip will unnecessarily archive
+            # the entire source directory
+            download_dir = None
+        elif ireq.link and ireq.link.is_vcs:
+            # No download_dir for VCS sources.  This also works around pip
+            # using git-checkout-index, which gets rid of the .git dir.
+            download_dir = None
+        else:
+            download_dir = self._get_download_path(ireq)
+            os.makedirs(download_dir, exist_ok=True)
 
-            with global_tempdir_manager():
-                wheel_cache = create_wheel_cache(
-                    cache_dir=self._cache_dir,
-                    format_control=self.options.format_control,
-                )
-                self._dependencies_cache[ireq] = self.resolve_reqs(
-                    download_dir, ireq, wheel_cache
-                )
+        with global_tempdir_manager():
+            wheel_cache = create_wheel_cache(
+                cache_dir=self._cache_dir,
+                format_control=self.options.format_control,
+            )
+            dependencies: set[InstallRequirement] = self.resolve_reqs(
+                download_dir, ireq, wheel_cache
+            )
 
-        return self._dependencies_cache[ireq]
+        # An unnamed requirement is named once resolved
+        cache_key = _get_dependencies_cache_key(ireq)
+        if cache_key is not None:
+            self._dependencies_cache[cache_key] = dependencies
+        return dependencies
 
     def _get_project(self, ireq: InstallRequirement) -> _t.Any:
         """
@@ -273,6 +589,17 @@ class PyPIRepository(BaseRepository):
         context. Failed connections, 404s, and non-JSON responses are all treated as
         "no data".
 
+        For a pinned requirement, the files of its release alone are first
+        asked for, from the ``/{name}/{version}/json`` endpoint, which saves
+        fetching the whole project page. The returned dict then only holds
+        this release.
+
+        The hashes of the release files are kept in the project cache. For a
+        pinned requirement whose release is cached, or when the index reports
+        that the cached page is still current, the returned dict is rebuilt
+        from the cache and only holds the ``releases`` of the project, with
+        the ``packagetype``, ``url`` and favorite digest of their files.
+
         API reference: https://warehouse.readthedocs.io/api-reference/json/
         """
         index_base_urls = (
@@ -280,12 +607,26 @@ class PyPIRepository(BaseRepository):
             for index_url in self.finder.search_scope.index_urls
         )
         request_failed_error_types = _pip_api.get_pip_request_failed_exception_types()
+        version = as_tuple(ireq)[1] if is_pinned_requirement(ireq) else None
 
         for index_base_url in index_base_urls:
             json_url = urllib.parse.urljoin(index_base_url, f"{ireq.name}/json")
 
+            if version is not None:
+                release_records = self._project_cache.get_release(json_url, version)
+                if release_records is not None:
+                    return {"releases": {version: _expand_files(release_records)}}
+
+                release_url = urllib.parse.urljoin(
+                    index_base_url, f"{ireq.name}/{version}/json"
+                )
+                release_files = self._get_release_files(release_url, version, json_url)
+                if release_files is not None:
+                    return {"releases": {version: release_files}}
+
+            headers = self._project_cache.conditional_headers(json_url) or {}
             try:
-                response = self.session.get(json_url)
+                response = self.session.get(json_url, headers=headers)
             except request_failed_error_types as request_failed_error:
                 log.debug(
                     "Fetch package info from PyPI failed: "
@@ -298,14 +639,100 @@ class PyPIRepository(BaseRepository):
             if response.status_code == 404:
                 continue
 
+            if headers and response.status_code == 304:
+                log.debug(f"Cached package info is up to date: {json_url}")
+                return {
+                    "releases": {
+                        release_version: _expand_files(release_records)
+                        for release_version, release_records in (
+                            self._project_cache.get_releases(json_url).items()
+                        )
+                    }
+                }
+
             try:
                 data = response.json()
             except ValueError as e:
                 log.debug(f"Cannot parse JSON response from PyPI: {json_url}: {e}")
                 continue
+
+            if response.status_code == 200:
+                self._cache_project(json_url, data, response.headers)
             return data
         return None
 
+    def _get_release_files(
+        self, release_url: str, version: str, json_url: str
+    ) -> list[_t.Any] | None:
+        """
+        Return the files of a single release from its page ``release_url`` in
+        the JSON API of an index, and store their hashes in the project cache
+        under the project page ``json_url``. Return None if the index does not
+        serve the release on its own.
+        """
+        try:
+            response = self.session.get(release_url)
+        except _pip_api.get_pip_request_failed_exception_types() as error:
+            log.debug(f"Fetch release info from PyPI failed: {release_url}: {error}")
+            return None
+
+        if response.status_code != 200:
+            return None
+
+        try:
+            release_files = response.json()["urls"]
+        except (ValueError, KeyError, TypeError):
+            log.debug(f"Cannot read release files from PyPI: {release_url}")
+            return None
+        if not isinstance(release_files, list):
+            return None
+
+        self._project_cache.set_release(
+            json_url, version, self._compact_files(release_files)
+        )
+        return release_files
+
+    def _cache_project(
+        self, json_url: str, data: _t.Any, headers: _t.Mapping[str, str]
+    ) -> None:
+        """Store the hashes of the release files of a project page in the cache."""
+        try:
+            releases = {
+                version: self._compact_files(release_files)
+                for version, release_files in data["releases"].items()
+            }
+        except (AttributeError, KeyError, TypeError):
+            log.debug(f"Missing releases in package info from PyPI: {json_url}")
+            return
+
+        self._project_cache.set(
+            json_url,
+            releases,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+
+    def _compact_files(self, release_files: _t.Any) -> list[list[_t.Any]]:
+        """
+        Return the ``[packagetype, url, digest, size]`` records of the hashable
+        files of a release, where the size is optional. Releases with files
+        missing any of the other fields are recorded without files, as
+        :py:meth:`_get_hashes_from_pypi` ignores them.
+        """
+        try:
+            return [
+                [
+                    file_["packagetype"],
+                    file_["url"],
+                    file_["digests"][FAVORITE_HASH],
+                    _file_size(file_),
+                ]
+                for file_ in release_files
+                if file_["packagetype"] in self.HASHABLE_PACKAGE_TYPES
+            ]
+        except (KeyError, TypeError):
+            return []
+
     def _get_download_path(self, ireq: InstallRequirement) -> str:
         """
         Determine the download dir location in a way which avoids name
@@ -321,11 +748,22 @@ class PyPIRepository(BaseRepository):
         else:
             return self._download_dir
 
-    def get_hashes(self, ireq: InstallRequirement) -> set[str]:
+    def get_hashes(
+        self,
+        ireq: InstallRequirement,
+        all_platforms: bool = False,
+        wheel_tag_filter: WheelTagFilter | None = None,
+    ) -> set[str]:
         """
         Given an InstallRequirement, return a set of hashes that represent all
         of the files for a given requirement. Unhashable requirements return an
         empty set. Unpinned requirements raise a TypeError.
+
+        :param all_platforms: whether to hash the wheels of all platforms and
+            Python versions, rather than the ones of the target of the finder
+            (default is :py:data:`False`)
+        :param wheel_tag_filter: with ``all_platforms``, only hash the wheels
+            with a tag accepted by this filter, besides the source distributions
         """
 
         if ireq.link:
@@ -346,7 +784,9 @@ class PyPIRepository(BaseRepository):
                     cached_link = Link(path_to_url(cached_path))
                 else:
                     cached_link = link
-                return {self._get_file_hash(cached_link)}
+                # The content behind a URL requirement may change at any time,
+                # so only the hashes of local files are looked up in the cache
+                return {self._get_file_hash(cached_link, cache=cached_link.is_file)}
 
         if not is_pinned_requirement(ireq):
             raise TypeError(f"Expected pinned requirement, got {ireq}")
@@ -354,32 +794,87 @@ class PyPIRepository(BaseRepository):
         log.debug(ireq.name)
 
         with log.indentation():
-            return self._get_req_hashes(ireq)
+            return self._get_req_hashes(
+                ireq, all_platforms or self._allow_all_wheels, wheel_tag_filter
+            )
 
-    def _get_req_hashes(self, ireq: InstallRequirement) -> set[str]:
+    def _get_req_hashes(
+        self,
+        ireq: InstallRequirement,
+        all_platforms: bool,
+        wheel_tag_filter: WheelTagFilter | None,
+    ) -> set[str]:
         """
-        Collects the hashes for all candidates satisfying the given InstallRequirement. Computes
-        the hashes for the candidates that don't have one reported by their index.
+        Collects the hashes for all candidates satisfying the given InstallRequirement.
+
+        The hashes are taken from the links to the candidates, as given by their
+        index, then from the PyPI JSON API. Only the files of the candidates
+        that have neither are hashed, which may require downloading them.
         """
-        matching_candidates = self._get_matching_candidates(ireq)
-        pypi_hashes_by_link = self._get_hashes_from_pypi(ireq)
-        pypi_hashes = {
-            pypi_hashes_by_link[candidate.link.url]
-            for candidate in matching_candidates
-            if candidate.link.url in pypi_hashes_by_link
-        }
-        local_hashes = {
-            self._get_file_hash(candidate.link)
-            for candidate in matching_candidates
-            if candidate.link.url not in pypi_hashes_by_link
-        }
-        return pypi_hashes | local_hashes
+        matching_candidates = self._get_matching_candidates(
+            ireq, all_platforms, wheel_tag_filter
+        )
+        link_hashes = set()
+        links_without_hash = []
+        for candidate in matching_candidates:
+            link_hash = _pip_api.get_link_hash(candidate.link, FAVORITE_HASH)
+            if link_hash is None:
+                links_without_hash.append(candidate.link)
+            else:
+                link_hashes.add(f"{FAVORITE_HASH}:{link_hash}")
+        self._count_hashes(
+            "index links", len(matching_candidates) - len(links_without_hash)
+        )
+        if not links_without_hash:
+            return link_hashes
+
+        pypi_files = self._get_hashes_and_sizes_from_pypi(ireq)
+        pypi_links = [link for link in links_without_hash if link.url in pypi_files]
+        self._count_hashes(
+            "the JSON API",
+            len(pypi_links),
+            bytes_not_downloaded=sum(
+                pypi_files[link.url][1] or 0 for link in pypi_links
+            ),
+        )
+        pypi_hashes = {pypi_files[link.url][0] for link in pypi_links}
+        local_hashes = self._get_file_hashes(
+            link for link in links_without_hash if link.url not in pypi_files
+        )
+        return link_hashes | pypi_hashes | local_hashes
+
+    def _count_hashes(
+        self, source: str, count: int, bytes_not_downloaded: int = 0
+    ) -> None:
+        """
+        Record that the hashes of ``count`` files came from the given source,
+        which saved downloading ``bytes_not_downloaded`` bytes.
+        """
+        if not count:
+            return
+        with self._hash_statistics_lock:
+            self.hash_sources[source] += count
+            self.hash_bytes_not_downloaded += bytes_not_downloaded
 
     def _get_hashes_from_pypi(self, ireq: InstallRequirement) -> dict[str, str]:
         """
         Builds a mapping from the release URLs to their hashes as reported by the PyPI JSON API
         for a given InstallRequirement.
         """
+        return {
+            url: file_hash
+            for url, (file_hash, _) in self._get_hashes_and_sizes_from_pypi(
+                ireq
+            ).items()
+        }
+
+    def _get_hashes_and_sizes_from_pypi(
+        self, ireq: InstallRequirement
+    ) -> dict[str, tuple[str, int | None]]:
+        """
+        Builds a mapping from the release URLs to their hashes and sizes, if given,
+        as reported by the PyPI JSON API for a given InstallRequirement.
+        """
         project = self._get_project(ireq)
         if project is None:
             return {}
@@ -394,7 +889,10 @@ class PyPIRepository(BaseRepository):
 
         try:
             hashes = {
-                file_["url"]: f"{FAVORITE_HASH}:{file_['digests'][FAVORITE_HASH]}"
+                file_["url"]: (
+                    f"{FAVORITE_HASH}:{file_['digests'][FAVORITE_HASH]}",
+                    _file_size(file_),
+                )
                 for file_ in release_files
                 if file_["packagetype"] in self.HASHABLE_PACKAGE_TYPES
             }
@@ -405,7 +903,10 @@ class PyPIRepository(BaseRepository):
         return hashes
 
     def _get_matching_candidates(
-        self, ireq: InstallRequirement
+        self,
+        ireq: InstallRequirement,
+        all_platforms: bool,
+        wheel_tag_filter: WheelTagFilter | None = None,
     ) -> set[InstallationCandidate]:
         """
         Returns all candidates that satisfy the given InstallRequirement.
@@ -413,79 +914,82 @@ class PyPIRepository(BaseRepository):
         # We need to get all of the candidates that match our current version
         # pin, these will represent all of the files that could possibly
         # satisfy this constraint.
-        all_candidates = self.find_all_candidates(ireq.name)
-        candidates_by_version = lookup_table(all_candidates, key=candidate_version)
-        matching_versions = list(
-            ireq.specifier.filter(candidate.version for candidate in all_candidates)
+        assert ireq.name is not None
+        version_index = self._get_version_index(
+            ireq.name, all_platforms, wheel_tag_filter
         )
-        return candidates_by_version[matching_versions[0]]
+        matching_versions = version_index.filter(ireq.specifier)
+        return version_index[matching_versions[0]]
+
+    def _get_file_hashes(self, links: Iterable[Link]) -> set[str]:
+        """
+        Compute the hashes of the given links, downloading several files at once
+        if more than one hash job is allowed.
+        """
+        links = sorted(links, key=lambda link: link.url)
+        if self._hash_jobs <= 1 or len(links) <= 1:
+            return {self._get_file_hash(link) for link in links}
+
+        if self._hash_executor is None:
+            self._hash_executor = ThreadPoolExecutor(
+                max_workers=self._hash_jobs, thread_name_prefix="pip-tools-hash"
+            )
+        return set(self._hash_executor.map(self._get_file_hash, links))
+
+    def _get_file_hash(self, link: Link, cache: bool = True) -> str:
+        """
+        Return the hash of the file behind the given link.
+
+        :param cache: whether the hash may be looked up in, and stored to, the
+            persistent hash cache (default is :py:data:`True`)
+        """
+        if cache:
+            cached_hash = self._hash_cache.get(link)
+            if cached_hash is not None:
+                self._count_hashes("the hash cache", 1)
+                return cached_hash
 
-    def _get_file_hash(self, link: Link) -> str:
         log.debug(f"Hashing {link.show_url}")
-        h = hashlib.new(FAVORITE_HASH)
         with open_local_or_remote_file(link, self.session) as f:
-            # Chunks to iterate
-            chunks = iter(lambda: f.stream.read(FILE_CHUNK_SIZE), b"")
-
-            # Choose a context manager depending on verbosity
-            context_manager: _t.ContextManager[Iterator[bytes]]
-            if log.verbosity >= 1:
-                iter_length = int(f.size / FILE_CHUNK_SIZE) if f.size else None
+            # Progress bars of concurrent downloads would overwrite each other,
+            # so these only report the file being hashed.
+            if log.verbosity >= 1 and self._hash_jobs <= 1 and f.size:
                 bar_template = f"{' ' * log.current_indent}  |%(bar)s| %(info)s"
-                context_manager = progressbar(
-                    chunks,
-                    length=iter_length,
+                with progressbar(
+                    length=int(f.size),
                     # Make it look like default pip progress bar
                     fill_char="█",
                     empty_char=" ",
                     bar_template=bar_template,
                     width=32,
-                )
+                ) as bar:
+                    with _throttled(bar.update) as progress:
+                        file_hash = hash_stream(f.stream, progress)
+            elif link.is_file:
+                file_hash = hash_local_file(f.stream)
             else:
-                context_manager = contextlib.nullcontext(chunks)
+                file_hash = hash_stream(f.stream)
 
-            # Iterate over the chosen context manager
-            with context_manager as bar:
-                for chunk in bar:
-                    h.update(chunk)
-        return ":".join([FAVORITE_HASH, h.hexdigest()])
+        self._count_hashes("local files" if link.is_file else "downloads", 1)
+        if cache:
+            self._hash_cache.set(link, file_hash)
+        return file_hash
 
     @contextmanager
     def allow_all_wheels(self) -> Iterator[None]:
         """
-        Monkey patches pip.Wheel to allow wheels from all platforms and Python versions.
+        Hash the wheels of all platforms and Python versions in this context,
+        as with the ``all_platforms`` argument of :py:meth:`get_hashes`.
 
-        This also saves the candidate cache and set a new one, or else the results from
-        the previous non-patched calls will interfere.
+        Only this repository is changed, not pip, so that the other
+        repositories may be used at the same time.
         """
-
-        def _wheel_supported(self: Wheel, tags: list[Tag]) -> bool:
-            # Ignore current platform. Support everything.
-            return True
-
-        def _wheel_support_index_min(self: Wheel, tags: list[Tag]) -> int:
-            # All wheels are equal priority for sorting.
-            return 0
-
-        original_wheel_supported = Wheel.supported
-        original_support_index_min = Wheel.support_index_min
-        original_cache = self._available_candidates_cache
-
-        Wheel.supported = _wheel_supported
-        Wheel.support_index_min = _wheel_support_index_min
-        self._available_candidates_cache = {}
-
-        # Finder internally caches results. If we don't clear this cache then it can
-        # contain results from an earlier call when allow_all_wheels wasn't active.
-        # See GH-1532
-        self._clear_finder_cache()
-
+        allow_all_wheels = self._allow_all_wheels
+        self._allow_all_wheels = True
         try:
             yield
         finally:
-            Wheel.supported = original_wheel_supported
-            Wheel.support_index_min = original_support_index_min
-            self._available_candidates_cache = original_cache
+            self._allow_all_wheels = allow_all_wheels
 
 
 @contextmanager
@@ -527,10 +1031,115 @@ def open_local_or_remote_file(link: Link, session: Session) -> Iterator[FileStre
             response.close()
 
 
+def hash_stream(
+    stream: io.BufferedIOBase, progress: _t.Callable[[int], None] | None = None
+) -> str:
+    """
+    Return the hash of the content of the given stream.
+
+    The stream is read in large chunks, into a single reused buffer.
+
+    :param progress: a callback given the number of bytes read after each chunk
+    """
+    h = hashlib.new(FAVORITE_HASH)
+    buffer = bytearray(FILE_CHUNK_SIZE)
+    view = memoryview(buffer)
+    while size := stream.readinto(buffer):
+        h.update(view[:size])
+        if progress is not None:
+            progress(size)
+    return f"{FAVORITE_HASH}:{h.hexdigest()}"
+
+
+def hash_local_file(file: io.BufferedIOBase) -> str:
+    """
+    Return the hash of the content of the given local file.
+
+    The file is mapped into memory and hashed in one go, without copying its
+    content. Files which cannot be mapped, such as empty ones, are read instead.
+    """
+    try:
+        mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return hash_stream(file)
+
+    with mapped_file:
+        h = hashlib.new(FAVORITE_HASH, mapped_file)
+    return f"{FAVORITE_HASH}:{h.hexdigest()}"
+
+
+@contextmanager
+def _throttled(
+    update: _t.Callable[[int], None],
+) -> Iterator[_t.Callable[[int], None]]:
+    """
+    Wrap a progress callback so that it is called at most once every
+    ``PROGRESS_UPDATE_INTERVAL`` seconds with the steps made since its last
+    call. The remaining steps are reported on exit.
+    """
+    pending = 0
+    last_update = time.monotonic()
+
+    def progress(steps: int) -> None:
+        nonlocal pending, last_update
+        pending += steps
+        now = time.monotonic()
+        if now - last_update >= PROGRESS_UPDATE_INTERVAL:
+            update(pending)
+            pending = 0
+            last_update = now
+
+    yield progress
+    if pending:
+        update(pending)
+
+
+def _expand_files(release_records: list[list[_t.Any]]) -> list[dict[str, _t.Any]]:
+    """Turn cached release file records back into JSON API file entries."""
+    return [
+        {
+            "packagetype": packagetype,
+            "url": url,
+            "digests": {FAVORITE_HASH: digest},
+            "size": size,
+        }
+        for packagetype, url, digest, size in release_records
+    ]
+
+
+def _file_size(file_: dict[str, _t.Any]) -> int | None:
+    """Return the size of a file listed by the JSON API, if it is given."""
+    size = file_.get("size")
+    return size if isinstance(size, int) else None
+
+
+def _get_dependencies_cache_key(
+    ireq: InstallRequirement,
+) -> tuple[str, str, tuple[str, ...]] | None:
+    """
+    Return the identity of a requirement in the dependencies cache: its name, its
+    pinned version or its URL, and its extras. An unnamed requirement has none
+    until it is resolved, as pip names it then, which the callers rely on, and
+    a constraint has none, as pip does not resolve its dependencies.
+    """
+    if ireq.name is None or ireq.constraint:
+        return None
+    if is_pinned_requirement(ireq):
+        return as_tuple(ireq)
+    url = ireq.link.url if ireq.link is not None else ""
+    return key_from_ireq(ireq), url, tuple(sorted(ireq.extras))
+
+
 def candidate_version(candidate: InstallationCandidate) -> _BaseVersion:
     return candidate.version
 
 
+def _get_public_version(version: Version) -> Version:
+    if version.local is None:
+        return version
+    return Version(version.public)
+
+
 def _get_true_base_from_index_url(url: str) -> str:
     """
     Given an index URL (which may or may not end in ``/simple``), get the base URL for
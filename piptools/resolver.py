@@ -5,17 +5,21 @@ import copy
 import typing as _t
 from abc import ABCMeta, abstractmethod
 from collections.abc import Container, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from itertools import chain, count, groupby
 
 import click
 from pip._internal.exceptions import DistributionNotFound
+from pip._internal.metadata import BaseDistribution
+from pip._internal.models.link import Link
 from pip._internal.operations.build.build_tracker import (
     get_build_tracker,
     update_env_context_manager,
 )
+from pip._internal.operations.prepare import RequirementPreparer
 from pip._internal.req import InstallRequirement
-from pip._internal.resolution.resolvelib.base import Candidate
+from pip._internal.resolution.resolvelib.base import Candidate, Requirement
 from pip._internal.resolution.resolvelib.candidates import ExtrasCandidate
 from pip._internal.resolution.resolvelib.resolver import Resolver
 from pip._internal.utils.logging import indent_log
@@ -23,18 +27,21 @@ from pip._internal.utils.temp_dir import TempDirectory, global_tempdir_manager
 from pip._vendor.packaging.specifiers import SpecifierSet
 from pip._vendor.resolvelib.resolvers import ResolutionImpossible, Result
 
-from piptools.cache import DependencyCache
+from piptools.cache import DependencyCache, MetadataCache
 from piptools.repositories.base import BaseRepository
 
 from ._compat import canonicalize_name, create_wheel_cache
 from ._internal import _pip_api
 from .exceptions import PipToolsError
+from .graph import GraphRecord
 from .logging import log
 from .utils import (
     UNSAFE_PACKAGES,
+    WheelTagFilter,
     as_tuple,
     format_requirement,
     format_specifier,
+    get_metadata_sha256,
     is_pinned_requirement,
     is_url_requirement,
     key_from_ireq,
@@ -158,15 +165,37 @@ class BaseResolver(metaclass=ABCMeta):
         """
 
     def resolve_hashes(
-        self, ireqs: set[InstallRequirement]
+        self,
+        ireqs: set[InstallRequirement],
+        max_workers: int = 1,
+        wheel_tag_filter: WheelTagFilter | None = None,
     ) -> dict[InstallRequirement, set[str]]:
         r"""
         Find acceptable hashes for all of the given ``InstallRequirement``\ s.
+
+        :param max_workers: the number of threads used to look up the hashes
+            of several requirements at once (default is 1)
+        :param wheel_tag_filter: the filter of the tags of the wheels to hash,
+            besides the source distributions, or ``None`` to hash the wheels
+            of all platforms and Python versions
         """
         log.debug("")
         log.debug("Generating hashes:")
-        with self.repository.allow_all_wheels(), log.indentation():
-            return {ireq: self.repository.get_hashes(ireq) for ireq in ireqs}
+        get_hashes = partial(
+            self.repository.get_hashes,
+            all_platforms=True,
+            wheel_tag_filter=wheel_tag_filter,
+        )
+        with log.indentation():
+            if max_workers <= 1:
+                return {ireq: get_hashes(ireq) for ireq in ireqs}
+
+            # Submit the requirements in a stable order, so that the lookups
+            # (and their log output) do not depend on set iteration order.
+            ordered_ireqs = sorted(ireqs, key=key_from_ireq)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                hashes = executor.map(get_hashes, ordered_ireqs)
+                return dict(zip(ordered_ireqs, hashes))
 
     def _filter_out_unsafe_constraints(
         self,
@@ -258,8 +287,12 @@ class LegacyResolver(BaseResolver):
             self.dependency_cache.clear()
             self.repository.clear_caches()
 
-        # Ignore existing packages
-        with update_env_context_manager(PIP_EXISTS_ACTION="i"):
+        # Ignore existing packages, and write the dependencies found
+        # to the cache at once, when resolving is done
+        with (
+            update_env_context_manager(PIP_EXISTS_ACTION="i"),
+            self.dependency_cache.batch(),
+        ):
             for current_round in count(start=1):  # pragma: no branch
                 if current_round > max_rounds:
                     raise RuntimeError(
@@ -282,6 +315,11 @@ class LegacyResolver(BaseResolver):
                 if not has_changed:
                     break
 
+        log.debug(
+            f"Dependency cache: {self.dependency_cache.write_count} write(s), "
+            f"{self.dependency_cache.bytes_written} bytes written"
+        )
+
         # Only include hard requirements and not pip constraints
         results = {req for req in best_matches if not req.constraint}
 
@@ -505,6 +543,40 @@ class LegacyResolver(BaseResolver):
             )
 
 
+def _get_metadata_sha256(
+    candidate: Candidate, metadata_cache: MetadataCache | None
+) -> str | None:
+    """
+    Return the SHA256 hash of the metadata of a candidate, if it has any.
+
+    The metadata served from the metadata cache is not the original one, so
+    the hash of the original is taken from the cache.
+    """
+    dist: BaseDistribution | None = getattr(candidate, "dist", None)
+    if dist is None:
+        return None
+    link: Link | None = getattr(candidate, "source_link", None)
+    if metadata_cache is not None and link is not None:
+        metadata_sha256 = metadata_cache.get_metadata_sha256(link)
+        if metadata_sha256 is not None:
+            return metadata_sha256
+    return get_metadata_sha256(dist)
+
+
+class _IncrementalPlan(_t.NamedTuple):
+    """The packages an incremental resolution revisits and keeps."""
+
+    # The packages upgraded or required differently since the previous
+    # compile, and their dependencies
+    affected: set[str]
+    # The packages which are not affected, but require affected ones
+    boundary: set[str]
+    # The packages requiring each package of the previous compile
+    parents: dict[str, set[str]]
+    # The pins of the previous compile which are not affected
+    kept_pins: dict[str, InstallRequirement]
+
+
 class BacktrackingResolver(BaseResolver):
     """A wrapper for the backtracking (or 2020) resolver."""
 
@@ -513,12 +585,19 @@ class BacktrackingResolver(BaseResolver):
         constraints: Iterable[InstallRequirement],
         existing_constraints: dict[str, InstallRequirement],
         repository: BaseRepository,
+        clear_caches: bool = False,
         allow_unsafe: bool = False,
         unsafe_packages: set[str] | None = None,
+        metadata_cache: MetadataCache | None = None,
+        existing_required_by: dict[str, set[str]] | None = None,
+        incremental: bool = False,
+        record_graph: bool = False,
         **kwargs: _t.Any,
     ) -> None:
         self.constraints = list(constraints)
         self.repository = repository
+        self.clear_caches = clear_caches
+        self.metadata_cache = metadata_cache
         self.allow_unsafe = allow_unsafe
         self.unsafe_packages = unsafe_packages or UNSAFE_PACKAGES
 
@@ -529,6 +608,15 @@ class BacktrackingResolver(BaseResolver):
         self.unsafe_constraints: set[InstallRequirement] = set()
 
         self.existing_constraints = existing_constraints
+        # The sources of the packages of the previous compile, read from its
+        # annotations or its graph, to resolve incrementally
+        self.existing_required_by = existing_required_by
+        self.incremental = incremental
+        # Whether to save the requirements and the metadata hash of each
+        # resolved package, for the graph of the result
+        self.record_graph = record_graph
+        # The record of each resolved package for the graph, by key, if saved
+        self.graph_records: dict[str, GraphRecord] = {}
 
         # Categorize InstallRequirements into sets by key
         constraints_sets: collections.defaultdict[str, set[InstallRequirement]] = (
@@ -556,6 +644,11 @@ class BacktrackingResolver(BaseResolver):
 
         :returns: A set of pinned ``InstallRequirement``\ s.
         """
+        if self.clear_caches:
+            self.repository.clear_caches()
+            if self.metadata_cache is not None:
+                self.metadata_cache.clear()
+
         with (
             update_env_context_manager(PIP_EXISTS_ACTION="i"),
             get_build_tracker() as build_tracker,
@@ -568,10 +661,20 @@ class BacktrackingResolver(BaseResolver):
                     ireq.extras = set()  # pip does not support extras in constraints
                 ireq.user_supplied = True
 
+            pruned_keys = self._prune_existing_constraints()
+            # Plan before the extras of the compiled requirements are dropped
+            incremental_plan = (
+                self._plan_incremental_resolution(pruned_keys)
+                if self.incremental
+                else None
+            )
+
             # Pass compiled requirements from `requirements.txt`
             # as constraints to resolver
             compatible_existing_constraints: dict[str, InstallRequirement] = {}
             for ireq in self.existing_constraints.values():
+                if key_from_ireq(ireq) in pruned_keys:
+                    continue
                 # Skip if the compiled install requirement conflicts with
                 # the primary install requirement.
                 primary_ireq = self._constraints_map.get(key_from_ireq(ireq))
@@ -606,6 +709,8 @@ class BacktrackingResolver(BaseResolver):
                 finder=self.finder,
                 download_dir=None,
             )
+            if self.metadata_cache is not None:
+                self._use_metadata_cache(preparer, self.metadata_cache)
 
             extra_resolver_kwargs = {}
             if _pip_api.PIP_VERSION_MAJOR_MINOR < (25, 3):  # pragma: pip<25.3 cover
@@ -624,33 +729,26 @@ class BacktrackingResolver(BaseResolver):
                 upgrade_strategy="to-satisfy-only",
                 **extra_resolver_kwargs,
             )
+            # The legacy resolver is disabled in the options
+            assert isinstance(resolver, Resolver)
 
             self.command.trace_basic_info(self.finder)
 
-            for current_round in count(start=1):  # pragma: no branch
-                if current_round > max_rounds:
-                    raise RuntimeError(
-                        "No stable configuration of concrete packages "
-                        "could be found for the given constraints after "
-                        f"{max_rounds} rounds of resolving.\n"
-                        "This is likely a bug."
-                    )
-
-                log.debug("")
-                log.debug(magenta(f"{f'ROUND {current_round}':^60}"))
-
-                is_resolved = self._do_resolve(
+            result_ireqs = None
+            if incremental_plan is not None:
+                result_ireqs = self._resolve_incrementally(
                     resolver=resolver,
                     compatible_existing_constraints=compatible_existing_constraints,
+                    plan=incremental_plan,
+                    max_rounds=max_rounds,
+                )
+            if result_ireqs is None:
+                result_ireqs = self._resolve_rounds(
+                    resolver=resolver,
+                    root_reqs=self.constraints,
+                    compatible_existing_constraints=compatible_existing_constraints,
+                    max_rounds=max_rounds,
                 )
-                if is_resolved:
-                    break
-
-        resolver_result = resolver._result
-        assert isinstance(resolver_result, Result)
-
-        # Prepare set of install requirements from resolver result.
-        result_ireqs = self._get_install_requirements(resolver_result=resolver_result)
 
         # Filter out unsafe requirements.
         if not self.allow_unsafe:
@@ -661,22 +759,279 @@ class BacktrackingResolver(BaseResolver):
 
         return result_ireqs
 
+    @staticmethod
+    def _use_metadata_cache(
+        preparer: RequirementPreparer, metadata_cache: MetadataCache
+    ) -> None:
+        """
+        Make the preparer look up the metadata of the files found on an index in
+        the metadata cache, instead of downloading or building them, and store
+        the metadata of the files it does prepare.
+        """
+        prepare_linked_requirement = preparer.prepare_linked_requirement
+
+        def _prepare_linked_requirement(
+            req: InstallRequirement, *args: _t.Any, **kwargs: _t.Any
+        ) -> BaseDistribution:
+            link = req.link
+            if (
+                link is None
+                or link.is_file
+                or link.is_vcs
+                or is_url_requirement(req)
+                or req.name is None
+            ):
+                return prepare_linked_requirement(req, *args, **kwargs)
+
+            metadata_contents = metadata_cache.get(link)
+            if metadata_contents is not None:
+                dist = _pip_api.get_metadata_distribution(
+                    metadata_contents, link.filename, canonicalize_name(req.name)
+                )
+                if dist is not None:
+                    return dist
+
+            dist = prepare_linked_requirement(req, *args, **kwargs)
+            metadata_cache.set(link, dist)
+            return dist
+
+        preparer.prepare_linked_requirement = (  # type: ignore[method-assign]
+            _prepare_linked_requirement
+        )
+
+    def _prune_existing_constraints(self) -> set[str]:
+        """
+        Find the existing pins not to pass to the resolver, without fetching
+        anything: the ones whose markers exclude the environment, and the ones
+        of a version which has no distribution compatible with the target Python
+        and platform among the candidates already looked up.
+
+        The pins no requirement depends on anymore are kept, as pip does not
+        look up a constraint which nothing requires.
+
+        :returns: the keys of the pins to prune
+        """
+        reasons: dict[str, str] = {}
+        for key, ireq in self.existing_constraints.items():
+            if not ireq.match_markers():
+                reasons[key] = "excluded by markers"
+            elif not self._is_available(ireq):
+                # Resolving with such a pin would fail and discard it anyway
+                log.warning(f"Discarding {ireq} to proceed the resolution")
+                reasons[key] = "not available for the target Python and platform"
+
+        if reasons:
+            counts = collections.Counter(reasons.values())
+            log.debug(
+                f"Pruned {len(reasons)} existing pin(s): "
+                + ", ".join(f"{count} {reason}" for reason, count in counts.items())
+            )
+            with log.indentation():
+                for key, reason in sorted(reasons.items()):
+                    log.debug(f"{key}: {reason}")
+        return set(reasons)
+
+    def _is_available(self, ireq: InstallRequirement) -> bool:
+        """
+        Tell whether a distribution of a pinned version may be found, from the
+        candidates of the project already looked up, if any. The finder only
+        looks up the distributions compatible with the target Python and
+        platform.
+        """
+        if not is_pinned_requirement(ireq) or ireq.name is None:
+            return True
+        candidates = self.repository.get_cached_candidates(ireq.name)
+        if candidates is None:
+            return True
+        return any(
+            ireq.specifier.contains(candidate.version, prereleases=True)
+            for candidate in candidates
+        )
+
+    def _plan_incremental_resolution(
+        self, pruned_keys: set[str]
+    ) -> _IncrementalPlan | None:
+        """
+        Find the packages to resolve again from the annotations of the previous
+        compile: the packages upgraded, added, removed or required differently
+        since, the pruned pins, and the packages they depend on. Return ``None``
+        if the annotations do not tell what requires each existing pin.
+        """
+        required_by = self.existing_required_by
+        existing = self.existing_constraints
+        if not required_by or not all(required_by.values()):
+            return None
+        if not existing.keys() <= required_by.keys():
+            return None
+
+        parents: dict[str, set[str]] = {key: set() for key in required_by}
+        dependencies: collections.defaultdict[str, set[str]] = collections.defaultdict(
+            set
+        )
+        # The pins excluded from the existing ones, by --upgrade-package, and
+        # the ones which the resolver is not given
+        changed = set(required_by.keys() - existing.keys()) | pruned_keys
+        for key, sources in required_by.items():
+            for source in sources:
+                parent = canonicalize_name(strip_extras(source))
+                if parent in required_by:
+                    parents[key].add(parent)
+                    dependencies[parent].add(key)
+                elif key not in self._constraints_map:
+                    # Listed by a source file, but not anymore
+                    changed.add(key)
+
+        for key, ireq in self._constraints_map.items():
+            pin = existing.get(key)
+            if pin is None or not set(map(canonicalize_name, ireq.extras)) <= set(
+                map(canonicalize_name, pin.extras)
+            ):
+                changed.add(key)
+                continue
+            _, version, _ = as_tuple(pin)
+            if not ireq.specifier.contains(version, pin.specifier.prereleases):
+                changed.add(key)
+
+        affected: set[str] = set()
+        pending = list(changed)
+        while pending:
+            key = pending.pop()
+            if key not in affected:
+                affected.add(key)
+                pending.extend(dependencies[key])
+
+        boundary = {
+            parent for key in affected for parent in parents.get(key, ())
+        } - affected
+        kept_pins = {
+            key: _pip_api.copy_install_requirement(
+                template=pin, comes_from=None, constraint=False
+            )
+            for key, pin in existing.items()
+            if key not in affected
+        }
+        return _IncrementalPlan(affected, boundary, parents, kept_pins)
+
+    def _resolve_incrementally(
+        self,
+        resolver: Resolver,
+        compatible_existing_constraints: dict[str, InstallRequirement],
+        plan: _IncrementalPlan,
+        max_rounds: int,
+    ) -> set[InstallRequirement] | None:
+        """
+        Resolve again only the affected packages and the packages requiring
+        them, and keep the other pins of the previous compile.
+
+        :returns: the resolved and kept install requirements, or :py:data:`None`
+            if the pins of packages which are not affected have to change.
+        """
+        resolved_keys = plan.affected | plan.boundary
+        root_reqs = [
+            ireq
+            for ireq in self.constraints
+            if ireq.constraint or key_from_ireq(ireq) in resolved_keys
+        ]
+        # The packages requiring affected ones, which stay constrained to their
+        # existing pins, tell which versions of these are still compatible
+        root_reqs.extend(
+            _pip_api.create_install_requirement_from_line(key)
+            for key in sorted(plan.boundary - self._constraints_map.keys())
+        )
+        log.debug(
+            f"Resolving {len(plan.affected)} affected package(s) and "
+            f"{len(plan.boundary)} package(s) requiring them, keeping the "
+            "other pins"
+        )
+
+        result_ireqs = self._resolve_rounds(
+            resolver=resolver,
+            root_reqs=root_reqs,
+            compatible_existing_constraints=dict(compatible_existing_constraints),
+            max_rounds=max_rounds,
+        )
+        result_keys = {key_from_ireq(ireq) for ireq in result_ireqs}
+        for ireq in result_ireqs:
+            key = key_from_ireq(ireq)
+            if key in plan.affected:
+                continue
+            pin = self.existing_constraints.get(key)
+            if pin is None or as_tuple(pin)[1] != as_tuple(ireq)[1]:
+                log.debug(f"The pin of {key} has to change, resolving all packages")
+                return None
+            # The pins which are kept still require the resolved packages
+            ireq._required_by |= (plan.parents[key] & plan.kept_pins.keys()) - (
+                result_keys
+            )
+
+        for key, ireq in plan.kept_pins.items():
+            if key in result_keys:
+                continue
+            ireq._required_by = plan.parents[key]
+            source_ireqs = self._get_source_ireqs(key)
+            if source_ireqs is not None:
+                ireq._source_ireqs = source_ireqs
+            result_ireqs.add(ireq)
+
+        return result_ireqs
+
+    def _resolve_rounds(
+        self,
+        resolver: Resolver,
+        root_reqs: list[InstallRequirement],
+        compatible_existing_constraints: dict[str, InstallRequirement],
+        max_rounds: int,
+    ) -> set[InstallRequirement]:
+        """
+        Resolve the root requirements, discarding the existing constraints
+        which make it impossible, and return the resolved install requirements.
+        """
+        for current_round in count(start=1):  # pragma: no branch
+            if current_round > max_rounds:
+                raise RuntimeError(
+                    "No stable configuration of concrete packages "
+                    "could be found for the given constraints after "
+                    f"{max_rounds} rounds of resolving.\n"
+                    "This is likely a bug."
+                )
+
+            log.debug("")
+            log.debug(magenta(f"{f'ROUND {current_round}':^60}"))
+
+            is_resolved = self._do_resolve(
+                resolver=resolver,
+                compatible_existing_constraints=compatible_existing_constraints,
+                root_reqs=root_reqs,
+            )
+            if is_resolved:
+                break
+
+        resolver_result = resolver._result
+        assert isinstance(resolver_result, Result)
+
+        # Prepare set of install requirements from resolver result.
+        return self._get_install_requirements(resolver_result=resolver_result)
+
     def _do_resolve(
         self,
         resolver: Resolver,
         compatible_existing_constraints: dict[str, InstallRequirement],
+        root_reqs: list[InstallRequirement] | None = None,
     ) -> bool:
         """
         Resolve dependencies based on resolvelib ``Resolver``.
 
+        :param root_reqs: the requirements to resolve, the given constraints
+            by default
         :returns: :py:data:`True` on successful resolution, otherwise removes
             problematic requirements from existing constraints and
             returns :py:data:`False`.
         """
+        if root_reqs is None:
+            root_reqs = self.constraints
         try:
             resolver.resolve(
-                root_reqs=self.constraints
-                + list(compatible_existing_constraints.values()),
+                root_reqs=root_reqs + list(compatible_existing_constraints.values()),
                 check_supported_wheels=not self.options.target_dir,
             )
         except DistributionNotFound as e:
@@ -693,26 +1048,79 @@ class BacktrackingResolver(BaseResolver):
                 for cause in cause_exc.causes
             }
 
-            # Looks like resolution is impossible, try to fix
-            for cause_ireq_name in cause_ireq_names:
-                # Find the cause requirement in existing requirements,
-                # otherwise raise error
-                cause_existing_ireq = compatible_existing_constraints.get(
-                    cause_ireq_name
-                )
-                if cause_existing_ireq is None:
-                    raise
+            # Find the cause requirements in existing requirements,
+            # otherwise raise error
+            if not cause_ireq_names <= compatible_existing_constraints.keys():
+                raise
 
+            # Looks like resolution is impossible, try to fix. The other
+            # existing requirements excluded by what the resolver already
+            # knows are discarded too, rather than one round at a time.
+            cause_parents = [
+                cause.parent for cause in cause_exc.causes if cause.parent is not None
+            ]
+            excluded_ireq_names = self._get_excluded_existing_constraints(
+                cause_parents=cause_parents,
+                prepared_candidates=_pip_api.get_prepared_candidates(resolver),
+                compatible_existing_constraints=compatible_existing_constraints,
+            )
+            for cause_ireq_name in sorted(cause_ireq_names | excluded_ireq_names):
                 # Remove existing incompatible constraint that causes error
+                cause_existing_ireq = compatible_existing_constraints.pop(
+                    cause_ireq_name
+                )
                 log.warning(
                     f"Discarding {cause_existing_ireq} to proceed the resolution"
                 )
-                del compatible_existing_constraints[cause_ireq_name]
 
             return False
 
         return True
 
+    @staticmethod
+    def _get_excluded_existing_constraints(
+        cause_parents: Iterable[Candidate],
+        prepared_candidates: Iterable[Candidate],
+        compatible_existing_constraints: dict[str, InstallRequirement],
+    ) -> set[str]:
+        """
+        Return the names of the existing constraints whose pin is excluded by
+        the dependencies of the parents of the causes of a conflict, or by the
+        dependencies of the prepared candidates of the other pins.
+
+        The dependencies of these candidates are already known, so that no
+        package is fetched to tell it.
+        """
+        candidates = list(cause_parents)
+        for candidate in prepared_candidates:
+            pinned_ireq = compatible_existing_constraints.get(candidate.project_name)
+            if (
+                pinned_ireq is not None
+                and is_pinned_requirement(pinned_ireq)
+                and pinned_ireq.specifier.contains(candidate.version, prereleases=True)
+            ):
+                candidates.append(candidate)
+
+        excluded_names: set[str] = set()
+        for candidate in candidates:
+            for requirement in candidate.iter_dependencies(with_requires=True):
+                if requirement is None:
+                    continue
+                existing_ireq = compatible_existing_constraints.get(
+                    requirement.project_name
+                )
+                _, specifier_ireq = requirement.get_candidate_lookup()
+                if (
+                    existing_ireq is None
+                    or specifier_ireq is None
+                    or not is_pinned_requirement(existing_ireq)
+                ):
+                    continue
+                _, version, _ = as_tuple(existing_ireq)
+                if not specifier_ireq.specifier.contains(version, prereleases=True):
+                    excluded_names.add(requirement.project_name)
+        return excluded_names
+
     def _get_install_requirements(
         self, resolver_result: Result
     ) -> set[InstallRequirement]:
@@ -747,8 +1155,75 @@ class BacktrackingResolver(BaseResolver):
             ireq.extras |= extras_candidate.extras
             ireq.req.extras |= extras_candidate.extras
 
+        if self.record_graph:
+            self._record_graph(
+                resolved_candidates,
+                (
+                    information
+                    for criterion in resolver_result.criteria.values()
+                    for information in criterion.information
+                ),
+                result_ireqs,
+            )
+
         return set(result_ireqs.values())
 
+    def _record_graph(
+        self,
+        resolved_candidates: Iterable[Candidate],
+        requirements: Iterable[tuple[Requirement, Candidate | None]],
+        result_ireqs: dict[str, InstallRequirement],
+    ) -> None:
+        """
+        Save the record of each resolved install requirement, with the
+        requirements of its package on the other resolved packages, and the
+        hash of its metadata.
+
+        :param resolved_candidates: the candidates of the resolver result
+        :param requirements: the requirements of the resolver result, with the
+            candidate requiring each of them
+        :param result_ireqs: the resolved install requirements, by project name
+        """
+        records = {name: GraphRecord() for name in result_ireqs}
+
+        for requirement, parent in requirements:
+            # Skip the root dependencies, which have no parent
+            if parent is None:
+                continue
+            name = strip_extras(canonicalize_name(requirement.name))
+            parent_name = strip_extras(canonicalize_name(parent.name))
+            # Skip the requirement of a package with extras on itself, and
+            # the requirement on the Python version
+            if name == parent_name or name not in result_ireqs:
+                continue
+
+            link_candidate, specifier_ireq = requirement.get_candidate_lookup()
+            dependency: dict[str, str | None]
+            if specifier_ireq is not None and specifier_ireq.req is not None:
+                markers = specifier_ireq.markers
+                dependency = {
+                    "specifier": str(specifier_ireq.req.specifier),
+                    "markers": str(markers) if markers else None,
+                }
+            elif link_candidate is not None and link_candidate.source_link:
+                dependency = {"url": link_candidate.source_link.url}
+            else:  # pragma: no cover
+                continue
+            records[parent_name].dependencies.setdefault(name, dependency)
+
+        for candidate in resolved_candidates:
+            project_name = canonicalize_name(candidate.project_name)
+            record = records.get(project_name)
+            if record is not None and record.metadata_sha256 is None:
+                record.metadata_sha256 = _get_metadata_sha256(
+                    candidate, self.metadata_cache
+                )
+
+        self.graph_records = {
+            key_from_ireq(result_ireqs[name]): record
+            for name, record in records.items()
+        }
+
     @staticmethod
     def _get_reverse_dependencies(
         resolver_result: Result,
@@ -815,13 +1290,19 @@ class BacktrackingResolver(BaseResolver):
         pinned_ireq._required_by = reverse_dependencies.get(ireq_key, set())
 
         # Save sources for annotation
-        constraint_ireq = self._constraints_map.get(ireq_key)
-        if constraint_ireq is not None:
-            if hasattr(constraint_ireq, "_source_ireqs"):
-                # If the constraint is combined (has _source_ireqs), use those
-                pinned_ireq._source_ireqs = constraint_ireq._source_ireqs
-            else:
-                # Otherwise (the constraint is not combined) it is the source
-                pinned_ireq._source_ireqs = [constraint_ireq]
+        source_ireqs = self._get_source_ireqs(ireq_key)
+        if source_ireqs is not None:
+            pinned_ireq._source_ireqs = source_ireqs
 
         return pinned_ireq
+
+    def _get_source_ireqs(self, ireq_key: str) -> list[InstallRequirement] | None:
+        """Return the given constraints a package comes from, if any."""
+        constraint_ireq = self._constraints_map.get(ireq_key)
+        if constraint_ireq is None:
+            return None
+        if hasattr(constraint_ireq, "_source_ireqs"):
+            # If the constraint is combined (has _source_ireqs), use those
+            return list(constraint_ireq._source_ireqs)
+        # Otherwise (the constraint is not combined) it is the source
+        return [constraint_ireq]
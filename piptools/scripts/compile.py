@@ -1,32 +1,62 @@
 from __future__ import annotations
 
+import contextlib
+import functools
 import itertools
 import os
 import shlex
 import sys
+import traceback
 import typing as _t
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import click
 from build import BuildBackendException
+from click.core import ParameterSource
 from click.utils import LazyFile, safecall
 from pip._internal.req import InstallRequirement
 from pip._internal.utils.misc import redact_auth_from_url
 
-from .._compat import canonicalize_name, parse_requirements, tempfile_compat
+from .._compat import (
+    canonicalize_name,
+    parse_compiled_requirements,
+    parse_requirements,
+    tempfile_compat,
+)
 from .._internal import _pip_api
 from ..build import ProjectMetadata, build_project_metadata
-from ..cache import DependencyCache
+from ..cache import DependencyCache, MetadataCache
 from ..exceptions import NoCandidateFound, PipToolsError
+from ..fingerprint import (
+    get_fingerprint,
+    get_fingerprint_path,
+    is_up_to_date,
+    write_fingerprint,
+)
+from ..graph import (
+    build_graph,
+    get_graph_path,
+    get_graph_required_by,
+    read_graph,
+    write_graph,
+)
 from ..logging import log
-from ..repositories import LocalRequirementsRepository, PyPIRepository
+from ..repositories import (
+    LocalRequirementsRepository,
+    PyPIRepository,
+    RepositoryPool,
+)
 from ..repositories.base import BaseRepository
 from ..resolver import BacktrackingResolver, LegacyResolver
 from ..utils import (
     dedup,
     drop_extras,
+    get_wheel_tag_filter,
     is_pinned_requirement,
+    is_url_requirement,
     key_from_ireq,
+    parse_annotations,
 )
 from ..writer import OutputWriter
 from . import options
@@ -94,6 +124,134 @@ Examples:
 """
 
 
+def _get_batch_target_args(ctx: click.Context) -> list[str]:
+    """
+    Return the arguments to compile a ``--batch`` target with, i.e. the options
+    given on the command line, except those naming the files to compile.
+
+    The options taken from the environment or a config file are left out, as
+    the compile of each target reads these again.
+    """
+    args = []
+    for param in ctx.command.params:
+        if not isinstance(param, click.Option) or param.name in {
+            "batch_targets",
+            "batch_jobs",
+            "output_file",
+        }:
+            continue
+        if (
+            param.name not in ctx.params
+            or ctx.get_parameter_source(param.name) != ParameterSource.COMMANDLINE
+        ):
+            continue
+
+        value = ctx.params[param.name]
+        option_name = param.opts[-1]
+        if param.count:
+            args.extend([option_name] * value)
+        elif param.is_flag:
+            if value:
+                args.append(option_name)
+            elif param.secondary_opts:
+                args.append(param.secondary_opts[-1])
+        else:
+            for val in value if param.multiple else (value,):
+                args.append(option_name)
+                args.extend(str(v) for v in (val if param.nargs > 1 else (val,)))
+    return args
+
+
+def _compile_batch(
+    ctx: click.Context, targets: tuple[tuple[str, str], ...], jobs: int | None
+) -> int:
+    """
+    Compile each ``(src_file, output_file)`` target with the options of the
+    current command, in a pool of ``jobs`` processes, and return the highest
+    exit code of these compiles.
+
+    The compiles share the on-disk caches of pip and pip-tools. The compiles run
+    in this process, with a single job, also share one repository, with its
+    session, finder and in-memory caches, as long as no source file reconfigures
+    it; the processes of a pool cannot share one.
+    """
+    base_args = _get_batch_target_args(ctx)
+    targets_args = [
+        (
+            src_file,
+            output_file,
+            [*base_args, "--output-file", output_file, "--", src_file],
+        )
+        for src_file, output_file in targets
+    ]
+    if jobs is None:
+        jobs = min(len(targets), os.cpu_count() or 1)
+
+    if jobs <= 1:
+        # The pool of a long-lived process outlives the batch
+        if isinstance(ctx.obj, RepositoryPool):
+            pool = ctx.obj
+        else:
+            pool = RepositoryPool(ttl=float("inf"))
+        try:
+            exit_codes = [
+                _compile_batch_target(*target, pool=pool) for target in targets_args
+            ]
+        finally:
+            if pool is not ctx.obj:
+                pool.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            exit_codes = list(executor.map(_compile_batch_target, *zip(*targets_args)))
+
+    for (src_file, output_file), exit_code in zip(targets, exit_codes):
+        if exit_code:
+            log.error(f"Failed to compile {src_file} to {output_file}")
+    return max(exit_codes)
+
+
+def _compile_batch_target(
+    src_file: str,
+    output_file: str,
+    args: list[str],
+    pool: RepositoryPool | None = None,
+) -> int:
+    """
+    Compile a ``--batch`` target with the given arguments, returning the exit code.
+
+    :param pool: the pool to take the repository of the compile from, if any
+    """
+    log.info(f"Compiling {src_file} to {output_file}")
+    return _run_compile(args, obj=pool)
+
+
+def _run_compile(args: list[str], **extra: _t.Any) -> int:
+    """
+    Run pip-compile with the given arguments in the current process, returning
+    the exit code instead of exiting.
+
+    :param extra: extra keyword arguments for the context of the command, e.g.
+        a :class:`RepositoryPool` as ``obj`` to reuse the repositories of
+        previous compiles
+    """
+    try:
+        exit_code = cli.main(
+            args, prog_name="pip-compile", standalone_mode=False, **extra
+        )
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.Abort:
+        return 1
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else int(e.code is not None)
+    except Exception:
+        # An unexpected error only fails this compile
+        log.error(traceback.format_exc())
+        return 1
+    return exit_code if isinstance(exit_code, int) else 0
+
+
 @click.command(name="pip-compile")
 @click.pass_context
 @options.help_option(epilog=COMPILE_EPILOG)
@@ -126,7 +284,14 @@ Examples:
 @options.strip_extras
 @options.generate_hashes
 @options.reuse_hashes
+@options.hash_jobs
+@options.hash_platform
+@options.hash_python_version
+@options.prefetch_jobs
 @options.max_rounds
+@options.incremental
+@options.batch
+@options.batch_jobs
 @options.src_files
 @options.build_isolation
 @options.emit_find_links
@@ -135,6 +300,9 @@ Examples:
 @options.resolver
 @options.emit_index_url
 @options.emit_options
+@options.skip_unchanged
+@options.check
+@options.emit_graph
 @options.unsafe_package
 @options.config
 @options.no_config
@@ -172,8 +340,15 @@ def cli(
     strip_extras: bool | None,
     generate_hashes: bool,
     reuse_hashes: bool,
+    hash_jobs: int,
+    hash_platforms: tuple[str, ...],
+    hash_python_versions: tuple[str, ...],
+    prefetch_jobs: int,
+    batch_targets: tuple[tuple[str, str], ...],
+    batch_jobs: int | None,
     src_files: tuple[str, ...],
     max_rounds: int,
+    incremental: bool,
     build_isolation: bool,
     emit_find_links: bool,
     cache_dir: str,
@@ -181,6 +356,9 @@ def cli(
     resolver_name: str,
     emit_index_url: bool,
     emit_options: bool,
+    skip_unchanged: bool,
+    check: bool,
+    emit_graph: bool,
     unsafe_package: tuple[str, ...],
     config: Path | None,
     no_config: bool,
@@ -199,6 +377,13 @@ def cli(
         ctx.color = color
     log.verbosity = verbose - quiet
 
+    if batch_targets:
+        if ctx.get_parameter_source("src_files") == ParameterSource.COMMANDLINE:
+            raise click.BadParameter("--batch cannot be used with source files")
+        if output_file:
+            raise click.BadParameter("--batch cannot be used with --output-file")
+        ctx.exit(_compile_batch(ctx, batch_targets, batch_jobs))
+
     # NOTE: On older `click` versions, `src_files` is not populated automatically from
     # NOTE: config, so it has to be done explicitly here. These align with older Python
     # NOTE: support, so the entire block is marked with a version pragma.
@@ -222,6 +407,18 @@ def cli(
         raise click.BadParameter(
             "--only-build-deps cannot be used with any of --extra, --all-extras"
         )
+    if incremental and resolver_name == "legacy":
+        raise click.BadParameter("--incremental requires the backtracking resolver")
+    if emit_graph and resolver_name == "legacy":
+        raise click.BadParameter("--emit-graph requires the backtracking resolver")
+    if (hash_platforms or hash_python_versions) and not generate_hashes:
+        raise click.BadParameter(
+            "--hash-platform and --hash-python-version require --generate-hashes"
+        )
+    try:
+        wheel_tag_filter = get_wheel_tag_filter(hash_platforms, hash_python_versions)
+    except ValueError as e:
+        raise click.BadParameter(f"--hash-python-version: {e}") from e
 
     if len(src_files) == 0:
         for file_path in DEFAULT_REQUIREMENTS_FILES:
@@ -270,6 +467,22 @@ def cli(
         raise click.BadArgumentUsage(
             f"input and output filenames must not be matched: {output_file.name}"
         )
+    if emit_graph and output_file.name == "-":
+        raise click.BadParameter("--emit-graph cannot be used with --output-file -")
+    if (skip_unchanged or check) and output_file.name == "-":
+        raise click.BadParameter(
+            "--skip-unchanged and --check cannot be used with --output-file -"
+        )
+
+    # Nothing to do if the inputs did not change since the last compile, unless
+    # asked to pick new versions. This is checked before pip is set up at all.
+    if check or (skip_unchanged and not (upgrade or upgrade_packages or rebuild)):
+        if is_up_to_date(ctx, src_files, constraint, output_file.name):
+            log.info(f"{output_file.name} is up to date, skipping the compile.")
+            return
+        if check:
+            log.error(f"{output_file.name} is out of date with its inputs.")
+            sys.exit(1)
 
     if config:
         log.debug(f"Using pip-tools configuration defaults found in '{config!s}'.")
@@ -319,8 +532,17 @@ def cli(
     pip_args.extend(right_args)
     pip_args = filter_deprecated_pip_args(pip_args)
 
-    repository: BaseRepository
-    repository = PyPIRepository(pip_args, cache_dir=cache_dir)
+    if isinstance(ctx.obj, RepositoryPool):
+        # A long-lived process reuses the repository of a previous compile
+        pypi_repository = ctx.obj.acquire(
+            pip_args, cache_dir=cache_dir, hash_jobs=hash_jobs, fresh=rebuild
+        )
+        ctx.call_on_close(functools.partial(ctx.obj.release, pypi_repository))
+    else:
+        pypi_repository = PyPIRepository(
+            pip_args, cache_dir=cache_dir, hash_jobs=hash_jobs
+        )
+    repository: BaseRepository = pypi_repository
 
     # Parse all constraints coming from --upgrade-package/-P
     upgrade_reqs_gen = (
@@ -332,10 +554,14 @@ def cli(
 
     # Exclude packages from --upgrade-package/-P from the existing constraints
     existing_pins = {}
+    # What requires each package of the existing output file
+    existing_required_by = None
+    existing_graph = None
 
     # Proxy with a LocalRequirementsRepository if --upgrade is not specified
-    # (= default invocation)
-    output_file_exists = os.path.exists(output_file.name)
+    # (= default invocation). Only a regular file is read back, as reading a
+    # pipe or a terminal given as the output file would block.
+    output_file_exists = os.path.isfile(output_file.name)
     if not upgrade and output_file_exists:
         output_file_is_empty = os.path.getsize(output_file.name) == 0
         if upgrade_install_reqs and output_file_is_empty:
@@ -347,14 +573,11 @@ def cli(
                 "as any existing content is truncated."
             )
 
-        # Use a temporary repository to ensure outdated(removed) options from
-        # existing requirements.txt wouldn't get into the current repository.
-        tmp_repository = PyPIRepository(pip_args, cache_dir=cache_dir)
-        ireqs = parse_requirements(
-            output_file.name,
-            finder=tmp_repository.finder,
-            session=tmp_repository.session,
-            options=tmp_repository.options,
+        # Parse without the finder and options of the repository, so that outdated
+        # (removed) options from the existing requirements.txt don't get into it.
+        # pip only uses the session to fetch the files included by URL.
+        ireqs = parse_compiled_requirements(
+            output_file.name, session=repository.session
         )
 
         for ireq in filter(is_pinned_requirement, ireqs):
@@ -365,6 +588,23 @@ def cli(
             existing_pins, repository, reuse_hashes=reuse_hashes
         )
 
+        if incremental:
+            existing_graph = read_graph(get_graph_path(output_file.name))
+            if existing_graph is not None:
+                existing_required_by = get_graph_required_by(
+                    existing_graph, existing_pins
+                )
+                if existing_required_by is None:
+                    log.debug("Ignoring the graph of another output file")
+                    existing_graph = None
+            if existing_required_by is None:
+                if emit_graph:
+                    # A graph is emitted only from a complete one
+                    incremental = False
+                else:
+                    with open(output_file.name, encoding="utf-8") as existing_output:
+                        existing_required_by = parse_annotations(existing_output)
+
     ###
     # Parsing/collecting initial requirements
     ###
@@ -477,6 +717,39 @@ def cli(
     for req in constraints:
         drop_extras(req)
 
+    # An incremental resolution leaves most of the existing pins alone, so these
+    # are not worth prefetching, nor are the pins the resolver prunes anyway
+    prefetched_pins = {}
+    if not incremental:
+        prefetched_pins = {
+            key: ireq for key, ireq in existing_pins.items() if ireq.match_markers()
+        }
+    if prefetch_jobs:
+        # Fetch the index pages of all the packages which are known to be
+        # involved, instead of waiting for the resolver to ask for them one by one
+        repository.prefetch(
+            itertools.chain(
+                (
+                    ireq.name
+                    for ireq in constraints
+                    if ireq.name and not ireq.editable and not is_url_requirement(ireq)
+                ),
+                prefetched_pins,
+            ),
+            max_workers=prefetch_jobs,
+        )
+
+    metadata_cache = (
+        MetadataCache(cache_dir) if resolver_name == "backtracking" else None
+    )
+    metadata_prefetch: _t.ContextManager[None] = contextlib.nullcontext()
+    if prefetch_jobs and metadata_cache is not None and not rebuild:
+        # The existing pins are likely to be picked again, so fetch their metadata
+        # in the background while resolving, instead of one by one
+        metadata_prefetch = repository.prefetch_metadata(
+            prefetched_pins.values(), metadata_cache, max_workers=prefetch_jobs
+        )
+
     if repository.finder.index_urls:
         log.debug("Using indexes:")
         with log.indentation():
@@ -495,6 +768,15 @@ def cli(
     unsafe_package = tuple(canonicalize_name(pkg_name) for pkg_name in unsafe_package)
 
     resolver_cls = LegacyResolver if resolver_name == "legacy" else BacktrackingResolver
+    resolver_kwargs: dict[str, _t.Any] = {}
+    if metadata_cache is not None:
+        resolver_kwargs["metadata_cache"] = metadata_cache
+    if existing_required_by is not None:
+        resolver_kwargs["existing_required_by"] = existing_required_by
+    if incremental:
+        resolver_kwargs["incremental"] = True
+    if emit_graph:
+        resolver_kwargs["record_graph"] = True
     try:
         resolver = resolver_cls(
             constraints=constraints,
@@ -507,9 +789,17 @@ def cli(
             clear_caches=rebuild,
             allow_unsafe=allow_unsafe,
             unsafe_packages=set(unsafe_package),
+            **resolver_kwargs,
+        )
+        with metadata_prefetch:
+            results = resolver.resolve(max_rounds=max_rounds)
+        hashes = (
+            resolver.resolve_hashes(
+                results, max_workers=hash_jobs, wheel_tag_filter=wheel_tag_filter
+            )
+            if generate_hashes
+            else None
         )
-        results = resolver.resolve(max_rounds=max_rounds)
-        hashes = resolver.resolve_hashes(results) if generate_hashes else None
     except NoCandidateFound as e:
         if resolver_cls == LegacyResolver:  # pragma: no branch
             log.error(
@@ -524,6 +814,21 @@ def cli(
         log.error(str(e))
         sys.exit(2)
 
+    if pypi_repository.hash_sources:
+        hash_sources = ", ".join(
+            f"{count} from {source}"
+            for source, count in pypi_repository.hash_sources.most_common()
+        )
+        log.debug(
+            f"Hashes: {hash_sources}; "
+            f"{pypi_repository.hash_bytes_not_downloaded} bytes not downloaded"
+        )
+    if pypi_repository.dependencies_cache_hits:
+        log.debug(
+            f"Dependencies: {pypi_repository.dependencies_cache_hits} found in "
+            f"memory, {pypi_repository.dependencies_cache_misses} looked up"
+        )
+
     log.debug("")
 
     linesep = _determine_linesep(
@@ -573,5 +878,22 @@ def cli(
         hashes=hashes,
     )
 
+    if emit_graph and not dry_run:
+        assert isinstance(resolver, BacktrackingResolver)
+        write_graph(
+            get_graph_path(output_file.name),
+            build_graph(
+                results | resolver.unsafe_constraints,
+                resolver.graph_records,
+                existing_graph or {},
+            ),
+        )
+
+    if skip_unchanged and not dry_run:
+        output_file.seek(0)
+        fingerprint = get_fingerprint(ctx, src_files, constraint, output_file.read())
+        if fingerprint is not None:
+            write_fingerprint(get_fingerprint_path(output_file.name), fingerprint)
+
     if dry_run:
         log.info("Dry-run, so nothing updated.")
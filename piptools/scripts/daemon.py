@@ -0,0 +1,284 @@
+"""
+A long-lived process running pip-compile, and the client forwarding the
+arguments of pip-compile to it.
+
+The client is run for each compile, so this module only imports what the
+client needs; pip and the compile machinery are imported by the daemon.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import socket
+import struct
+import sys
+import typing as _t
+from collections.abc import Iterator
+
+import click
+
+from ..locations import CACHE_DIR
+from ..logging import log
+
+if _t.TYPE_CHECKING:
+    from ..repositories import RepositoryPool
+
+DEFAULT_SOCKET = os.path.join(CACHE_DIR, "daemon.sock")
+
+# Number of seconds the index data fetched by a compile is reused for
+DEFAULT_TTL = 600
+
+# A frame is a channel byte, the size of the data and the data. The client sends
+# a request frame; the daemon answers with output frames and then an exit frame.
+_FRAME_HEADER = struct.Struct("!cI")
+_REQUEST = b"r"
+_STDOUT = b"o"
+_STDERR = b"e"
+_EXIT = b"x"
+
+# The options are defined here rather than in ``options`` which imports pip
+socket_option = click.option(
+    "--socket",
+    "socket_path",
+    default=DEFAULT_SOCKET,
+    envvar="PIP_TOOLS_DAEMON_SOCKET",
+    show_default=True,
+    show_envvar=True,
+    type=click.Path(dir_okay=False),
+    help="Path of the Unix socket the daemon listens on.",
+)
+
+ttl_option = click.option(
+    "--ttl",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_TTL,
+    show_default=True,
+    help=(
+        "Number of seconds the index data and the repositories of a compile "
+        "are reused for by the next compiles."
+    ),
+)
+
+
+@click.group(name="pip-compile-daemon")
+def cli() -> None:
+    """
+    Keep pip-compile running in the background, so that each compile is spared
+    importing pip, building its session and finder, and fetching again the
+    index pages fetched by the previous compiles.
+    """
+
+
+@cli.command()
+@socket_option
+@ttl_option
+def serve(socket_path: str, ttl: float) -> None:
+    """Run the daemon in the foreground, compiling one request at a time."""
+    if not hasattr(socket, "AF_UNIX"):  # pragma: posix no cover
+        raise click.ClickException("The daemon needs Unix sockets")
+
+    # Imported here, as the client has no use for pip
+    from ..repositories import RepositoryPool
+
+    pool = RepositoryPool(ttl=ttl)
+    with _listen(socket_path) as server:
+        log.info(f"Listening on {socket_path}")
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                try:
+                    if not _handle_request(connection, pool):
+                        break
+                except OSError as e:
+                    # The client went away, which must not stop the daemon
+                    log.error(f"Failed to answer a request: {e}")
+
+
+@cli.command(
+    name="compile",
+    add_help_option=False,
+    context_settings={"ignore_unknown_options": True},
+)
+@socket_option
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+@click.pass_context
+def compile_(ctx: click.Context, socket_path: str, args: tuple[str, ...]) -> None:
+    """
+    Run pip-compile with the given ARGS in the daemon, or in this process if no
+    daemon is listening.
+    """
+    connection = None if _reads_stdin(args) else _connect(socket_path)
+    if connection is None:
+        from .compile import cli as compile_cli
+
+        compile_cli.main(list(args), prog_name="pip-compile")
+        return
+
+    request = {
+        "args": args,
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+        "color": sys.stderr.isatty(),
+    }
+    with connection:
+        ctx.exit(_send_request(connection, request))
+
+
+@cli.command()
+@socket_option
+def stop(socket_path: str) -> None:
+    """Stop the daemon."""
+    connection = _connect(socket_path)
+    if connection is None:
+        raise click.ClickException(f"No daemon is listening on {socket_path}")
+    with connection:
+        _send_request(connection, {"command": "stop"})
+
+
+@contextlib.contextmanager
+def _listen(socket_path: str) -> Iterator[socket.socket]:
+    """Listen on the given socket path, replacing the socket of a dead daemon."""
+    connection = _connect(socket_path)
+    if connection is not None:
+        connection.close()
+        raise click.ClickException(f"A daemon is already listening on {socket_path}")
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(socket_path)
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Only the user running the daemon may ask it to compile
+    umask = os.umask(0o177)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(umask)
+    server.listen()
+    try:
+        yield server
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(socket_path)
+
+
+def _connect(socket_path: str) -> socket.socket | None:
+    """Connect to the daemon, returning ``None`` if none is listening."""
+    if not hasattr(socket, "AF_UNIX"):  # pragma: posix no cover
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        connection.close()
+        return None
+    return connection
+
+
+def _reads_stdin(args: tuple[str, ...]) -> bool:
+    """Tell whether pip-compile reads a source file from stdin with these args."""
+    return any(
+        arg == "-" and previous not in {"-o", "--output-file"}
+        for previous, arg in zip(("", *args), args)
+    )
+
+
+def _send_request(connection: socket.socket, request: dict[str, _t.Any]) -> int:
+    """
+    Send a request to the daemon, copy the output of the daemon to the
+    standard streams and return the exit code of the request.
+    """
+    _send_frame(connection, _REQUEST, json.dumps(request).encode())
+    outputs: dict[bytes, _t.BinaryIO] = {
+        _STDOUT: sys.stdout.buffer,
+        _STDERR: sys.stderr.buffer,
+    }
+    with connection.makefile("rb") as reader:
+        for channel, data in _iter_frames(reader):
+            if channel == _EXIT:
+                return int(data)
+            outputs[channel].write(data)
+            outputs[channel].flush()
+    raise click.ClickException("The daemon stopped before answering")
+
+
+def _handle_request(connection: socket.socket, pool: RepositoryPool) -> bool:
+    """
+    Answer a request of a client, returning whether to keep answering requests.
+    """
+    from .compile import _run_compile
+
+    with connection.makefile("rb") as reader:
+        channel, data = next(_iter_frames(reader), (b"", b""))
+    if channel != _REQUEST:
+        return True
+    request = json.loads(data)
+    if request.get("command") == "stop":
+        _send_frame(connection, _EXIT, b"0")
+        return False
+
+    stdout = _open_channel(connection, _STDOUT)
+    stderr = _open_channel(connection, _STDERR)
+    with _client_environment(request["cwd"], request["env"]):
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exit_code = _run_compile(
+                request["args"], obj=pool, color=request["color"] or None
+            )
+            stdout.flush()
+            stderr.flush()
+    _send_frame(connection, _EXIT, str(exit_code).encode())
+    return True
+
+
+@contextlib.contextmanager
+def _client_environment(cwd: str, environ: dict[str, str]) -> Iterator[None]:
+    """Run in the working directory and with the environment of a client."""
+    daemon_cwd = os.getcwd()
+    daemon_environ = dict(os.environ)
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(environ)
+    try:
+        yield
+    finally:
+        os.chdir(daemon_cwd)
+        os.environ.clear()
+        os.environ.update(daemon_environ)
+
+
+class _ChannelWriter(io.RawIOBase):
+    """A binary stream sending what is written to it as frames of a channel."""
+
+    def __init__(self, connection: socket.socket, channel: bytes) -> None:
+        self._connection = connection
+        self._channel = channel
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: _t.Any) -> int:
+        data = bytes(data)
+        _send_frame(self._connection, self._channel, data)
+        return len(data)
+
+
+def _open_channel(connection: socket.socket, channel: bytes) -> io.TextIOWrapper:
+    return io.TextIOWrapper(
+        io.BufferedWriter(_ChannelWriter(connection, channel)),
+        encoding="utf-8",
+        errors="replace",
+        line_buffering=True,
+    )
+
+
+def _send_frame(connection: socket.socket, channel: bytes, data: bytes) -> None:
+    connection.sendall(_FRAME_HEADER.pack(channel, len(data)) + data)
+
+
+def _iter_frames(reader: io.BufferedIOBase) -> Iterator[tuple[bytes, bytes]]:
+    while len(header := reader.read(_FRAME_HEADER.size)) == _FRAME_HEADER.size:
+        channel, size = _FRAME_HEADER.unpack(header)
+        yield channel, reader.read(size)
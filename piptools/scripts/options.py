@@ -281,6 +281,89 @@ reuse_hashes = click.option(
     ),
 )
 
+hash_jobs = click.option(
+    "--hash-jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help=(
+        "Number of threads used to download and hash package files when "
+        "generating hashes."
+    ),
+)
+
+hash_platform = click.option(
+    "--hash-platform",
+    "hash_platforms",
+    multiple=True,
+    help=(
+        "Only hash the wheels of this platform, like manylinux2014_x86_64, and "
+        "the source distributions, when generating hashes; may be used more "
+        "than once."
+    ),
+)
+
+hash_python_version = click.option(
+    "--hash-python-version",
+    "hash_python_versions",
+    multiple=True,
+    help=(
+        "Only hash the wheels of this Python version, like 3.12, and the source "
+        "distributions, when generating hashes; may be used more than once."
+    ),
+)
+
+prefetch_jobs = click.option(
+    "--prefetch-jobs",
+    type=click.IntRange(min=0),
+    default=8,
+    show_default=True,
+    help=(
+        "Number of threads used to fetch the index pages of all the known "
+        "packages before resolving; 0 disables prefetching."
+    ),
+)
+
+batch = click.option(
+    "--batch",
+    "batch_targets",
+    nargs=2,
+    multiple=True,
+    type=(
+        click.Path(exists=True, dir_okay=False),
+        click.Path(dir_okay=False, allow_dash=True),
+    ),
+    metavar="SRC_FILE OUTPUT_FILE",
+    help=(
+        "Compile SRC_FILE to OUTPUT_FILE with the other given options; may be "
+        "used more than once to compile several files at once, instead of "
+        "passing source files and --output-file."
+    ),
+)
+
+batch_jobs = click.option(
+    "--batch-jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help=(
+        "Number of processes compiling the --batch files at once "
+        "(defaults to the number of CPUs)."
+    ),
+)
+
+incremental = click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help=(
+        "Only resolve again the packages upgraded or required differently "
+        "since the existing output file was compiled, and the packages they "
+        "depend on, keeping the other pins; the dependencies between the "
+        "pins are read from the annotations of the output file. Requires the "
+        "backtracking resolver."
+    ),
+)
+
 max_rounds = click.option(
     "--max-rounds",
     default=10,
@@ -353,6 +436,42 @@ emit_options = click.option(
     help="Add options to generated file",
 )
 
+skip_unchanged = click.option(
+    "--skip-unchanged",
+    is_flag=True,
+    default=False,
+    help=(
+        "Do not compile again if the inputs of the compile did not change since "
+        "the output file was compiled with this option, as told by the "
+        "fingerprint saved to OUTPUT_FILE.fingerprint. The inputs are the "
+        "source, constraints and included files, the metadata files of local "
+        "projects, the options, the pip configuration and the versions of "
+        "Python, pip and pip-tools. Ignored with --upgrade, --upgrade-package "
+        "and --rebuild."
+    ),
+)
+
+check = click.option(
+    "--check",
+    is_flag=True,
+    default=False,
+    help=(
+        "Do not compile, but exit with status 1 if the output file is not up to "
+        "date with its inputs, as --skip-unchanged would tell."
+    ),
+)
+
+emit_graph = click.option(
+    "--emit-graph",
+    is_flag=True,
+    default=False,
+    help=(
+        "Write the dependency graph of the result to OUTPUT_FILE.graph.json, "
+        "which --incremental then reads instead of the annotations of the output "
+        "file. Requires the backtracking resolver."
+    ),
+)
+
 unsafe_package = click.option(
     "--unsafe-package",
     multiple=True,
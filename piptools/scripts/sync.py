@@ -15,7 +15,7 @@ from pip._internal.index.package_finder import PackageFinder
 from pip._internal.metadata import get_environment
 
 from .. import sync
-from .._compat import Distribution, parse_requirements
+from .._compat import Distribution, parse_compiled_requirements
 from .._internal import _pip_api
 from ..exceptions import PipToolsError
 from ..logging import log
@@ -125,7 +125,8 @@ def cli(
     # Parse requirements file. Note, all options inside requirements file
     # will be collected by the finder.
     requirements = flat_map(
-        lambda src: parse_requirements(src, finder=finder, session=session), src_files
+        lambda src: parse_compiled_requirements(src, finder=finder, session=session),
+        src_files,
     )
 
     try:
@@ -3,6 +3,7 @@ from __future__ import annotations
 import collections
 import copy
 import difflib
+import hashlib
 import itertools
 import json
 import os
@@ -10,11 +11,13 @@ import re
 import shlex
 import typing as _t
 from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from pathlib import Path
 
 import click
 from click.core import ParameterSource
 from click.utils import LazyFile
+from pip._internal.metadata import BaseDistribution
 from pip._internal.req import InstallRequirement
 from pip._internal.resolution.resolvelib.base import Requirement as PipRequirement
 from pip._internal.utils.misc import redact_auth_from_url
@@ -22,12 +25,13 @@ from pip._internal.vcs import is_url
 from pip._vendor.packaging.markers import Marker
 from pip._vendor.packaging.requirements import Requirement
 from pip._vendor.packaging.specifiers import SpecifierSet
+from pip._vendor.packaging.tags import Tag
 from pip._vendor.pkg_resources import get_distribution
 
 from piptools.locations import DEFAULT_CONFIG_FILE_NAMES
 
 from ._compat import _tomllib_compat, canonicalize_name
-from ._internal import _subprocess
+from ._internal import _pip_api, _subprocess
 
 _KT = _t.TypeVar("_KT")
 _VT = _t.TypeVar("_VT")
@@ -45,6 +49,14 @@ COMPILE_EXCLUDE_OPTIONS = {
     "--cache-dir",
     "--no-reuse-hashes",
     "--no-config",
+    "--hash-jobs",
+    "--prefetch-jobs",
+    "--batch",
+    "--batch-jobs",
+    "--incremental",
+    "--emit-graph",
+    "--skip-unchanged",
+    "--check",
 }
 
 # Set of option that are only negative, i.e. --no-<option>
@@ -302,6 +314,20 @@ def get_hashes_from_ireq(ireq: InstallRequirement) -> set[str]:
     return result
 
 
+def get_metadata_sha256(dist: BaseDistribution) -> str | None:
+    """
+    Return the SHA256 hash of the core metadata file of a distribution
+    (``METADATA``, or ``PKG-INFO``), or None if it has none.
+    """
+    for metadata_name in ("METADATA", "PKG-INFO"):
+        try:
+            metadata = dist.read_text(metadata_name)
+        except FileNotFoundError:
+            continue
+        return hashlib.sha256(metadata.encode()).hexdigest()
+    return None
+
+
 def get_compile_command(click_ctx: click.Context) -> str:
     """
     Return a normalized compile command depending on cli context.
@@ -442,6 +468,115 @@ def strip_extras(name: str) -> str:
     return re.sub(_strip_extras_re, "", name)
 
 
+_requirement_name_re = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*")
+_commented_requirement_re = re.compile(r"^#\s(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)$")
+_annotation_re = re.compile(r"#\s?via(?:\s+(?P<sources>.*))?$")
+_annotation_source_re = re.compile(r"#\s+(?P<source>\S.*)$")
+
+
+def parse_annotations(lines: Iterable[str]) -> dict[str, set[str]]:
+    """
+    Parse the ``# via`` annotations of a requirements file written by
+    pip-compile, in either annotation style.
+
+    :param lines: the lines of the requirements file
+    :return: the sources of each requirement, i.e. the names of the packages
+        requiring it and the files listing it, by the key of the requirement;
+        the requirements which are commented out, as the unsafe packages are,
+        have no known sources
+    """
+    required_by: dict[str, set[str]] = {}
+    sources: set[str] | None = None
+    in_annotation = False
+    for line in lines:
+        if line[:1].isspace():
+            # The hashes and the annotation of the current requirement
+            if sources is None:
+                continue
+            text = line.strip()
+            annotation = _annotation_re.match(text)
+            source = _annotation_source_re.match(text)
+            if annotation is not None:
+                in_annotation = True
+                if annotation["sources"]:
+                    sources.update(map(str.strip, annotation["sources"].split(",")))
+            elif in_annotation and source is not None:
+                sources.add(source["source"].strip())
+            continue
+
+        in_annotation = False
+        sources = None
+        commented = _commented_requirement_re.match(line.rstrip())
+        if commented is not None:
+            required_by.setdefault(canonicalize_name(commented["name"]), set())
+            continue
+        name = _requirement_name_re.match(line)
+        if name is None:
+            # A comment, an option or an editable requirement
+            continue
+        sources = required_by.setdefault(canonicalize_name(name.group()), set())
+        _, _, comment = line.partition("#")
+        annotation = _annotation_re.match(f"#{comment}".strip())
+        if annotation is not None and annotation["sources"]:
+            sources.update(map(str.strip, annotation["sources"].split(",")))
+
+    return required_by
+
+
+@dataclass(frozen=True)
+class WheelTagFilter:
+    """
+    A filter of the wheel tags of some platforms and Python versions, which
+    accepts the tags of all the platforms or all the Python versions when
+    ``platforms`` or ``interpreter_abis`` is ``None``.
+    """
+
+    platforms: frozenset[str] | None
+    interpreter_abis: frozenset[tuple[str, str]] | None
+
+    def __call__(self, tag: Tag) -> bool:
+        return (self.platforms is None or tag.platform in self.platforms) and (
+            self.interpreter_abis is None
+            or (tag.interpreter, tag.abi) in self.interpreter_abis
+        )
+
+
+def get_wheel_tag_filter(
+    platforms: Iterable[str], python_versions: Iterable[str]
+) -> WheelTagFilter | None:
+    """
+    Get the filter of the wheel tags supported by any of the given platforms
+    and by any of the given Python versions, as pip understands them.
+
+    :param platforms: platforms like ``manylinux2014_x86_64``
+    :param python_versions: Python versions like ``3.12``
+    :return: the filter, or ``None`` if neither platforms nor Python versions
+        are given
+    :raises ValueError: if a Python version is invalid
+    """
+    platforms = list(platforms)
+    py_version_infos = [
+        _pip_api.parse_python_version(python_version)
+        for python_version in python_versions
+    ]
+    if not platforms and not py_version_infos:
+        return None
+
+    supported_platforms = None
+    if platforms:
+        supported_platforms = frozenset(
+            tag.platform for tag in _pip_api.get_supported_tags(platforms=platforms)
+        )
+    interpreter_abis = None
+    if py_version_infos:
+        interpreter_abis = frozenset(
+            (tag.interpreter, tag.abi)
+            for py_version_info in py_version_infos
+            for tag in _pip_api.get_supported_tags(py_version_info=py_version_info)
+        )
+    return WheelTagFilter(supported_platforms, interpreter_abis)
+
+
 def override_defaults_from_config_file(
     ctx: click.Context, param: click.Parameter, value: str | None
 ) -> Path | None:
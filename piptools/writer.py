@@ -65,6 +65,27 @@ def _comes_from_as_string(comes_from: str | InstallRequirement) -> str:
     return canonicalize_name(key_from_ireq(comes_from))
 
 
+def get_required_by(ireq: InstallRequirement) -> set[str]:
+    """Return the packages and the source files requiring a package."""
+    required_by: set[str] = set()
+    if hasattr(ireq, "_source_ireqs"):
+        required_by |= {
+            _comes_from_as_string(src_ireq.comes_from)
+            for src_ireq in ireq._source_ireqs
+            if src_ireq.comes_from
+        }
+
+    # Filter out the origin install requirements for extras.
+    # See https://github.com/jazzband/pip-tools/issues/2003
+    if ireq.comes_from and (
+        isinstance(ireq.comes_from, str) or ireq.comes_from.name != ireq.name
+    ):
+        required_by.add(_comes_from_as_string(ireq.comes_from))
+
+    required_by |= set(getattr(ireq, "_required_by", set()))
+    return required_by
+
+
 def annotation_style_split(required_by: set[str]) -> str:
     sorted_required_by = sorted(required_by)
     if len(sorted_required_by) == 1:
@@ -302,23 +323,7 @@ class OutputWriter:
             return line
 
         # Annotate what packages or reqs-ins this package is required by
-        required_by = set()
-        if hasattr(ireq, "_source_ireqs"):
-            required_by |= {
-                _comes_from_as_string(src_ireq.comes_from)
-                for src_ireq in ireq._source_ireqs
-                if src_ireq.comes_from
-            }
-
-        # Filter out the origin install requirements for extras.
-        # See https://github.com/jazzband/pip-tools/issues/2003
-        if ireq.comes_from and (
-            isinstance(ireq.comes_from, str) or ireq.comes_from.name != ireq.name
-        ):
-            required_by.add(_comes_from_as_string(ireq.comes_from))
-
-        required_by |= set(getattr(ireq, "_required_by", set()))
-
+        required_by = get_required_by(ireq)
         if required_by:
             if self.annotation_style == "split":
                 annotation = annotation_style_split(required_by)
@@ -68,7 +68,7 @@ class FakeRepository(BaseRepository):
         with open(os.path.join(TEST_DATA_PATH, "fake-editables.json")) as f:
             self.editables = json.load(f)
 
-    def get_hashes(self, ireq):
+    def get_hashes(self, ireq, all_platforms=False, wheel_tag_filter=None):
         # Some fake hashes
         return {
             "test:123",
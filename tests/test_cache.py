@@ -1,14 +1,28 @@
 from __future__ import annotations
 
+import json
 import os
+import sqlite3
 import sys
+import time
 from contextlib import contextmanager
 from shutil import rmtree
 from tempfile import NamedTemporaryFile
 
 import pytest
+from pip._internal.models.link import Link
+from pip._internal.utils.temp_dir import global_tempdir_manager
+from pip._internal.utils.urls import path_to_url
 
-from piptools.cache import CorruptCacheError, DependencyCache, read_cache_file
+from piptools._internal._pip_api import get_metadata_distribution
+from piptools.cache import (
+    CorruptCacheError,
+    DependencyCache,
+    HashCache,
+    MetadataCache,
+    ProjectCache,
+    read_cache_file,
+)
 
 
 @contextmanager
@@ -77,10 +91,86 @@ def test_read_cache_permission_error(tmp_path):
     cache = DependencyCache(cache_dir=tmp_path)
     with open(cache._cache_file, "w") as fp:
         os.fchmod(fp.fileno(), 0o000)
-    with pytest.raises(IOError, match="Permission denied"):
+    with pytest.raises(sqlite3.OperationalError, match="unable to open database"):
         cache.cache
 
 
+def test_read_cache_corrupted(tmp_path):
+    cache = DependencyCache(cache_dir=tmp_path)
+    with open(cache._cache_file, "w") as fp:
+        fp.write("not a database" * 100)
+    with pytest.raises(
+        CorruptCacheError,
+        match="The dependency cache seems to have been corrupted.",
+    ):
+        cache.cache
+
+
+def test_cache_is_persisted(from_line, tmp_path):
+    cache = DependencyCache(cache_dir=tmp_path)
+    cache[from_line("top==1.2")] = ["middle>=0.3"]
+    cache[from_line("top[xtra]==1.2")] = ["middle>=0.3", "bonus==0.4"]
+    cache.close()
+
+    cache = DependencyCache(cache_dir=tmp_path)
+    assert from_line("top==1.2") in cache
+    assert from_line("top==1.3") not in cache
+    assert cache[from_line("top[xtra]==1.2")] == ["middle>=0.3", "bonus==0.4"]
+    with pytest.raises(KeyError):
+        cache[from_line("top==1.3")]
+
+    cache.clear()
+    assert cache.cache == {}
+
+
+def test_batch_defers_writes(from_line, tmp_path):
+    cache = DependencyCache(cache_dir=tmp_path)
+    with cache.batch():
+        cache[from_line("top==1.2")] = ["middle>=0.3"]
+        with cache.batch():
+            cache[from_line("middle==0.4")] = ["bottom<6"]
+        assert cache[from_line("middle==0.4")] == ["bottom<6"]
+        assert DependencyCache(cache_dir=tmp_path).cache == {}
+        assert cache.write_count == 0
+
+    assert cache.write_count == 1
+    assert cache.bytes_written > 0
+    assert DependencyCache(cache_dir=tmp_path).cache == {
+        "top": {"1.2": ["middle>=0.3"]},
+        "middle": {"0.4": ["bottom<6"]},
+    }
+
+
+def test_batch_writes_on_error(from_line, tmp_path):
+    cache = DependencyCache(cache_dir=tmp_path)
+
+    def fail_in_batch():
+        with cache.batch():
+            cache[from_line("top==1.2")] = ["middle>=0.3"]
+            1 / 0
+
+    with pytest.raises(ZeroDivisionError):
+        fail_in_batch()
+
+    assert DependencyCache(cache_dir=tmp_path).cache == {
+        "top": {"1.2": ["middle>=0.3"]}
+    }
+
+
+def test_legacy_json_cache_is_migrated(from_line, tmp_path):
+    cache = DependencyCache(cache_dir=tmp_path)
+    with open(cache._legacy_cache_file, "w") as fp:
+        json.dump(
+            {"__format__": 1, "dependencies": {"top": {"1.2": ["middle>=0.3"]}}}, fp
+        )
+
+    assert cache[from_line("top==1.2")] == ["middle>=0.3"]
+    assert not os.path.exists(cache._legacy_cache_file)
+    assert DependencyCache(cache_dir=tmp_path).cache == {
+        "top": {"1.2": ["middle>=0.3"]}
+    }
+
+
 def test_reverse_dependencies(from_line, tmp_path):
     # Create a cache object. The keys are packages, and the values are lists
     # of packages on which the keys depend.
@@ -121,3 +211,163 @@ def test_reverse_dependencies(from_line, tmp_path):
 
     # Clean up our temp directory
     rmtree(tmp_path)
+
+
+def test_metadata_cache(tmp_path):
+    cache = MetadataCache(cache_dir=tmp_path)
+    link = Link("https://example.com/top-1.2-py3-none-any.whl#sha256=abc")
+    assert cache.get(link) is None
+
+    with global_tempdir_manager():
+        dist = get_metadata_distribution(
+            b"Metadata-Version: 2.1\n"
+            b"Name: top\n"
+            b"Version: 1.2\n"
+            b"Summary: Not cached\n"
+            b"Requires-Python: >=3.8\n"
+            b"Provides-Extra: xtra\n"
+            b"Requires-Dist: middle>=0.3\n"
+            b'Requires-Dist: bonus==0.4; extra == "xtra"\n',
+            "top-1.2-py3-none-any.whl",
+            "top",
+        )
+        cache.set(link, dist)
+    cache.close()
+
+    cache = MetadataCache(cache_dir=tmp_path)
+    assert cache.get(link) == (
+        b"Metadata-Version: 2.1\n"
+        b"Name: top\n"
+        b"Version: 1.2\n"
+        b"Requires-Python: >=3.8\n"
+        b"Provides-Extra: xtra\n"
+        b"Requires-Dist: middle>=0.3\n"
+        b'Requires-Dist: bonus==0.4; extra == "xtra"\n'
+    )
+
+    cache.clear()
+    assert cache.get(link) is None
+
+
+def test_metadata_cache_key(tmp_path):
+    cache = MetadataCache(cache_dir=tmp_path)
+    wheel_url, wheel_environment = cache.as_cache_key(
+        Link("https://example.com/top-1.2-py3-none-any.whl#sha256=abc")
+    )
+    sdist_url, sdist_environment = cache.as_cache_key(
+        Link("https://example.com/top-1.2.tar.gz")
+    )
+
+    assert wheel_url == "https://example.com/top-1.2-py3-none-any.whl"
+    assert wheel_environment == ""
+    assert sdist_url == "https://example.com/top-1.2.tar.gz"
+    assert sdist_environment != ""
+
+
+def test_hash_cache_remote_link(tmp_path):
+    cache = HashCache(cache_dir=str(tmp_path))
+    link = Link("https://example.com/pkg-1.0.tar.gz#sha1=abc")
+    assert cache.get(link) is None
+
+    cache.set(link, "sha256:123")
+
+    assert cache.get(link) == "sha256:123"
+    # The fragment is not part of the key
+    assert cache.get(Link("https://example.com/pkg-1.0.tar.gz")) == "sha256:123"
+    assert HashCache(cache_dir=str(tmp_path)).get(link) == "sha256:123"
+
+
+def test_hash_cache_local_file_changed(tmp_path):
+    cache = HashCache(cache_dir=str(tmp_path / "hashes"))
+    package_file = tmp_path / "pkg-1.0.tar.gz"
+    package_file.write_bytes(b"content")
+    link = Link(path_to_url(str(package_file)))
+
+    cache.set(link, "sha256:123")
+    assert cache.get(link) == "sha256:123"
+
+    package_file.write_bytes(b"other content")
+    assert cache.get(link) is None
+
+
+def test_hash_cache_clear(tmp_path):
+    cache = HashCache(cache_dir=str(tmp_path / "hashes"))
+    link = Link("https://example.com/pkg-1.0.tar.gz")
+    cache.set(link, "sha256:123")
+
+    cache.clear()
+
+    assert cache.get(link) is None
+
+
+def test_hash_cache_broken_entry_is_a_miss(tmp_path):
+    cache = HashCache(cache_dir=str(tmp_path))
+    link = Link("https://example.com/pkg-1.0.tar.gz")
+    cache.set(link, "sha256:123")
+    with open(cache._entry_path(cache.as_cache_key(link)), "w") as fp:
+        fp.write("not json")
+
+    assert cache.get(link) is None
+
+
+def test_hash_cache_prune(tmp_path):
+    cache = HashCache(cache_dir=str(tmp_path), max_age=60)
+    old_link = Link("https://example.com/old-1.0.tar.gz")
+    recent_link = Link("https://example.com/recent-1.0.tar.gz")
+    cache.set(old_link, "sha256:old")
+    cache.set(recent_link, "sha256:recent")
+    an_hour_ago = time.time() - 60 * 60
+    os.utime(cache._entry_path(cache.as_cache_key(old_link)), (an_hour_ago,) * 2)
+
+    cache.prune()
+
+    assert cache.get(old_link) is None
+    assert cache.get(recent_link) == "sha256:recent"
+
+
+def test_hash_cache_prune_evicts_least_recently_used(tmp_path):
+    cache = HashCache(cache_dir=str(tmp_path))
+    links = [Link(f"https://example.com/pkg-{i}.tar.gz") for i in range(3)]
+    for i, link in enumerate(links):
+        cache.set(link, f"sha256:{i}")
+        entry_mtime = time.time() - 60 * (3 - i)
+        os.utime(cache._entry_path(cache.as_cache_key(link)), (entry_mtime,) * 2)
+    entry_size = os.path.getsize(cache._entry_path(cache.as_cache_key(links[0])))
+    cache.max_size = 2 * entry_size
+
+    cache.prune()
+
+    assert [cache.get(link) for link in links] == [None, "sha256:1", "sha256:2"]
+
+
+def test_project_cache(tmp_path):
+    cache = ProjectCache(cache_dir=tmp_path)
+    project_url = "https://example.com/pypi/top/json"
+    assert cache.get_release(project_url, "1.2") is None
+    assert cache.conditional_headers(project_url) is None
+
+    cache.set(
+        project_url,
+        {"1.2": [["sdist", "https://example.com/top-1.2.tar.gz", "abc"]], "1.3": []},
+        etag='"v1"',
+    )
+    cache.close()
+
+    cache = ProjectCache(cache_dir=tmp_path)
+    assert cache.get_release(project_url, "1.2") == [
+        ["sdist", "https://example.com/top-1.2.tar.gz", "abc"]
+    ]
+    assert cache.get_release(project_url, "1.3") == []
+    assert cache.get_release(project_url, "1.4") is None
+    assert cache.conditional_headers(project_url) == {"If-None-Match": '"v1"'}
+
+    # A new page replaces all the releases of the project
+    cache.set(project_url, {"1.4": []}, last_modified="Sat, 01 Jan 2000")
+    assert cache.get_releases(project_url) == {"1.4": []}
+    assert cache.conditional_headers(project_url) == {
+        "If-Modified-Since": "Sat, 01 Jan 2000"
+    }
+
+    cache.clear()
+    assert cache.get_releases(project_url) == {}
+    assert cache.conditional_headers(project_url) is None
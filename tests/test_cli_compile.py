@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import dataclasses
 import hashlib
+import json
 import os
 import pathlib
 import re
@@ -1195,6 +1196,297 @@ def test_generate_hashes_verbose(pip_conf, runner):
     assert expected_verbose_text in out.stderr
 
 
+@pytest.mark.parametrize(
+    ("option", "expected_calls"),
+    (
+        pytest.param([], 1, id="default"),
+        pytest.param(["--prefetch-jobs", "0"], 0, id="disabled"),
+    ),
+)
+def test_prefetch_jobs(
+    pip_conf, runner, monkeypatch, current_resolver, option, expected_calls
+):
+    with open("requirements.in", "w") as fp:
+        fp.write("small-fake-a\n-e git+https://example.com/repo.git#egg=repo\n")
+    with open("requirements.txt", "w") as fp:
+        fp.write("small-fake-a==0.1\nsmall-fake-b==0.1\n")
+
+    _mock_resolver_cls(monkeypatch)
+    with (
+        mock.patch("piptools.repositories.pypi.PyPIRepository.prefetch") as prefetch,
+        mock.patch(
+            "piptools.repositories.pypi.PyPIRepository.prefetch_metadata"
+        ) as prefetch_metadata,
+    ):
+        out = runner.invoke(cli, ["--no-header", "-q", *option])
+
+    assert out.exit_code == 0, out.stderr
+    assert prefetch.call_count == expected_calls
+    if expected_calls:
+        (project_names,), kwargs = prefetch.call_args
+        assert sorted(project_names) == ["small-fake-a", "small-fake-a", "small-fake-b"]
+        assert kwargs == {"max_workers": 8}
+
+    # Only the backtracking resolver uses the metadata cache
+    if current_resolver == "backtracking" and expected_calls:
+        (pins, _), kwargs = prefetch_metadata.call_args
+        assert sorted(str(pin.req) for pin in pins) == [
+            "small-fake-a==0.1",
+            "small-fake-b==0.1",
+        ]
+        assert kwargs == {"max_workers": 8}
+    else:
+        assert not prefetch_metadata.called
+
+
+def test_generate_hashes_with_hash_jobs(pip_conf, runner):
+    with open("requirements.in", "w") as fp:
+        fp.write("small-fake-a==0.1\nsmall-fake-b==0.1\n")
+
+    out = runner.invoke(
+        cli, ["--generate-hashes", "--hash-jobs", "2", "--no-header", "-q"]
+    )
+
+    assert out.exit_code == 0, out.stderr
+    with open("requirements.txt") as fp:
+        content = fp.read()
+    assert content.count("--hash=sha256:") == 2
+    assert "--hash-jobs" not in content
+
+
+@pytest.mark.parametrize(
+    ("options", "expected_hash_count"),
+    (
+        pytest.param(["--hash-platform", "manylinux1_x86_64"], 2, id="platform"),
+        pytest.param(
+            ["--hash-platform", "manylinux1_i686", "--hash-platform", "win32"],
+            3,
+            id="platforms",
+        ),
+        pytest.param(["--hash-python-version", "3.12"], 4, id="python version"),
+        pytest.param(
+            ["--hash-platform", "win32", "--hash-python-version", "2.7"],
+            2,
+            id="platform and python version",
+        ),
+    ),
+)
+def test_generate_hashes_of_declared_targets(
+    pip_conf, runner, options, expected_hash_count
+):
+    """
+    Only the wheels of the declared platforms and Python versions are hashed,
+    besides the source distributions.
+    """
+    with open("requirements.in", "w") as fp:
+        fp.write("small-fake-multi-arch==0.1\n")
+
+    out = runner.invoke(cli, ["--generate-hashes", "--no-header", "-q", *options])
+
+    assert out.exit_code == 0, out.stderr
+    with open("requirements.txt") as fp:
+        content = fp.read()
+    assert content.count("--hash=sha256:") == expected_hash_count
+
+
+@pytest.mark.parametrize(
+    ("options", "expected_error"),
+    (
+        pytest.param(
+            ["--hash-platform", "win32"],
+            "--hash-platform and --hash-python-version require --generate-hashes",
+            id="without generating hashes",
+        ),
+        pytest.param(
+            ["--generate-hashes", "--hash-python-version", "3.x"],
+            "--hash-python-version: each version part must be an integer",
+            id="invalid python version",
+        ),
+    ),
+)
+def test_generate_hashes_of_declared_targets_errors(
+    pip_conf, runner, options, expected_error
+):
+    with open("requirements.in", "w") as fp:
+        fp.write("small-fake-multi-arch==0.1\n")
+
+    out = runner.invoke(cli, options)
+
+    assert out.exit_code == 2
+    assert expected_error in out.stderr
+
+
+def test_generate_hashes_reports_hash_sources(pip_conf, runner):
+    with open("requirements.in", "w") as fp:
+        fp.write("small-fake-a==0.1\n")
+
+    out = runner.invoke(cli, ["--generate-hashes", "--no-header", "--verbose"])
+
+    assert out.exit_code == 0, out.stderr
+    assert "Hashes: 1 from local files; 0 bytes not downloaded" in out.stderr
+
+
+@pytest.mark.parametrize("batch_jobs", ("1", "2"))
+def test_batch(pip_conf, runner, batch_jobs):
+    with open("a.in", "w") as fp:
+        fp.write("small-fake-a==0.1\n")
+    with open("b.in", "w") as fp:
+        fp.write("small-fake-b==0.2\n")
+
+    out = runner.invoke(
+        cli,
+        [
+            "--no-annotate",
+            "--batch",
+            "a.in",
+            "a.txt",
+            "--batch",
+            "b.in",
+            "b.txt",
+            "--batch-jobs",
+            batch_jobs,
+        ],
+    )
+
+    assert out.exit_code == 0, out.stderr
+    with open("a.txt") as fp:
+        content = fp.read()
+    assert "--no-annotate" in content
+    assert "--output-file=a.txt a.in" in content
+    assert "small-fake-a==0.1" in content
+    with open("b.txt") as fp:
+        content = fp.read()
+    assert "--no-annotate" in content
+    assert "--output-file=b.txt b.in" in content
+    assert "small-fake-b==0.2" in content
+
+
+def test_batch_shares_repository_in_process(pip_conf, runner):
+    """
+    The targets compiled in this process share one repository.
+    """
+    from piptools.repositories import PyPIRepository
+
+    with open("a.in", "w") as fp:
+        fp.write("small-fake-a==0.1\n")
+    with open("b.in", "w") as fp:
+        fp.write("small-fake-b==0.2\n")
+
+    with mock.patch(
+        "piptools.repositories.pool.PyPIRepository", wraps=PyPIRepository
+    ) as repository_cls:
+        out = runner.invoke(
+            cli,
+            [
+                "--batch",
+                "a.in",
+                "a.txt",
+                "--batch",
+                "b.in",
+                "b.txt",
+                "--batch-jobs",
+                "1",
+            ],
+        )
+
+    assert out.exit_code == 0, out.stderr
+    assert repository_cls.call_count == 1
+    assert os.path.exists("a.txt")
+    assert os.path.exists("b.txt")
+
+
+def test_batch_target_args(runner, monkeypatch):
+    with open("a.in", "w") as fp:
+        fp.write("small-fake-a==0.1\n")
+    with open("-b.in", "w") as fp:
+        fp.write("small-fake-b==0.2\n")
+    compile_batch_target = mock.Mock(return_value=0)
+    monkeypatch.setattr(
+        "piptools.scripts.compile._compile_batch_target", compile_batch_target
+    )
+
+    out = runner.invoke(
+        cli,
+        [
+            "-vv",
+            "--no-annotate",
+            "--generate-hashes",
+            "--extra-index-url",
+            "https://a.example/simple",
+            "--extra-index-url",
+            "https://b.example/simple",
+            "--batch",
+            "a.in",
+            "a.txt",
+            "--batch",
+            "-b.in",
+            "b.txt",
+            "--batch-jobs",
+            "1",
+        ],
+    )
+
+    assert out.exit_code == 0, out.stderr
+    options = [
+        "--verbose",
+        "--verbose",
+        "--extra-index-url",
+        "https://a.example/simple",
+        "--extra-index-url",
+        "https://b.example/simple",
+        "--no-annotate",
+        "--generate-hashes",
+    ]
+    assert compile_batch_target.call_args_list == [
+        mock.call(
+            "a.in",
+            "a.txt",
+            [*options, "--output-file", "a.txt", "--", "a.in"],
+            pool=mock.ANY,
+        ),
+        mock.call(
+            "-b.in",
+            "b.txt",
+            [*options, "--output-file", "b.txt", "--", "-b.in"],
+            pool=mock.ANY,
+        ),
+    ]
+
+
+def test_batch_reports_failed_targets(pip_conf, runner):
+    with open("a.in", "w") as fp:
+        fp.write("small-fake-a==0.1\n")
+    with open("b.in", "w") as fp:
+        fp.write("small-fake-a==0.1\nsmall-fake-a==0.2\n")
+
+    out = runner.invoke(
+        cli,
+        ["--batch", "a.in", "a.txt", "--batch", "b.in", "b.txt", "--batch-jobs", "1"],
+    )
+
+    assert out.exit_code != 0
+    assert "Failed to compile b.in to b.txt" in out.stderr
+    assert "Failed to compile a.in" not in out.stderr
+    assert os.path.exists("a.txt")
+
+
+@pytest.mark.parametrize(
+    "options",
+    (
+        pytest.param(["a.in"], id="source file"),
+        pytest.param(["--output-file", "a.txt"], id="output file"),
+    ),
+)
+def test_batch_conflicting_options(runner, options):
+    with open("a.in", "w") as fp:
+        fp.write("small-fake-a==0.1\n")
+
+    out = runner.invoke(cli, ["--batch", "a.in", "b.txt", *options])
+
+    assert out.exit_code == 2
+    assert "--batch cannot be used with" in out.stderr
+
+
 @pytest.mark.network
 def test_generate_hashes_with_annotations(runner):
     with open("requirements.in", "w") as fp:
@@ -2316,6 +2608,288 @@ def test_remove_outdated_options(runner, input_opts, output_opts):
     assert out.stdout.strip() == input_opts
 
 
+def test_existing_output_file_parsed_with_one_repository(pip_conf, runner):
+    """
+    The existing requirements.txt is parsed with the session of the repository,
+    rather than with a repository of its own.
+    """
+    from piptools.repositories import PyPIRepository
+
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-a\n")
+    with open("requirements.txt", "w") as req_txt:
+        req_txt.write("--pre\n--only-binary :all:\nsmall-fake-a==0.1\n")
+
+    with mock.patch(
+        "piptools.scripts.compile.PyPIRepository", wraps=PyPIRepository
+    ) as repository_cls:
+        out = runner.invoke(cli, ["--quiet", "--no-header"])
+
+    assert out.exit_code == 0, out.stderr
+    assert repository_cls.call_count == 1
+    with open("requirements.txt") as req_txt:
+        content = req_txt.read()
+    assert "small-fake-a==0.1" in content
+    assert "--pre" not in content
+    assert "--only-binary" not in content
+
+
+@pytest.mark.parametrize(
+    ("upgrade_package", "expected_pins"),
+    (
+        pytest.param(
+            "small-fake-b",
+            ("small-fake-a==0.1", "small-fake-b==0.3"),
+            id="dependency",
+        ),
+        pytest.param(
+            "small-fake-with-unpinned-deps",
+            ("small-fake-a==0.1", "small-fake-b==0.1"),
+            id="parent",
+        ),
+    ),
+)
+@backtracking_resolver_only
+def test_incremental_upgrade_package(pip_conf, runner, upgrade_package, expected_pins):
+    """
+    With --incremental, only the upgraded package and the packages related to it
+    are resolved again, so the other pins are kept without looking them up.
+    """
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-with-unpinned-deps\nunknown-package\n")
+    with open("requirements.txt", "w") as req_txt:
+        req_txt.write(dedent("""\
+            small-fake-a==0.1
+                # via small-fake-with-unpinned-deps
+            small-fake-b==0.1
+                # via small-fake-with-unpinned-deps
+            small-fake-with-unpinned-deps==0.1
+                # via -r requirements.in
+            unknown-package==1.0
+                # via -r requirements.in
+            """))
+
+    out = runner.invoke(
+        cli,
+        [
+            "--incremental",
+            "--upgrade-package",
+            upgrade_package,
+            "--no-header",
+            "--no-emit-options",
+            # A prefetch would find out that unknown-package is not available
+            "--prefetch-jobs",
+            "0",
+        ],
+    )
+
+    assert out.exit_code == 0, out.stderr
+    pin_a, pin_b = expected_pins
+    with open("requirements.txt") as req_txt:
+        assert req_txt.read() == dedent(f"""\
+            {pin_a}
+                # via small-fake-with-unpinned-deps
+            {pin_b}
+                # via small-fake-with-unpinned-deps
+            small-fake-with-unpinned-deps==0.1
+                # via -r requirements.in
+            unknown-package==1.0
+                # via -r requirements.in
+            """)
+
+
+@backtracking_resolver_only
+def test_incremental_falls_back_to_full_resolution(pip_conf, runner):
+    """
+    The pins of packages which are not affected by the upgrade are resolved
+    again when they conflict with it.
+    """
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-with-deps\nsmall-fake-a>=0.1\n")
+    with open("requirements.txt", "w") as req_txt:
+        req_txt.write(dedent("""\
+            small-fake-a==0.2
+                # via -r requirements.in
+            """))
+
+    out = runner.invoke(cli, ["--incremental", "--no-header", "--verbose"])
+
+    assert out.exit_code == 0, out.stderr
+    assert "The pin of small-fake-a has to change" in out.stderr
+    with open("requirements.txt") as req_txt:
+        content = req_txt.read()
+    assert "small-fake-a==0.1" in content
+    assert "small-fake-with-deps==0.1" in content
+
+
+@backtracking_resolver_only
+@pytest.mark.parametrize(
+    "pin_b",
+    (
+        pytest.param('small-fake-b==0.2 ; python_version < "3"', id="markers"),
+        pytest.param("small-fake-b==9999", id="unavailable"),
+    ),
+)
+def test_incremental_resolves_pruned_pins_again(pip_conf, runner, pin_b):
+    """
+    With --incremental, the existing pins which are pruned are resolved again,
+    like the packages they depend on, rather than kept.
+    """
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-with-unpinned-deps\nsmall-fake-b\n")
+    with open("requirements.txt", "w") as req_txt:
+        req_txt.write(dedent(f"""\
+            small-fake-a==0.1
+                # via small-fake-with-unpinned-deps
+            {pin_b}
+                # via
+                #   -r requirements.in
+                #   small-fake-with-unpinned-deps
+            small-fake-with-unpinned-deps==0.1
+                # via -r requirements.in
+            """))
+
+    out = runner.invoke(cli, ["--incremental", "--no-header", "--no-emit-options"])
+
+    assert out.exit_code == 0, out.stderr
+    with open("requirements.txt") as req_txt:
+        assert req_txt.read() == dedent("""\
+            small-fake-a==0.1
+                # via small-fake-with-unpinned-deps
+            small-fake-b==0.3
+                # via
+                #   -r requirements.in
+                #   small-fake-with-unpinned-deps
+            small-fake-with-unpinned-deps==0.1
+                # via -r requirements.in
+            """)
+
+
+@backtracking_resolver_only
+def test_emit_graph(pip_conf, runner):
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-with-deps\n")
+
+    out = runner.invoke(cli, ["--emit-graph", "--no-header"])
+
+    assert out.exit_code == 0, out.stderr
+    with open("requirements.txt.graph.json") as graph_file:
+        graph = json.load(graph_file)
+    assert graph["version"] == 1
+    packages = graph["packages"]
+    assert packages.keys() == {"small-fake-a", "small-fake-with-deps"}
+    assert packages["small-fake-with-deps"]["version"] == "0.1"
+    assert packages["small-fake-with-deps"]["required_by"] == ["-r requirements.in"]
+    assert packages["small-fake-with-deps"]["dependencies"] == {
+        "small-fake-a": {"specifier": "==0.1", "markers": None}
+    }
+    assert packages["small-fake-a"]["required_by"] == ["small-fake-with-deps"]
+    assert packages["small-fake-a"]["dependencies"] == {}
+    assert len(packages["small-fake-a"]["metadata_sha256"]) == 64
+
+
+@backtracking_resolver_only
+@pytest.mark.parametrize("pinned_version", ("1.0", "2.0"))
+def test_incremental_reads_graph(pip_conf, runner, pinned_version):
+    """
+    With --incremental, the dependencies are read from the graph of the output
+    file, unless the output file does not match it.
+    """
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-a\nunknown-package\n")
+    with open("requirements.txt", "w") as req_txt:
+        req_txt.write(f"small-fake-a==0.1\nunknown-package=={pinned_version}\n")
+    graph = {
+        "version": 1,
+        "packages": {
+            "small-fake-a": {"version": "0.1", "required_by": ["-r requirements.in"]},
+            "unknown-package": {
+                "version": "1.0",
+                "required_by": ["-r requirements.in"],
+            },
+        },
+    }
+    with open("requirements.txt.graph.json", "w") as graph_file:
+        json.dump(graph, graph_file)
+
+    # A prefetch would find out that unknown-package is not available
+    out = runner.invoke(
+        cli,
+        [
+            "--incremental",
+            "-P",
+            "small-fake-a",
+            "--no-header",
+            "--prefetch-jobs",
+            "0",
+        ],
+    )
+
+    if pinned_version == "1.0":
+        assert out.exit_code == 0, out.stderr
+        with open("requirements.txt") as req_txt:
+            content = req_txt.read()
+        assert "small-fake-a==0.2" in content
+        assert "unknown-package==1.0" in content
+    else:
+        # Without annotations to fall back on, everything is resolved again
+        assert out.exit_code == 1
+        assert "requirement unknown-package" in out.stderr
+
+
+def test_skip_unchanged(pip_conf, runner):
+    with open("base.in", "w") as base_in:
+        base_in.write("small-fake-a==0.1\n")
+    with open("requirements.in", "w") as req_in:
+        req_in.write("-r base.in\n")
+
+    out = runner.invoke(cli, ["--skip-unchanged", "--no-header"])
+
+    assert out.exit_code == 0, out.stderr
+    assert os.path.exists("requirements.txt.fingerprint")
+
+    with mock.patch("piptools.scripts.compile.PyPIRepository") as pypi_repository:
+        out = runner.invoke(cli, ["--skip-unchanged", "--no-header"])
+
+    assert out.exit_code == 0, out.stderr
+    assert "requirements.txt is up to date" in out.stderr
+    pypi_repository.assert_not_called()
+
+    # A change of an included file is a change of the inputs
+    with open("base.in", "w") as base_in:
+        base_in.write("small-fake-a==0.2\n")
+
+    out = runner.invoke(cli, ["--skip-unchanged", "--no-header"])
+
+    assert out.exit_code == 0, out.stderr
+    assert "up to date" not in out.stderr
+    with open("requirements.txt") as req_txt:
+        assert "small-fake-a==0.2" in req_txt.read()
+
+
+@pytest.mark.parametrize(
+    ("changed_args", "expected_exit_code"),
+    (
+        pytest.param((), 0, id="unchanged"),
+        pytest.param(("--no-annotate",), 1, id="changed options"),
+    ),
+)
+def test_check(pip_conf, runner, changed_args, expected_exit_code):
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-a==0.1\n")
+    out = runner.invoke(cli, ["--skip-unchanged", "--no-header"])
+    assert out.exit_code == 0, out.stderr
+    with open("requirements.txt") as req_txt:
+        content = req_txt.read()
+
+    out = runner.invoke(cli, ["--check", "--no-header", *changed_args])
+
+    assert out.exit_code == expected_exit_code, out.stderr
+    # The output file is never written
+    with open("requirements.txt") as req_txt:
+        assert req_txt.read() == content
+
+
 def test_sub_dependencies_with_constraints(pip_conf, runner):
     # Write constraints file
     with open("constraints.txt", "w") as constraints_in:
@@ -2374,6 +2948,70 @@ def test_ignore_compiled_unavailable_version(pip_conf, runner, current_resolver)
     ) in out.stderr
 
 
+@backtracking_resolver_only
+@pytest.mark.parametrize(
+    ("existing_reqs", "expected_message"),
+    (
+        pytest.param(
+            """\
+            small-fake-b==0.2 ; python_version < "3"
+                # via -r requirements.in
+            """,
+            "Pruned 1 existing pin(s): 1 excluded by markers",
+            id="markers",
+        ),
+        pytest.param(
+            """\
+            small-fake-b==9999
+                # via -r requirements.in
+            """,
+            "Pruned 1 existing pin(s): 1 not available for the target Python "
+            "and platform",
+            id="unavailable",
+        ),
+    ),
+)
+def test_existing_pins_pruned_before_resolving(
+    pip_conf, runner, existing_reqs, expected_message
+):
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-b\n")
+    with open("requirements.txt", "w") as req_txt:
+        req_txt.write(dedent(existing_reqs))
+
+    out = runner.invoke(cli, ["-v", "--no-header"])
+
+    assert out.exit_code == 0, out.stderr
+    assert expected_message in out.stderr
+    # The pins which cannot be picked do not cost a resolution round
+    assert "ROUND 2" not in out.stderr
+    with open("requirements.txt") as req_txt:
+        assert "small-fake-b==0.3" in req_txt.read()
+
+
+@backtracking_resolver_only
+def test_existing_pin_kept_when_required_by_another_package(pip_conf, runner):
+    """
+    The pin of a package whose previous source was removed is kept, since
+    another package may still depend on it.
+    """
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-with-unpinned-deps\n")
+    with open("requirements.txt", "w") as req_txt:
+        req_txt.write(
+            "small-fake-a==0.1\n"
+            "    # via small-fake-with-deps\n"
+            "small-fake-with-deps==0.1\n"
+            "    # via -r requirements.in\n"
+        )
+
+    out = runner.invoke(cli, ["--no-header"])
+
+    assert out.exit_code == 0, out.stderr
+    with open("requirements.txt") as req_txt:
+        assert "small-fake-a==0.1\n" in req_txt.read()
+
+
 def test_prefer_binary_dist(
     pip_conf, make_package, make_sdist, make_wheel, tmp_path, runner
 ):
@@ -3440,6 +4078,49 @@ def test_resolver_drops_existing_conflicting_constraint(
         assert expected_requirements.issubset(req_txt_content.splitlines())
 
 
+@backtracking_resolver_only
+def test_resolver_drops_existing_conflicting_constraints_in_one_round(
+    runner, make_package, make_sdist, tmp_path
+):
+    """
+    Test that the existing requirements excluded by the dependencies of the
+    package causing a conflict are all discarded at once.
+    """
+    dists_dir = tmp_path / "dists"
+    package_specs = [
+        {"name": "test_package_1", "version": "1.0"},
+        {
+            "name": "test_package_1",
+            "version": "1.1",
+            "install_requires": ["test_package_2>=1.1", "test_package_3>=1.1"],
+        },
+        {"name": "test_package_2", "version": "1.0"},
+        {"name": "test_package_2", "version": "1.1"},
+        {"name": "test_package_3", "version": "1.0"},
+        {"name": "test_package_3", "version": "1.1"},
+    ]
+    for spec in package_specs:
+        make_sdist(make_package(**spec), dists_dir)
+
+    with open("requirements.txt", "w") as existing_reqs_out:
+        existing_reqs_out.write(
+            "test_package_1==1.0\ntest_package_2==1.0\ntest_package_3==1.0\n"
+        )
+    with open("requirements.in", "w") as constraints_out:
+        constraints_out.write("test_package_1==1.1\n")
+
+    out = runner.invoke(cli, ["-v", "--no-index", "--find-links", str(dists_dir)])
+
+    assert out.exit_code == 0, out.stderr
+    assert "Discarding test_package_2==1.0" in out.stderr
+    assert "Discarding test_package_3==1.0" in out.stderr
+    assert "ROUND 3" not in out.stderr
+    with open("requirements.txt") as req_txt:
+        req_txt_lines = req_txt.read().splitlines()
+    assert "test-package-2==1.1" in req_txt_lines
+    assert "test-package-3==1.1" in req_txt_lines
+
+
 def test_resolution_failure(runner):
     """Test resolution impossible for unknown package."""
     with open("requirements.in", "w") as reqs_out:
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from piptools.scripts.daemon import _reads_stdin, cli
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="the daemon needs Unix sockets"
+)
+
+
+@pytest.fixture
+def daemon_socket(tmp_path):
+    socket_path = str(tmp_path / "daemon.sock")
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "piptools", "daemon", "serve", "--socket", socket_path],
+        stderr=subprocess.PIPE,
+    )
+    try:
+        for _ in range(300):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.1)
+        yield socket_path
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+
+def _run_client(*args):
+    return subprocess.run(
+        [sys.executable, "-m", "piptools", "daemon", *args],
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_daemon_compiles(pip_conf, tmp_path_cwd, daemon_socket):
+    (tmp_path_cwd / "requirements.in").write_text("small-fake-a==0.1\n")
+
+    for _ in range(2):
+        out = _run_client(
+            "compile", "--socket", daemon_socket, "-v", "--no-annotate", "--no-header"
+        )
+        assert out.returncode == 0, out.stderr
+    assert "Reusing the repository of a previous compile" in out.stderr
+    assert "small-fake-a==0.1" in out.stderr
+    assert "small-fake-a==0.1" in (tmp_path_cwd / "requirements.txt").read_text()
+
+    out = _run_client("compile", "--socket", daemon_socket, "-o", "-", "--no-header")
+    assert out.returncode == 0, out.stderr
+    assert "small-fake-a==0.1" in out.stdout
+
+    out = _run_client("compile", "--socket", daemon_socket, "-o", "-", "missing.in")
+    assert out.returncode == 2
+    assert "missing.in" in out.stderr
+
+    out = _run_client("stop", "--socket", daemon_socket)
+    assert out.returncode == 0, out.stderr
+    assert not os.path.exists(daemon_socket)
+
+
+def test_compile_without_daemon(pip_conf, runner, tmp_path):
+    with open("requirements.in", "w") as req_in:
+        req_in.write("small-fake-a==0.1\n")
+
+    out = runner.invoke(
+        cli,
+        ["compile", "--socket", str(tmp_path / "missing.sock"), "--no-header"],
+    )
+
+    assert out.exit_code == 0, out.stderr
+    with open("requirements.txt") as req_txt:
+        assert "small-fake-a==0.1" in req_txt.read()
+
+
+def test_stop_without_daemon(runner, tmp_path):
+    out = runner.invoke(cli, ["stop", "--socket", str(tmp_path / "missing.sock")])
+
+    assert out.exit_code == 1
+    assert "No daemon is listening" in out.stderr
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    (
+        pytest.param(("requirements.in",), False, id="file"),
+        pytest.param(("-",), True, id="stdin"),
+        pytest.param(("-o", "-", "requirements.in"), False, id="stdout"),
+        pytest.param(("--output-file", "-", "-"), True, id="stdin and stdout"),
+    ),
+)
+def test_reads_stdin(args, expected):
+    assert _reads_stdin(args) is expected
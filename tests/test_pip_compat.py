@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 from pathlib import Path, PurePosixPath
+from unittest import mock
 
-from piptools._compat.pip_compat import parse_requirements
+import pytest
+from pip._internal.exceptions import InstallationError, RequirementsFileParseError
 
-from .constants import PACKAGES_RELATIVE_PATH
+from piptools._compat.pip_compat import (
+    parse_compiled_requirements,
+    parse_requirements,
+)
+from piptools.repositories import PyPIRepository
+
+from .constants import PACKAGES_PATH, PACKAGES_RELATIVE_PATH
 
 
 def test_parse_requirements_preserve_editable_relative_path(tmp_path, repository):
@@ -22,3 +30,141 @@ def test_parse_requirements_preserve_editable_relative_path(tmp_path, repository
 
     assert install_requirement.link.url == test_package_path
     assert install_requirement.link.file_path == test_package_path
+
+
+COMPILED_REQUIREMENTS = """\
+#
+# This file is autogenerated by pip-compile with Python 3.11
+# by the following command:
+#
+#    pip-compile --generate-hashes
+#
+--index-url https://index.example/simple
+--extra-index-url https://extra.example/simple
+--find-links https://links.example/
+--trusted-host extra.example
+--only-binary small-fake-b
+
+-e {editable_path}
+    # via -r requirements.in
+small-fake-a==0.1 \\
+    --hash=sha256:{digest_a} \\
+    --hash=sha256:{digest_b}
+    # via -r requirements.in
+small-fake-b[extra]==0.2 ; python_version >= "3.8" \\
+    --hash=sha256:{digest_b}
+    # via
+    #   -r requirements.in
+    #   small-fake-a
+small-fake-c @ https://files.example/small_fake_c-0.3-py3-none-any.whl
+    # via -r requirements.in
+"""
+
+
+def _get_install_requirement_fields(ireq):
+    return (
+        str(ireq.req),
+        ireq.comes_from,
+        ireq.editable,
+        ireq.link and ireq.link.url,
+        str(ireq.markers),
+        ireq.hash_options,
+        ireq.constraint,
+        ireq.user_supplied,
+    )
+
+
+def _parse_install_requirement_fields(parse, repository, constraint):
+    """
+    Parse ``requirements.txt``, and get the fields of its requirements, or the error
+    of the pip versions which reject the file.
+    """
+    try:
+        return list(
+            map(
+                _get_install_requirement_fields,
+                parse(
+                    "requirements.txt",
+                    session=repository.session,
+                    finder=repository.finder,
+                    options=repository.options,
+                    constraint=constraint,
+                ),
+            )
+        )
+    except InstallationError as e:
+        return str(e)
+
+
+def _get_finder_fields(finder):
+    return (
+        finder.index_urls,
+        finder.find_links,
+        list(finder.trusted_hosts),
+        finder.format_control,
+    )
+
+
+@pytest.mark.parametrize("constraint", (False, True))
+def test_parse_compiled_requirements_as_pip(tmp_path, tmp_path_cwd, constraint):
+    Path("requirements.txt").write_text(
+        COMPILED_REQUIREMENTS.format(
+            editable_path=Path(PACKAGES_PATH, "small_fake_a").as_posix(),
+            digest_a="0" * 64,
+            digest_b="1" * 64,
+        )
+    )
+    pip_repository = PyPIRepository([], cache_dir=str(tmp_path / "pip"))
+    repository = PyPIRepository([], cache_dir=str(tmp_path / "compiled"))
+
+    expected = _parse_install_requirement_fields(
+        parse_requirements, pip_repository, constraint
+    )
+    fields = _parse_install_requirement_fields(
+        parse_compiled_requirements, repository, constraint
+    )
+
+    assert fields == expected
+    assert _get_finder_fields(repository.finder) == _get_finder_fields(
+        pip_repository.finder
+    )
+
+
+@pytest.mark.parametrize(
+    "line",
+    (
+        pytest.param("-r other.txt", id="include"),
+        pytest.param("--constraint other.txt", id="constraint include"),
+        pytest.param(
+            "small-fake-b==0.2 --config-settings key=value",
+            id="per-requirement option",
+        ),
+    ),
+)
+def test_parse_compiled_requirements_falls_back_to_pip(tmp_path_cwd, repository, line):
+    Path("other.txt").write_text("small-fake-with-deps==0.1\n")
+    Path("requirements.txt").write_text(f"small-fake-a==0.1\n{line}\n")
+
+    with mock.patch(
+        "piptools._compat.pip_compat.parse_requirements", wraps=parse_requirements
+    ) as pip_parse_requirements:
+        ireqs = list(
+            parse_compiled_requirements("requirements.txt", session=repository.session)
+        )
+
+    pip_parse_requirements.assert_called_once()
+    assert list(map(_get_install_requirement_fields, ireqs)) == list(
+        map(
+            _get_install_requirement_fields,
+            parse_requirements("requirements.txt", session=repository.session),
+        )
+    )
+
+
+def test_parse_compiled_requirements_weak_hash(tmp_path_cwd, repository):
+    Path("requirements.txt").write_text(f"small-fake-a==0.1 --hash=md5:{'0' * 32}\n")
+
+    with pytest.raises(RequirementsFileParseError, match="Allowed hash algorithms"):
+        list(
+            parse_compiled_requirements("requirements.txt", session=repository.session)
+        )
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from piptools.repositories import PyPIRepository, RepositoryPool
+
+PIP_ARGS = ["--index-url", "https://index.example/simple"]
+
+
+def test_pool_reuses_released_repository(tmp_path):
+    pool = RepositoryPool(ttl=60)
+    repository = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    repository.hash_sources["downloads"] += 1
+
+    # A repository in use is not handed out twice
+    assert pool.acquire(PIP_ARGS, cache_dir=str(tmp_path)) is not repository
+
+    pool.release(repository)
+    assert pool.acquire(PIP_ARGS, cache_dir=str(tmp_path)) is repository
+    assert not repository.hash_sources
+
+
+def test_pool_keys_repositories_by_arguments(tmp_path):
+    pool = RepositoryPool(ttl=60)
+    repository = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    pool.release(repository)
+
+    assert pool.acquire([], cache_dir=str(tmp_path)) is not repository
+    assert pool.acquire(PIP_ARGS, cache_dir=str(tmp_path), hash_jobs=2) is not (
+        repository
+    )
+    assert pool.acquire(PIP_ARGS, cache_dir=str(tmp_path)) is repository
+
+
+def test_pool_drops_fresh_expired_and_reconfigured_repositories(tmp_path):
+    pool = RepositoryPool(ttl=60)
+    repository = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    pool.release(repository)
+    assert pool.acquire(PIP_ARGS, cache_dir=str(tmp_path), fresh=True) is not (
+        repository
+    )
+
+    pool = RepositoryPool(ttl=0)
+    repository = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    pool.release(repository)
+    assert pool.acquire(PIP_ARGS, cache_dir=str(tmp_path)) is not repository
+
+    pool = RepositoryPool(ttl=60)
+    repository = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    # As the options in a requirements file would
+    repository.finder.index_urls.append("https://other.example/simple")
+    pool.release(repository)
+    assert pool.acquire(PIP_ARGS, cache_dir=str(tmp_path)) is not repository
+
+    repository = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    pool.release(repository)
+    pool.clear()
+    assert pool.acquire(PIP_ARGS, cache_dir=str(tmp_path)) is not repository
+
+
+def test_pool_closes_dropped_repositories(tmp_path, monkeypatch):
+    closed = []
+    monkeypatch.setattr(PyPIRepository, "close", lambda self: closed.append(self))
+
+    pool = RepositoryPool(ttl=60)
+    fresh = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    pool.release(fresh)
+    pool.acquire(PIP_ARGS, cache_dir=str(tmp_path), fresh=True)
+    assert closed == [fresh]
+
+    reconfigured = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    reconfigured.finder.index_urls.append("https://other.example/simple")
+    pool.release(reconfigured)
+    assert closed == [fresh, reconfigured]
+
+    cleared = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    pool.release(cleared)
+    pool.clear()
+    assert closed == [fresh, reconfigured, cleared]
+
+    # Expired repositories are dropped whatever the arguments of the next compile
+    pool = RepositoryPool(ttl=0)
+    expired = pool.acquire(PIP_ARGS, cache_dir=str(tmp_path))
+    pool.release(expired)
+    pool.acquire([], cache_dir=str(tmp_path))
+    assert closed == [fresh, reconfigured, cleared, expired]
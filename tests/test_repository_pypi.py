@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
 from pip._internal.models.candidate import InstallationCandidate
 from pip._internal.models.link import Link
 from pip._internal.utils.urls import path_to_url
+from pip._vendor.packaging.specifiers import SpecifierSet
 from pip._vendor.requests import HTTPError, Session
 
+from piptools.cache import MetadataCache
 from piptools.repositories import PyPIRepository
-from piptools.repositories.pypi import open_local_or_remote_file
+from piptools.repositories.pypi import (
+    FILE_CHUNK_SIZE,
+    VersionIndex,
+    hash_local_file,
+    hash_stream,
+    open_local_or_remote_file,
+)
+from piptools.utils import dedup
+
+from .constants import MINIMAL_WHEELS_PATH
 
 
 def test_generate_hashes_all_platforms(capsys, pip_conf, from_line, pypi_repository):
@@ -35,6 +49,348 @@ def test_generate_hashes_all_platforms(capsys, pip_conf, from_line, pypi_reposit
     assert captured.err == ""
 
 
+def test_get_hashes_all_platforms_concurrently(pip_conf, from_line, pypi_repository):
+    """
+    The hashes of all platforms are looked up without changing what the
+    other threads find for the current platform at the same time.
+    """
+    ireq = from_line("small-fake-multi-arch==0.1")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(pypi_repository.get_hashes, ireq, all_platforms)
+            for all_platforms in (True, False) * 4
+        ]
+    all_platforms_hashes, current_platform_hashes = (
+        futures[0].result(),
+        futures[1].result(),
+    )
+
+    assert len(all_platforms_hashes) == 4
+    assert current_platform_hashes < all_platforms_hashes
+    assert [future.result() for future in futures] == [
+        all_platforms_hashes,
+        current_platform_hashes,
+    ] * 4
+
+
+def test_generate_hashes_concurrently(pip_conf, from_line, tmp_path):
+    """
+    Hashing the files of a requirement on several threads gives the same
+    hashes as hashing them one by one.
+    """
+    ireq = from_line("small-fake-multi-arch==0.1")
+    serial_repository = PyPIRepository([], cache_dir=tmp_path / "serial")
+    concurrent_repository = PyPIRepository(
+        [], cache_dir=tmp_path / "concurrent", hash_jobs=4
+    )
+
+    with serial_repository.allow_all_wheels():
+        expected = serial_repository.get_hashes(ireq)
+    with concurrent_repository.allow_all_wheels():
+        assert concurrent_repository.get_hashes(ireq) == expected
+    assert len(expected) == 4
+
+
+def test_close_stops_hash_threads(pip_conf, from_line, tmp_path):
+    repository = PyPIRepository([], cache_dir=tmp_path, hash_jobs=4)
+    with repository.allow_all_wheels():
+        repository.get_hashes(from_line("small-fake-multi-arch==0.1"))
+    threads = list(repository._hash_executor._threads)
+    assert threads
+
+    repository.close()
+
+    assert repository._hash_executor is None
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_get_hashes_uses_hash_cache(pip_conf, from_line, tmp_path):
+    """
+    Files which have been hashed once are not read again by another
+    repository sharing the same cache dir, unless the caches are cleared.
+    """
+    ireq = from_line("small-fake-multi-arch==0.1")
+    repository = PyPIRepository([], cache_dir=tmp_path)
+    with repository.allow_all_wheels():
+        expected = repository.get_hashes(ireq)
+
+    repository = PyPIRepository([], cache_dir=tmp_path)
+    with (
+        mock.patch(
+            "piptools.repositories.pypi.open_local_or_remote_file",
+            side_effect=AssertionError("file was hashed again"),
+        ),
+        repository.allow_all_wheels(),
+    ):
+        assert repository.get_hashes(ireq) == expected
+
+    repository.clear_caches()
+    with (
+        mock.patch(
+            "piptools.repositories.pypi.open_local_or_remote_file",
+            wraps=open_local_or_remote_file,
+        ) as mocked_open,
+        repository.allow_all_wheels(),
+    ):
+        assert repository.get_hashes(ireq) == expected
+    assert mocked_open.call_count == len(expected)
+
+
+def test_prefetch(pip_conf, tmp_path):
+    repository = PyPIRepository([], cache_dir=tmp_path)
+
+    repository.prefetch(["Small-Fake-A", "small_fake_b"], max_workers=2)
+
+    with mock.patch.object(
+        repository.finder,
+        "find_all_candidates",
+        side_effect=AssertionError("candidates were fetched again"),
+    ):
+        assert repository.find_all_candidates("small-fake-a")
+        assert repository.find_all_candidates("small-fake-b")
+
+
+def test_prefetch_serves_legacy_resolver(pip_conf, tmp_path, from_line, resolver):
+    """
+    The legacy resolver looks the prefetched candidates up by the names of the
+    requirements, which are not canonical.
+    """
+    repository = PyPIRepository(
+        ["--use-deprecated", "legacy-resolver"], cache_dir=tmp_path
+    )
+    repository.prefetch(["Small_Fake-A"], max_workers=2)
+
+    with (
+        mock.patch.object(
+            repository.finder,
+            "find_all_candidates",
+            side_effect=AssertionError("candidates were fetched again"),
+        ),
+        mock.patch.object(repository, "get_dependencies", return_value=set()),
+    ):
+        result = resolver([from_line("Small_Fake-A")], repository=repository).resolve()
+
+    assert [str(ireq.req) for ireq in result] == ["Small_Fake-A==0.2"]
+
+
+def test_prefetch_failure_is_not_cached(pip_conf, tmp_path):
+    repository = PyPIRepository([], cache_dir=tmp_path)
+
+    with mock.patch.object(
+        repository.finder, "find_all_candidates", side_effect=ConnectionError
+    ):
+        repository.prefetch(["small-fake-a"], max_workers=2)
+
+    assert repository.find_all_candidates("small-fake-a")
+
+
+@pytest.fixture
+def remote_wheel_repository(pip_conf, tmp_path, monkeypatch):
+    """
+    A repository which finds ``small-fake-a==0.1`` as a wheel on a remote index,
+    which serves the local wheel from the test data.
+    """
+    wheel_filename = "small_fake_a-0.1-py2.py3-none-any.whl"
+    wheel_link = Link(path_to_url(os.path.join(MINIMAL_WHEELS_PATH, wheel_filename)))
+    remote_link = Link(f"https://example.com/{wheel_filename}")
+
+    repository = PyPIRepository([], cache_dir=tmp_path / "pypi-repo")
+    best_candidate_result = mock.Mock(
+        best_candidate=InstallationCandidate("small-fake-a", "0.1", remote_link)
+    )
+    monkeypatch.setattr(
+        repository.finder,
+        "find_best_candidate",
+        mock.Mock(return_value=best_candidate_result),
+    )
+    monkeypatch.setattr(
+        "piptools.repositories.pypi.open_local_or_remote_file",
+        lambda link, session: open_local_or_remote_file(wheel_link, session),
+    )
+    return repository, remote_link
+
+
+def test_allow_all_wheels_keeps_index_pages(monkeypatch, tmp_path):
+    monkeypatch.delenv("PIP_FIND_LINKS", raising=False)
+    project_dir = tmp_path / "simple" / "small-fake-a"
+    project_dir.mkdir(parents=True)
+    wheel_path = os.path.join(
+        MINIMAL_WHEELS_PATH, "small_fake_a-0.1-py2.py3-none-any.whl"
+    )
+    (project_dir / "index.html").write_text(
+        f'<a href="{path_to_url(wheel_path)}">small_fake_a-0.1-py2.py3-none-any.whl</a>'
+    )
+    repository = PyPIRepository(
+        ["--index-url", path_to_url(str(tmp_path / "simple"))],
+        cache_dir=str(tmp_path / "cache"),
+    )
+    candidates = repository.find_all_candidates("small-fake-a")
+    assert [str(candidate.version) for candidate in candidates] == ["0.1"]
+
+    with mock.patch.object(
+        repository.finder._link_collector,
+        "fetch_response",
+        side_effect=AssertionError("the index page was fetched again"),
+    ):
+        with repository.allow_all_wheels():
+            assert repository.find_all_candidates("small-fake-a") == candidates
+
+
+def test_get_dependencies_cached_by_requirement_value(pip_conf, from_line, tmp_path):
+    repository = PyPIRepository([], cache_dir=tmp_path)
+    dependencies = repository.get_dependencies(from_line("small-fake-with-deps==0.1"))
+
+    with mock.patch.object(
+        repository,
+        "resolve_reqs",
+        side_effect=AssertionError("dependencies were resolved again"),
+    ):
+        assert (
+            repository.get_dependencies(from_line("Small_Fake_With_Deps==0.1"))
+            == dependencies
+        )
+
+    assert repository.dependencies_cache_hits == 1
+    assert repository.dependencies_cache_misses == 1
+
+
+@pytest.mark.parametrize(
+    "specifier",
+    (
+        "",
+        "==1.2",
+        "==1.2.0",
+        "==1.2+local",
+        "==2.0rc1",
+        "==9.0",
+        ">=1.2",
+        ">1.2,<2.0",
+        ">=1.2,<2.0",
+        "<=1.2",
+        "<1.0",
+        "~=1.1",
+        "==1.*",
+        "!=1.2",
+        ">=3.0rc1",
+        ">=3.0",
+        ">=2.0,<1.0",
+    ),
+)
+@pytest.mark.parametrize("prereleases", (None, True, False))
+def test_version_index_filter(specifier, prereleases):
+    """
+    The version index finds the versions which a specifier finds among the
+    versions of all the candidates, in the order of the candidates.
+    """
+    versions = [
+        f"{major}.{minor}{suffix}"
+        for major in range(3)
+        for minor in range(10)
+        for suffix in ("", "rc1", ".post1", ".dev0", "+local")
+    ] + ["3.0rc1"]
+    candidates = [
+        InstallationCandidate(
+            "example", version, Link(f"https://example.com/example-{version}-{i}.whl")
+        )
+        for i in range(3)
+        for version in reversed(versions)
+    ]
+    version_index = VersionIndex(candidates)
+
+    expected = list(
+        dedup(
+            SpecifierSet(specifier).filter(
+                (candidate.version for candidate in candidates), prereleases
+            )
+        )
+    )
+    assert version_index.filter(SpecifierSet(specifier), prereleases) == expected
+    for version in expected:
+        assert version_index[version] == {
+            candidate for candidate in candidates if candidate.version == version
+        }
+
+
+def test_prefetch_metadata(from_line, tmp_path, monkeypatch, remote_wheel_repository):
+    repository, remote_link = remote_wheel_repository
+    monkeypatch.setattr(
+        "piptools.repositories.pypi._pip_api.get_metadata_link",
+        lambda link: Link(f"{link.url}.metadata"),
+    )
+    fetching = threading.Event()
+    resolving = threading.Event()
+
+    def get(url):
+        fetching.set()
+        assert resolving.wait(timeout=10)
+        return mock.Mock(
+            content=b"Metadata-Version: 2.1\nName: small-fake-a\nVersion: 0.1\n"
+        )
+
+    monkeypatch.setattr(repository.session, "get", mock.Mock(side_effect=get))
+    find_best_candidate = repository.finder.find_best_candidate
+    finder_threads = []
+
+    def find_best_candidate_on_thread(*args):
+        finder_threads.append(threading.current_thread())
+        return find_best_candidate.return_value
+
+    find_best_candidate.side_effect = find_best_candidate_on_thread
+    metadata_cache = MetadataCache(tmp_path / "metadata")
+
+    with repository.prefetch_metadata(
+        [from_line("small-fake-a==0.1"), from_line("small-fake-b>=0.1")],
+        metadata_cache,
+        max_workers=2,
+    ):
+        # The metadata is fetched in the background
+        assert fetching.wait(timeout=10)
+        resolving.set()
+
+    assert metadata_cache.get(remote_link) == (
+        b"Metadata-Version: 2.1\nName: small-fake-a\nVersion: 0.1\n"
+    )
+    # The finder, which the resolver uses meanwhile, is only used by the caller
+    assert finder_threads == [threading.current_thread()]
+    assert repository.session.get.call_count == 1
+
+
+def test_prefetch_metadata_without_metadata_file(
+    from_line, tmp_path, monkeypatch, remote_wheel_repository
+):
+    repository, remote_link = remote_wheel_repository
+    monkeypatch.setattr(
+        "piptools.repositories.pypi._pip_api.get_metadata_link", lambda link: None
+    )
+    monkeypatch.setattr(repository.session, "get", mock.Mock())
+    metadata_cache = MetadataCache(tmp_path / "metadata")
+
+    with repository.prefetch_metadata(
+        [from_line("small-fake-a==0.1")], metadata_cache, max_workers=1
+    ):
+        pass
+
+    # The wheel is not downloaded
+    assert metadata_cache.get(remote_link) is None
+    assert not repository.session.get.called
+
+
+def test_prefetch_metadata_failure_is_ignored(
+    tmp_path, monkeypatch, remote_wheel_repository
+):
+    repository, remote_link = remote_wheel_repository
+    monkeypatch.setattr(
+        repository.session, "get", mock.Mock(side_effect=HTTPError("Not Found"))
+    )
+    metadata_cache = MetadataCache(tmp_path / "metadata")
+
+    repository._prefetch_metadata_file(
+        remote_link, Link(f"{remote_link.url}.metadata"), metadata_cache
+    )
+
+    assert metadata_cache.get(remote_link) is None
+
+
 @pytest.mark.network
 def test_get_file_hash_without_interfering_with_each_other(from_line, pypi_repository):
     """
@@ -143,6 +499,33 @@ def test_open_local_or_remote_file__remote_file(
         mock_response.close.assert_called_once()
 
 
+@pytest.mark.parametrize(
+    "content",
+    (
+        pytest.param(b"", id="empty"),
+        pytest.param(b"foo", id="small"),
+        pytest.param(b"x" * (2 * FILE_CHUNK_SIZE + 1), id="several chunks"),
+    ),
+)
+def test_hash_local_file_and_stream(tmp_path, content):
+    """
+    Test the `hash_local_file` and `hash_stream` return the hash of the content of
+    a file, the latter reporting the progress of reading it.
+    """
+    file_path = tmp_path / "foo.whl"
+    file_path.write_bytes(content)
+    expected_hash = f"sha256:{hashlib.sha256(content).hexdigest()}"
+    progress = []
+
+    with file_path.open("rb") as fp:
+        assert hash_local_file(fp) == expected_hash
+    with file_path.open("rb") as fp:
+        assert hash_stream(fp, progress.append) == expected_hash
+
+    assert sum(progress) == len(content)
+    assert all(0 < steps <= FILE_CHUNK_SIZE for steps in progress)
+
+
 def test_relative_path_cache_dir_is_normalized(from_line):
     relative_cache_dir = "pypi-repo-cache"
     pypi_repository = PyPIRepository([], cache_dir=relative_cache_dir)
@@ -328,7 +711,9 @@ def test_get_hashes_from_mixed(pip_conf, from_line, tmp_path):
                 }
             }
 
-        def find_all_candidates(self, req_name):
+        def find_all_candidates(
+            self, req_name, all_platforms=False, wheel_tag_filter=None
+        ):
             return all_candidates
 
         def _get_file_hash(self, link):
@@ -346,6 +731,93 @@ def test_get_hashes_from_mixed(pip_conf, from_line, tmp_path):
     assert actual_hashes == expected_hashes
 
 
+def test_get_hashes_from_index_links(from_line, tmp_path):
+    """
+    Test PyPIRepository.get_hashes() takes the hashes given by the index in the
+    links first, then those of the PyPI JSON API, and only hashes the other files.
+    """
+    package_name = "small-fake-multi-arch"
+    package_version = "0.1"
+    fragment_link = Link("https://index/small-fake-multi-arch-0.1.tar.gz#sha256=aaa")
+    pep691_link = Link(
+        "https://index/small_fake_multi_arch-0.1-py3-none-any.whl",
+        hashes={"sha256": "bbb"},
+    )
+    pypi_link = Link("https://index/small_fake_multi_arch-0.1-py2-none-any.whl")
+    unknown_link = Link("https://index/small_fake_multi_arch-0.1-cp37-none-any.whl")
+
+    class MockPyPIRepository(PyPIRepository):
+        def _get_project(self, ireq):
+            return {
+                "releases": {
+                    package_version: [
+                        {
+                            "packagetype": "bdist_wheel",
+                            "digests": {"sha256": "ccc"},
+                            "url": str(pypi_link),
+                            "size": 1234,
+                        },
+                    ]
+                }
+            }
+
+        def find_all_candidates(
+            self, req_name, all_platforms=False, wheel_tag_filter=None
+        ):
+            return [
+                InstallationCandidate(package_name, package_version, link)
+                for link in (fragment_link, pep691_link, pypi_link, unknown_link)
+            ]
+
+        def _get_file_hash(self, link):
+            assert link == unknown_link
+            self._count_hashes("downloads", 1)
+            return "sha256:ddd"
+
+    pypi_repository = MockPyPIRepository(
+        ["--no-cache-dir"], cache_dir=(tmp_path / "pypi-repo-cache")
+    )
+    ireq = from_line(f"{package_name}=={package_version}")
+
+    actual_hashes = pypi_repository.get_hashes(ireq)
+
+    assert actual_hashes == {"sha256:aaa", "sha256:bbb", "sha256:ccc", "sha256:ddd"}
+    assert pypi_repository.hash_sources == {
+        "index links": 2,
+        "the JSON API": 1,
+        "downloads": 1,
+    }
+    assert pypi_repository.hash_bytes_not_downloaded == 1234
+
+
+def test_get_hashes_from_index_links_only(from_line, tmp_path):
+    """
+    Test PyPIRepository.get_hashes() does not query the PyPI JSON API when the
+    index gave the hashes of all the files in their links.
+    """
+
+    class MockPyPIRepository(PyPIRepository):
+        def _get_project(self, ireq):
+            raise AssertionError("The JSON API should not be queried")
+
+        def find_all_candidates(
+            self, req_name, all_platforms=False, wheel_tag_filter=None
+        ):
+            return [
+                InstallationCandidate(
+                    "small-fake-a",
+                    "0.1",
+                    Link("https://index/small_fake_a-0.1-py3-none-any.whl#sha256=a"),
+                )
+            ]
+
+    pypi_repository = MockPyPIRepository(
+        ["--no-cache-dir"], cache_dir=(tmp_path / "pypi-repo-cache")
+    )
+
+    assert pypi_repository.get_hashes(from_line("small-fake-a==0.1")) == {"sha256:a"}
+
+
 def test_get_project__returns_data(from_line, monkeypatch, pypi_repository):
     """
     Test PyPIRepository._get_project() returns expected project data.
@@ -354,6 +826,7 @@ def test_get_project__returns_data(from_line, monkeypatch, pypi_repository):
 
     class MockResponse:
         status_code = 200
+        headers = {}
 
         @staticmethod
         def json():
@@ -369,6 +842,170 @@ def test_get_project__returns_data(from_line, monkeypatch, pypi_repository):
     assert actual_data == expected_data
 
 
+def test_get_project__uses_cached_release(from_line, monkeypatch, pypi_repository):
+    """
+    Test PyPIRepository._get_project() keeps the hashes of the release files,
+    and serves a known release of the project without any request.
+    """
+    release_file = {
+        "packagetype": "sdist",
+        "url": "https://link",
+        "digests": {"md5": "fake-md5", "sha256": "fake-hash"},
+        "size": 1234,
+    }
+    expected_data = {"releases": {"0.1": [release_file]}}
+    requests = []
+
+    class MockResponse:
+        status_code = 200
+        headers = {"ETag": '"abc"'}
+
+        @staticmethod
+        def json():
+            return {"info": {"name": "fake-package"}, **expected_data}
+
+    def mock_get(url, headers):
+        requests.append(headers)
+        return MockResponse()
+
+    monkeypatch.setattr(pypi_repository.session, "get", mock_get)
+    # An index which does not serve single releases
+    monkeypatch.setattr(pypi_repository, "_get_release_files", lambda *args: None)
+    pypi_repository._get_project(from_line("fake-package==0.1"))
+    assert requests == [{}]
+
+    actual_data = pypi_repository._get_project(from_line("fake-package==0.1"))
+    assert requests == [{}]
+    assert actual_data == {
+        "releases": {
+            "0.1": [
+                {
+                    "packagetype": "sdist",
+                    "url": "https://link",
+                    "digests": {"sha256": "fake-hash"},
+                    "size": 1234,
+                }
+            ]
+        }
+    }
+    assert pypi_repository._get_hashes_from_pypi(from_line("fake-package==0.1")) == {
+        "https://link": "sha256:fake-hash"
+    }
+
+
+def test_get_project__revalidates_cached_project(
+    from_line, monkeypatch, pypi_repository
+):
+    """
+    Test PyPIRepository._get_project() revalidates the cached project page when
+    the release is not cached, and uses the cache if the page is unchanged.
+    """
+    release_file = {
+        "packagetype": "bdist_wheel",
+        "url": "https://link",
+        "digests": {"sha256": "fake-hash"},
+    }
+    responses = [(200, {"releases": {"0.1": [release_file]}}), (304, None)]
+    requests = []
+
+    class MockResponse:
+        headers = {"ETag": '"abc"', "Last-Modified": "Sat, 01 Jan 2000 00:00:00 GMT"}
+
+        def __init__(self, status_code, data):
+            self.status_code = status_code
+            self.data = data
+
+        def json(self):
+            return self.data
+
+    def mock_get(url, headers):
+        requests.append(headers)
+        return MockResponse(*responses.pop(0))
+
+    monkeypatch.setattr(pypi_repository.session, "get", mock_get)
+    monkeypatch.setattr(pypi_repository, "_get_release_files", lambda *args: None)
+    pypi_repository._get_project(from_line("fake-package==0.1"))
+
+    actual_hashes = pypi_repository._get_hashes_from_pypi(
+        from_line("fake-package==0.2")
+    )
+    assert actual_hashes == {}
+    assert requests == [
+        {},
+        {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Sat, 01 Jan 2000 00:00:00 GMT",
+        },
+    ]
+
+    # Clearing the caches forgets the project
+    responses.append((200, {"releases": {}}))
+    pypi_repository.clear_caches()
+    pypi_repository._get_project(from_line("fake-package==0.1"))
+    assert requests[-1] == {}
+
+
+@pytest.mark.parametrize(
+    ("release_status_code", "expected_urls"),
+    (
+        pytest.param(
+            200,
+            [
+                "https://pypi.org/fake-package/0.1/json",
+            ],
+            id="release endpoint",
+        ),
+        pytest.param(
+            404,
+            [
+                "https://pypi.org/fake-package/0.1/json",
+                "https://pypi.org/fake-package/json",
+            ],
+            id="fallback to project endpoint",
+        ),
+    ),
+)
+def test_get_project__fetches_single_release(
+    from_line, monkeypatch, pypi_repository, release_status_code, expected_urls
+):
+    """
+    Test PyPIRepository._get_project() only fetches the release of a pinned
+    requirement if the index can serve it, and caches its hashes.
+    """
+    release_file = {
+        "packagetype": "bdist_wheel",
+        "url": "https://link",
+        "digests": {"sha256": "fake-hash"},
+    }
+    requested_urls = []
+
+    class MockResponse:
+        headers = {}
+
+        def __init__(self, url):
+            is_project_page = url.endswith("fake-package/json")
+            self.status_code = 200 if is_project_page else release_status_code
+
+        @staticmethod
+        def json():
+            return {"releases": {"0.1": [release_file]}, "urls": [release_file]}
+
+    def mock_get(url, headers=None):
+        requested_urls.append(url)
+        return MockResponse(url)
+
+    monkeypatch.setattr(pypi_repository.session, "get", mock_get)
+    ireq = from_line("fake-package==0.1")
+
+    assert pypi_repository._get_hashes_from_pypi(ireq) == {
+        "https://link": "sha256:fake-hash"
+    }
+    assert pypi_repository._get_hashes_from_pypi(ireq) == {
+        "https://link": "sha256:fake-hash"
+    }
+    assert requested_urls == expected_urls
+
+
 def test_get_project__handles_http_error(from_line, monkeypatch, pypi_repository):
     """
     Test PyPIRepository._get_project() returns None if HTTP error is raised.
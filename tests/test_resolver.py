@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+from types import SimpleNamespace
+
 import pytest
 from pip._internal.exceptions import DistributionNotFound
+from pip._internal.models.link import Link
+from pip._internal.utils.temp_dir import global_tempdir_manager
 from pip._internal.utils.urls import path_to_url
 
+from piptools._internal._pip_api import get_metadata_distribution
+from piptools.cache import MetadataCache
 from piptools.exceptions import NoCandidateFound
-from piptools.resolver import RequirementSummary, combine_install_requirements
+from piptools.resolver import (
+    BacktrackingResolver,
+    RequirementSummary,
+    _get_metadata_sha256,
+    combine_install_requirements,
+)
 
 
 @pytest.mark.parametrize(
@@ -575,3 +587,122 @@ def test_catch_distribution_not_found_error(backtracking_resolver, exception, ca
             resolver=FakePipResolver(),
             compatible_existing_constraints={},
         )
+
+
+def test_resolver_writes_dependency_cache_once(resolver, from_line, depcache):
+    resolver([from_line("django==1.8"), from_line("flask==0.10.1")]).resolve()
+
+    assert depcache.write_count == 1
+    assert from_line("flask==0.10.1") in depcache
+
+
+@pytest.mark.parametrize("max_workers", (1, 4))
+def test_resolve_hashes(resolver, from_line, max_workers):
+    ireqs = {from_line("django==1.8"), from_line("flask==0.10.1")}
+    hashes = resolver([]).resolve_hashes(ireqs, max_workers=max_workers)
+
+    assert hashes.keys() == ireqs
+    assert all(
+        value
+        == {
+            "test:123",
+            "sha256:0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef",
+        }
+        for value in hashes.values()
+    )
+
+
+@pytest.fixture
+def _tempdir_manager():
+    with global_tempdir_manager():
+        yield
+
+
+class FakePreparer:
+    def __init__(self, dist):
+        self.dist = dist
+        self.prepared = []
+
+    def prepare_linked_requirement(self, req, parallel_builds=False):
+        self.prepared.append(req)
+        return self.dist
+
+
+@pytest.mark.parametrize(
+    ("url", "cached"),
+    (
+        pytest.param("https://example.com/top-1.2-py3-none-any.whl", True, id="index"),
+        pytest.param("file:///wheels/top-1.2-py3-none-any.whl", False, id="file"),
+        pytest.param("git+https://example.com/top.git", False, id="vcs"),
+    ),
+)
+@pytest.mark.usefixtures("_tempdir_manager")
+def test_metadata_cache_serves_prepared_metadata(tmp_path, from_line, url, cached):
+    dist = get_metadata_distribution(
+        b"Metadata-Version: 2.1\nName: top\nVersion: 1.2\nRequires-Dist: middle\n",
+        "top-1.2-py3-none-any.whl",
+        "top",
+    )
+    preparer = FakePreparer(dist)
+    BacktrackingResolver._use_metadata_cache(preparer, MetadataCache(tmp_path))
+
+    ireq = from_line("top==1.2")
+    ireq.link = Link(url)
+    preparer.prepare_linked_requirement(ireq, parallel_builds=True)
+    cached_dist = preparer.prepare_linked_requirement(ireq, parallel_builds=True)
+
+    assert len(preparer.prepared) == (1 if cached else 2)
+    assert cached_dist.canonical_name == "top"
+    assert str(cached_dist.version) == "1.2"
+    assert [str(req) for req in cached_dist.iter_dependencies()] == ["middle"]
+
+
+@pytest.mark.usefixtures("_tempdir_manager")
+def test_metadata_cache_skips_url_requirements(tmp_path, from_line):
+    dist = get_metadata_distribution(
+        b"Metadata-Version: 2.1\nName: top\nVersion: 1.2\n",
+        "top-1.2.tar.gz",
+        "top",
+    )
+    preparer = FakePreparer(dist)
+    BacktrackingResolver._use_metadata_cache(preparer, MetadataCache(tmp_path))
+
+    ireq = from_line("https://example.com/top-1.2.tar.gz")
+    preparer.prepare_linked_requirement(ireq)
+    preparer.prepare_linked_requirement(ireq)
+
+    assert len(preparer.prepared) == 2
+
+
+@pytest.mark.parametrize("prefetched", (False, True))
+@pytest.mark.usefixtures("_tempdir_manager")
+def test_metadata_sha256_with_cold_and_warm_metadata_cache(
+    tmp_path, from_line, prefetched
+):
+    metadata_contents = (
+        b"Metadata-Version: 2.1\n"
+        b"Name: top\n"
+        b"Version: 1.2\n"
+        b"Summary: Not cached\n"
+        b"Requires-Dist: middle\n"
+    )
+    dist = get_metadata_distribution(
+        metadata_contents, "top-1.2-py3-none-any.whl", "top"
+    )
+    ireq = from_line("top==1.2")
+    ireq.link = Link("https://example.com/top-1.2-py3-none-any.whl")
+
+    def get_metadata_sha256(metadata_cache):
+        preparer = FakePreparer(dist)
+        BacktrackingResolver._use_metadata_cache(preparer, metadata_cache)
+        candidate = SimpleNamespace(
+            dist=preparer.prepare_linked_requirement(ireq), source_link=ireq.link
+        )
+        return _get_metadata_sha256(candidate, metadata_cache)
+
+    if prefetched:
+        MetadataCache(tmp_path).set_metadata_file(ireq.link, metadata_contents)
+    cold_sha256 = get_metadata_sha256(MetadataCache(tmp_path))
+    warm_sha256 = get_metadata_sha256(MetadataCache(tmp_path))
+
+    assert cold_sha256 == warm_sha256 == hashlib.sha256(metadata_contents).hexdigest()
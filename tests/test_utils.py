@@ -33,6 +33,7 @@ from piptools.utils import (
     lookup_table,
     lookup_table_from_tuples,
     override_defaults_from_config_file,
+    parse_annotations,
     select_config_file,
 )
 
@@ -582,6 +583,58 @@ def test_lookup_table_with_empty_values():
     assert lookup_table((), operator.itemgetter(0)) == {}
 
 
+@pytest.mark.parametrize(
+    "content",
+    (
+        pytest.param(
+            """\
+            #
+            # This file is autogenerated by pip-compile with Python 3.11
+            #
+            --index-url https://example.com/simple
+
+            -e file:///src/example
+                # via -r requirements.in
+            Django==4.2 \\
+                --hash=sha256:abcdef
+                # via
+                #   -r requirements.in
+                #   django-extensions
+            django-extensions==3.2 ; python_version >= "3.8"
+                # via -r requirements.in
+            sqlparse==0.4.4
+                # via django
+
+            # The following packages are considered to be unsafe in a requirements file:
+            # setuptools
+            """,
+            id="split",
+        ),
+        pytest.param(
+            """\
+            -e file:///src/example  # via -r requirements.in
+            django==4.2 \\
+                --hash=sha256:abcdef
+                # via -r requirements.in, django-extensions
+            django-extensions==3.2 ; python_version >= "3.8"  # via -r requirements.in
+            sqlparse==0.4.4           # via django
+
+            # The following packages are considered to be unsafe in a requirements file:
+            # setuptools
+            """,
+            id="line",
+        ),
+    ),
+)
+def test_parse_annotations(content):
+    assert parse_annotations(dedent(content).splitlines()) == {
+        "django": {"-r requirements.in", "django-extensions"},
+        "django-extensions": {"-r requirements.in"},
+        "sqlparse": {"django"},
+        "setuptools": set(),
+    }
+
+
 @pytest.mark.parametrize(
     ("given", "expected"),
     (
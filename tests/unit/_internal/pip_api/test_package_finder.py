@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+from unittest import mock
+
 import pytest
+from pip._internal.models.link import Link
 from pip._vendor.requests import RequestException
 
 from piptools._internal import _pip_api
@@ -34,3 +37,72 @@ def test_get_request_exc_types_provides_tuple_with_base_request_exc_type() -> No
     assert isinstance(exc_types, tuple)
     assert len(exc_types) >= 1
     assert RequestException in exc_types
+
+
+@pytest.mark.skipif(
+    _pip_api.PIP_VERSION_MAJOR_MINOR < (26, 2), reason="test requires pip>=26.2"
+)
+@pytest.mark.parametrize(
+    "find_all_candidates",
+    (
+        pytest.param(
+            lambda finder, page_links: finder.find_all_candidates("Small-Fake-A"),
+            id="kept index pages",
+        ),
+        pytest.param(
+            lambda finder, page_links: _pip_api.find_all_candidates_for_all_platforms(
+                finder, "Small-Fake-A", page_links
+            ),
+            id="all platforms",
+        ),
+    ),
+)
+def test_index_pages_are_fetched_with_package_name(  # pragma: pip>=26.2 cover
+    tmp_path, monkeypatch, find_all_candidates
+):
+    """
+    The index pages are fetched for their package, which ``--refresh-package``
+    revalidates.
+    """
+    repository = PyPIRepository(
+        ["--index-url", "https://index.example/simple"], cache_dir=tmp_path / "cache"
+    )
+    finder = repository.finder
+    page_links = {}
+    _pip_api.keep_index_page_links(finder, page_links)
+    fetch_response = mock.Mock(return_value=None)
+    monkeypatch.setattr(finder._link_collector, "fetch_response", fetch_response)
+
+    assert find_all_candidates(finder, page_links) == []
+
+    fetch_response.assert_called_once_with(mock.ANY, package_name="Small-Fake-A")
+
+
+@pytest.mark.skipif(
+    _pip_api.PIP_VERSION_MAJOR_MINOR < (26, 2), reason="test requires pip>=26.2"
+)
+def test_find_all_candidates_for_all_platforms_of_locked_project(  # pragma: pip>=26.2 cover
+    tmp_path, monkeypatch
+):
+    """
+    The candidate of a project locked to a link is the locked one, as pip finds
+    it, without looking at the index.
+    """
+    repository = PyPIRepository(
+        ["--index-url", "https://index.example/simple"], cache_dir=tmp_path / "cache"
+    )
+    finder = repository.finder
+    fetch_response = mock.Mock(return_value=None)
+    monkeypatch.setattr(finder._link_collector, "fetch_response", fetch_response)
+    locked_link = Link(
+        "https://files.example/small_fake_a-0.1-py2.py3-none-any.whl",
+        comes_from="pylock.toml",
+    )
+    finder.add_locked_link("small-fake-a", locked_link)
+
+    [candidate] = _pip_api.find_all_candidates_for_all_platforms(
+        finder, "Small-Fake-A", {}
+    )
+
+    assert candidate.link == locked_link
+    assert not fetch_response.called
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import pytest
+from pip._internal.exceptions import InstallationError
+from pip._internal.network.session import PipSession
+
+from piptools._internal import _pip_api
+
+
+def test_handle_requirements_file_line_with_default_options():
+    opts = _pip_api.get_requirements_file_line_defaults(None)
+    opts.hashes = {"sha256": ["0" * 64]}
+
+    parsed_req = _pip_api.handle_requirements_file_line(
+        "requirements.txt", 1, "small-fake-a==0.1", opts, constraint=False
+    )
+
+    assert parsed_req is not None
+    assert parsed_req.requirement == "small-fake-a==0.1"
+    assert not parsed_req.is_editable
+    assert parsed_req.options["hashes"] == {"sha256": ["0" * 64]}
+
+
+@pytest.mark.skipif(
+    _pip_api.PIP_VERSION_MAJOR_MINOR < (26, 1), reason="test requires pip>=26.1"
+)
+@pytest.mark.usefixtures("tmp_path_cwd")
+def test_read_requirements_file_lines_names_constraint_file():  # pragma: pip>=26.1 cover  # noqa: E501
+    with pytest.raises(InstallationError, match="Could not open constraint file"):
+        list(
+            _pip_api.read_requirements_file_lines(
+                "constraints.txt", PipSession(), constraint=True
+            )
+        )
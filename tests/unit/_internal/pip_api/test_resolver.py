@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from piptools._internal import _pip_api
+
+
+def test_get_prepared_candidates():
+    candidate = object()
+    resolver = SimpleNamespace(
+        factory=SimpleNamespace(_link_candidate_cache={"link": candidate})
+    )
+
+    assert list(_pip_api.get_prepared_candidates(resolver)) == [candidate]
+
+
+def test_get_prepared_candidates_without_cache():
+    resolver = SimpleNamespace(factory=SimpleNamespace())
+
+    assert list(_pip_api.get_prepared_candidates(resolver)) == []